@@ -0,0 +1,85 @@
+"""
+Full MT5Engine._set_price_data path against the file-backed simulator.
+
+    python benchmarks/price_load.py [--ticks 2000000] [--repeat 5] [--tick-store]
+
+Synthetic ticks and M1/H1 rates are recorded into a temporary directory
+with a fixed seed, so every run loads exactly the same data. --tick-store
+records the ticks into the compact tick store (ticks.qtk) instead of npy.
+"""
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "engine"))
+
+from mt5_sim import MT5SimEngine, RATES_DTYPE, TICK_DTYPE, write_symbol  # noqa: E402
+
+START = 1704067200  # 2024-01-01 00:00 UTC
+
+
+def synthetic_recording(root, n_ticks, seed=7, tick_store=False):
+    rng = np.random.default_rng(seed)
+    ticks = np.zeros(n_ticks, dtype=TICK_DTYPE)
+    time_msc = START * 1000 + np.cumsum(rng.integers(50, 3000, n_ticks))
+    ticks["time_msc"] = time_msc
+    ticks["time"] = time_msc // 1000
+    ticks["bid"] = np.round(1.10 + np.cumsum(rng.normal(0, 0.00003, n_ticks)), 5)
+    ticks["ask"] = np.round(ticks["bid"] + 0.00010, 5)
+    ticks["volume"] = 1
+
+    rates = {}
+    for tf, seconds in (("M1", 60), ("H1", 3600)):
+        bucket = ticks["time"] // seconds
+        starts = np.flatnonzero(np.diff(bucket, prepend=-1))
+        ends = np.append(starts[1:], n_ticks)
+        bars = np.zeros(len(starts), dtype=RATES_DTYPE)
+        bars["time"] = bucket[starts] * seconds
+        bars["open"] = ticks["bid"][starts]
+        bars["close"] = ticks["bid"][ends - 1]
+        bars["high"] = np.maximum.reduceat(ticks["bid"], starts)
+        bars["low"] = np.minimum.reduceat(ticks["bid"], starts)
+        bars["tick_volume"] = ends - starts
+        rates[tf] = bars
+
+    write_symbol(root, "EURUSD", {
+        "point": 0.00001, "digits": 5, "trade_tick_size": 0.00001, "trade_tick_value": 1.0
+    }, ticks, rates, tick_store=tick_store)
+    return int(ticks["time"][-1])
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--ticks", type=int, default=2_000_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--tick-store", action="store_true")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as root:
+        end = synthetic_recording(root, args.ticks, tick_store=args.tick_store)
+        size = sum(os.path.getsize(os.path.join(root, "EURUSD", f)) for f in os.listdir(os.path.join(root, "EURUSD"))
+                   if f.startswith("ticks."))
+        config = {"symbol": "EURUSD", "timeframes": ["M1", "H1"],
+                  "start": "2024-01-01", "end": str(np.datetime64(end, "s"))}
+
+        samples = []
+        for _ in range(args.repeat):
+            engine = MT5SimEngine(root)
+            engine.connect()
+            started = time.perf_counter()
+            engine.set_price_data(config)
+            samples.append(time.perf_counter() - started)
+
+        bars = {tf: len(engine.get_price(tf)) for tf in config["timeframes"]}
+        print(f"ticks {args.ticks:,}  bars {bars}  tick file {size / 1e6:.1f} MB")
+        print(f"set_price_data median {statistics.median(samples) * 1000:.1f} ms "
+              f"({args.ticks / statistics.median(samples) / 1e6:.1f} M ticks/s)")
+
+
+if __name__ == "__main__":
+    main()
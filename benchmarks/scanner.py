@@ -0,0 +1,82 @@
+"""
+Per-scan latency of the multi-symbol scanner over replayed bars.
+
+    python benchmarks/scanner.py [--symbols 50] [--bars 2000] [--workers 1]
+
+Synthetic H1 bars with a fixed seed per symbol; the first --window bars
+warm the rings up, the rest are replayed through ReplayBarFeed.
+"""
+import argparse
+import asyncio
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "engine"))
+
+from scanner import ReplayBarFeed, Scanner  # noqa: E402
+
+STRATEGY = {
+    "entry_timeframe": "H1",
+    "buy_logic": {"type": "AND", "children": [
+        {"type": "condition", "left": {"type": "column", "column": "close"}, "operator": ">",
+         "right": {"type": "column", "column": "ema"}},
+        {"type": "condition", "left": {"type": "column", "column": "rsi"}, "operator": "<",
+         "right": {"type": "literal", "value": 60}}
+    ]},
+    "sell_logic": {"type": "AND", "children": [
+        {"type": "condition", "left": {"type": "column", "column": "close"}, "operator": "<",
+         "right": {"type": "column", "column": "ema"}},
+        {"type": "condition", "left": {"type": "column", "column": "rsi"}, "operator": ">",
+         "right": {"type": "literal", "value": 40}}
+    ]}
+}
+
+INDICATORS = [
+    {"name": "ema", "indicator": "EMA", "timeframe": "H1", "params": {"timeperiod": 50}},
+    {"name": "rsi", "indicator": "RSI", "timeframe": "H1", "params": {"timeperiod": 14}}
+]
+
+
+def synthetic_bars(n, seed):
+    rng = np.random.default_rng(seed)
+    close = 1.10 + np.cumsum(rng.normal(0, 0.0008, n))
+    open_ = np.concatenate(([close[0]], close[:-1]))
+    return pd.DataFrame({
+        "time": pd.date_range("2024-01-01", periods=n, freq="h"),
+        "open": open_,
+        "high": np.maximum(open_, close) + rng.random(n) * 0.0006,
+        "low": np.minimum(open_, close) - rng.random(n) * 0.0006,
+        "close": close,
+        "tick_volume": rng.integers(50, 500, n).astype(float)
+    })
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--symbols", type=int, default=50)
+    parser.add_argument("--bars", type=int, default=2000)
+    parser.add_argument("--window", type=int, default=500)
+    parser.add_argument("--workers", type=int, default=1)
+    args = parser.parse_args()
+
+    symbols = [f"SYM{i:03d}" for i in range(args.symbols)]
+    bars = {symbol: synthetic_bars(args.bars, seed=i) for i, symbol in enumerate(symbols)}
+    history = {symbol: {"H1": df.iloc[:args.window]} for symbol, df in bars.items()}
+    feed = ReplayBarFeed({symbol: {"H1": df.iloc[args.window:]} for symbol, df in bars.items()})
+
+    with Scanner(STRATEGY, INDICATORS, symbols, window=args.window, workers=args.workers,
+                 history=history) as scanner:
+        report = asyncio.run(scanner.run(feed))
+
+    latency = report["latency_us"]
+    print(f"symbols {report['symbols']}  workers {report['workers']}  scans {report['scans']}  "
+          f"signals {report['signals']}")
+    print(f"scan latency mean {latency['mean'] / 1000:.2f} ms  p50 {latency['p50'] / 1000:.2f} ms  "
+          f"p99 {latency['p99'] / 1000:.2f} ms  max {latency['max'] / 1000:.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
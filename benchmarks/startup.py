@@ -0,0 +1,86 @@
+"""
+Startup time of the engine and of the common CLI commands.
+
+    python benchmarks/startup.py [--repeat 10]
+
+Each case runs in a fresh interpreter. The median wall time is compared with
+its budget and the script exits non-zero when a budget is blown, so it can
+guard against a heavy import creeping back into module level.
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ENGINE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "engine")
+
+# Budget for `import app` alone, measured inside the interpreter.
+IMPORT_BUDGET_MS = 50
+
+# Budgets for full commands, interpreter start-up included.
+COMMAND_BUDGET_MS = {
+    "indicators": 250,
+    "validate": 250,
+}
+
+VALID_JOB = (
+    '{"id": "bench", "price": {"timeframes": ["H1"], "files": ["h1.csv"]},'
+    ' "indicators": [{"name": "ema", "indicator": "EMA", "timeframe": "H1", "params": {"timeperiod": 20}}],'
+    ' "signal": {"entry_timeframe": "H1",'
+    ' "buy_logic": {"type": "condition", "left": {"type": "column", "column": "close"}, "operator": ">", "right": {"type": "column", "column": "ema"}},'
+    ' "sell_logic": {"type": "condition", "left": {"type": "column", "column": "close"}, "operator": "<", "right": {"type": "column", "column": "ema"}}},'
+    ' "backtest": {"timeframe": "H1", "stop_loss": [{"type": "pips", "value": 20}], "take_profit": [{"type": "pips", "value": 40}]},'
+    ' "account": {"account_size": 10000, "lot_size": 1}}\n'
+)
+
+
+def time_import(repeat):
+    code = "import time; t = time.perf_counter(); import app; print(time.perf_counter() - t)"
+    samples = []
+    for _ in range(repeat):
+        out = subprocess.run([sys.executable, "-c", code], cwd=ENGINE_DIR, check=True,
+                             capture_output=True, text=True).stdout
+        samples.append(float(out) * 1000)
+    return statistics.median(samples)
+
+
+def time_command(argv, repeat):
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        subprocess.run([sys.executable, "cli.py", *argv], cwd=ENGINE_DIR, check=True,
+                       capture_output=True)
+        samples.append((time.perf_counter() - started) * 1000)
+    return statistics.median(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+
+    with tempfile.NamedTemporaryFile("w", suffix=".jsonl", delete=False) as f:
+        f.write(VALID_JOB)
+        jobs_path = f.name
+
+    results = [("import app", time_import(args.repeat), IMPORT_BUDGET_MS)]
+    results.append(("cli indicators", time_command(["indicators", "--patterns"], args.repeat),
+                    COMMAND_BUDGET_MS["indicators"]))
+    results.append(("cli validate", time_command(["validate", jobs_path], args.repeat),
+                    COMMAND_BUDGET_MS["validate"]))
+    os.unlink(jobs_path)
+
+    over_budget = False
+    for name, median_ms, budget_ms in results:
+        status = "ok" if median_ms <= budget_ms else "OVER BUDGET"
+        over_budget |= median_ms > budget_ms
+        print(f"{name:<16} {median_ms:8.1f} ms   budget {budget_ms:5d} ms   {status}")
+
+    return 1 if over_budget else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,28 +1,51 @@
 from abc import ABC, abstractmethod
-from datetime import datetime, timedelta
-from dateutil.relativedelta import relativedelta
-import pytz
+from datetime import datetime, timedelta, timezone
 import time
-import pandas as pd
-from indicator_registry import  INDICATOR_REGISTRY
-from technical_indicators import IndicatorExecutor, IndicatorValidator, ColumnWriter
-from trade_signal import generate_signal
-from backtest import run_backtest
-from backtest_metrics import compute_backtest_metrics
+from indicator_registry import get_registry
+
+# pandas, TA-Lib, dateutil/pytz and the registry are imported or built on the
+# first operation that needs them, so listing indicators or validating a
+# config from the CLI stays fast.
 
 class Engine(ABC):
     _price_config: dict = {}
     _price_data: dict = {}
     _is_connected = False
-    _registry = INDICATOR_REGISTRY
-    _executor = IndicatorExecutor(INDICATOR_REGISTRY)
+    _shared_executor = None
     _user_indicators = {}
     _pip_size = 0
     _pip_value = 0
     _tick_size = 0
     _tick_value = 0
+    _data_version = 0
+    _session_cache = None
+    _pipeline = None
     _backtest = None
     _backtest_metrics = None
+    _backtest_spec = None
+    _accumulator = None
+    _equity = None
+
+    def __init__(self):
+        # per-instance state so several engines can live in one process
+        self._price_config = {}
+        self._price_data = {}
+        self._user_indicators = {}
+        # bumped on every price data change, keys the session level cache
+        self._data_version = 0
+        self._session_cache = None
+        self._pipeline = None
+
+    @property
+    def _registry(self):
+        return get_registry()
+
+    @property
+    def _executor(self):
+        if Engine._shared_executor is None:
+            from technical_indicators import IndicatorExecutor
+            Engine._shared_executor = IndicatorExecutor(self._registry)
+        return Engine._shared_executor
 
     def _connect(self):
         print("connection established")
@@ -36,12 +59,35 @@ class Engine(ABC):
         self._price_config = config
         for idx, tf in enumerate(config.get("timeframes", [])):
             self._price_data[tf] = config.get("custom_prices", [])[idx]
+        self._data_version += 1
+
+        # optional symbol metadata, otherwise the backtest has no pip sizing
+        self._pip_size = config.get("pip_size", self._pip_size)
+        self._pip_value = config.get("pip_value", self._pip_value)
+        self._tick_size = config.get("tick_size", self._tick_size)
+        self._tick_value = config.get("tick_value", self._tick_value)
 
     def set_price_data(self, config: dict):
         if not self._is_connected:
             return 'connection is required to set price configuration'
         self._price_config = config
         self._set_price_data()
+        self._data_version += 1
+
+    def append_price_data(self, timeframe, rows):
+        """
+        Append new bars to a loaded timeframe (rows with an existing time
+        replace the old bar). Cached session levels are recomputed on the
+        next set_signal; indicators need set_technical_indicators again.
+        """
+        import pandas as pd
+
+        if timeframe not in self._price_data:
+            raise ValueError(f"Timeframe '{timeframe}' does not exist in price data")
+        frame = pd.concat([self._price_data[timeframe], rows], ignore_index=True)
+        frame = frame.drop_duplicates("time", keep="last").sort_values("time", kind="stable")
+        self._price_data[timeframe] = frame.reset_index(drop=True)
+        self._data_version += 1
 
     def get_price(self, tf=None):
         if not self._is_connected and not self._price_config.get("is_custom"):
@@ -52,18 +98,25 @@ class Engine(ABC):
         return self._price_data[tf]
 
     def set_technical_indicators(self, indicators):
-        if not self._is_connected:
+        if not self._is_connected and not self._price_config.get("is_custom"):
             return 'connection is required to set price configuration'
+        from technical_indicators import IndicatorValidator, ColumnWriter
+        from specs import compile_indicator
+
+        # validate every config before computing anything
         validator = IndicatorValidator(self._registry, self._price_data)
+        compiled = []
         for cfg in indicators:
+            validator.validate(cfg)
+            compiled.append((cfg, compile_indicator(cfg, self._registry, self._price_data)))
+
+        for cfg, spec in compiled:
             # store the user-defined indicator
-            self._user_indicators[cfg["name"]] = cfg
+            self._user_indicators[spec.name] = cfg
 
-            # validate and compute
-            validator.validate(cfg)
-            df = self._price_data[cfg["timeframe"]]
-            values, outputs = self._executor.run(df, cfg)
-            ColumnWriter.write(df, cfg["name"], outputs, values)
+            df = self._price_data[spec.timeframe]
+            values = self._executor.run_spec(df, spec)
+            ColumnWriter.write(df, spec.name, spec.meta["outputs"], values)
 
     def get_indicator_output(self, timeframe, name):
         """
@@ -96,27 +149,98 @@ class Engine(ABC):
         return columns
 
     def set_signal(self, signal):
-        generate_signal(self._price_data, signal)
+        from trade_signal import SessionLevelCache, generate_signal
+        from specs import compile_signal
+
+        spec = compile_signal(signal, self._price_data)
+        if self._session_cache is None:
+            self._session_cache = SessionLevelCache()
+        generate_signal(self._price_data, spec, self._session_cache, self._data_version)
         
+    def _symbol_spec(self):
+        from specs import compile_symbol
+
+        return compile_symbol({
+            "pip_size": self._pip_size,
+            "pip_value": self._pip_value,
+            "tick_size": self._tick_size,
+            "tick_value": self._tick_value
+        })
+
     def run_backtest(self, backtest_config, account_config):
-        self._backtest = run_backtest(
-            self._price_data[backtest_config.get("timeframe")],
-            pip_size=self._pip_size,
-            pip_value=self._pip_value,
-            tick_size=self._tick_size,
-            tick_value=self._tick_value,
-            account_size=account_config.get("account_size"),
-            lot_size=account_config.get("lot_size"),
-            spread_pips=account_config.get("spread_pips"),
-            slippage_pips=account_config.get("slippage_pips"),
-            config=backtest_config,
-            mode=backtest_config.get("mode")
-        )
-        
-        self._backtest_metrics = compute_backtest_metrics(self._backtest)
+        self._run_trades(backtest_config, account_config)
+        self._backtest_metrics = self._final_metrics()
         
         return self._backtest_metrics
 
+    def get_live_metrics(self):
+        """Metrics of the trades closed so far, readable while run_backtest runs (e.g. from another thread)"""
+        if self._accumulator is None:
+            raise ValueError("Run a backtest first")
+        return self._accumulator.metrics()
+
+    def _run_trades(self, backtest_config, account_config):
+        from backtest import run_backtest, run_backtest_events, run_backtest_sharded
+        from backtest_metrics import MetricsAccumulator
+        from specs import compile_account, compile_backtest
+
+        # validated and folded once, the loop only reads the frozen spec
+        spec = compile_backtest(backtest_config, compile_account(account_config), self._symbol_spec())
+        self._backtest_spec = spec
+        self._accumulator = MetricsAccumulator()
+
+        # same trades as run_backtest: time-sharded across a process pool,
+        # or jumping from signal to signal and exit to exit
+        backtester = run_backtest
+        if spec.shards:
+            backtester = run_backtest_sharded
+        elif spec.events:
+            backtester = run_backtest_events
+        self._backtest = backtester(self._price_data[spec.timeframe], spec, accumulator=self._accumulator)
+
+        self._equity = None
+        if spec.mark_to_market:
+            self._backtest, self._equity = self._backtest
+
+    def _final_metrics(self):
+        from backtest_metrics import compute_backtest_metrics
+
+        if not self._backtest_spec.store_trades:
+            # trades were not kept, the streamed metrics are the result
+            return self._accumulator.metrics()
+        return compute_backtest_metrics(self._backtest, equity=self._equity)
+
+    @property
+    def pipeline(self):
+        """Incremental price -> indicators -> signal -> trades -> metrics graph"""
+        if self._pipeline is None:
+            from pipeline import Pipeline
+            self._pipeline = Pipeline(self)
+        return self._pipeline
+
+    def export_results(self, folder, compression=None):
+        """Price frames, trades, equity and metrics as Arrow IPC files (see arrow_export)"""
+        from arrow_export import export_backtest
+
+        return export_backtest(self, folder, compression=compression)
+
+    def get_rolling_metrics(self, window, by="trades"):
+        """Rolling Sharpe/Sortino/win rate/profit factor/drawdown of the last backtest"""
+        from rolling_metrics import compute_rolling_metrics
+
+        if self._backtest is None:
+            raise ValueError("Run a backtest first")
+        if not self._backtest_spec.store_trades:
+            raise ValueError("Rolling metrics need the trades, run the backtest with store_trades=True "
+                             "(get_live_metrics has the streamed totals)")
+        return compute_rolling_metrics(self._backtest, window, by=by)
+
+class CustomEngine(Engine):
+    """Engine fed only through set_custom_price_data (files, notebooks, batch jobs)."""
+
+    def _set_price_data(self):
+        raise ValueError("CustomEngine has no price source, use set_custom_price_data")
+
 class MT5Engine(Engine):
     __mt5 = {}
     def __init__(self, mt5):
@@ -129,8 +253,19 @@ class MT5Engine(Engine):
         time.sleep(2)
 
     def _set_price_data(self):
-        daterange = self._price_config.get("daterange")
-        start_time, end_time = get_time_range(daterange)
+        import pandas as pd
+
+        if self._price_config.get("start"):
+            # explicit range, reproducible (daterange is relative to now); no end means up to now
+            start_time = _utc_datetime(self._price_config["start"])
+            end = self._price_config.get("end")
+            end_time = _utc_datetime(end) if end else datetime.now(timezone.utc)
+            if end_time <= start_time:
+                raise ValueError(f"price: end {end_time} is not after start {start_time}")
+        elif self._price_config.get("end"):
+            raise ValueError("price: 'end' needs a 'start'")
+        else:
+            start_time, end_time = get_time_range(self._price_config.get("daterange"))
         timeframes = self._price_config.get("timeframes")
         symbol = self._price_config.get("symbol")
         
@@ -144,7 +279,8 @@ class MT5Engine(Engine):
         if ticks is None or len(ticks) == 0:
             raise ValueError("No tick data retrieved. Please check symbol and connection.")
     
-        tick_df = pd.DataFrame(ticks)
+        # only the fields the bar join reads
+        tick_df = pd.DataFrame({field: ticks[field] for field in ('time', 'bid', 'ask')})
         tick_df['time'] = pd.to_datetime(tick_df['time'], unit='s')
         tick_df = tick_df.sort_values('time')
     
@@ -176,9 +312,19 @@ def get_mt5_timeframe(mt5, tf_string):
     }
     return mapping.get(tf_string, None)
 
-def get_time_range(offset_str):
+def _utc_datetime(value):
+    """UTC datetime of a date string or timestamp; naive values are taken as UTC"""
+    import pandas as pd
+
+    ts = pd.Timestamp(value)
+    ts = ts.tz_localize("UTC") if ts.tzinfo is None else ts.tz_convert("UTC")
+    return ts.to_pydatetime()
+
+
+def get_time_range(offset_str, now=None):
     """
-    Returns (start_time, end_time) in UTC.
+    Returns (start_time, end_time) in UTC, relative to now (default: the
+    current time).
 
     Supported offset_str:
     - '5M' = 5 months
@@ -190,8 +336,12 @@ def get_time_range(offset_str):
     start_time is set to 00:00:00
     end_time is current UTC time
     """
+    import pytz
+    from dateutil.relativedelta import relativedelta
+
     tz = pytz.utc
-    now = datetime.now(tz)
+    if now is None:
+        now = datetime.now(tz)
 
     unit = offset_str[-1].upper()
     value = int(offset_str[:-1])
@@ -216,6 +366,9 @@ def get_time_range(offset_str):
     return start_time, end_time
 
 def is_daterange_greater_than(daterange, years=0, months=0):
+    import pytz
+    from dateutil.relativedelta import relativedelta
+
     now = datetime.now(pytz.utc)
     target_time, _ = get_time_range(daterange)
     threshold_time = now - relativedelta(years=years, months=months)
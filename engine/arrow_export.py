@@ -0,0 +1,164 @@
+"""
+Arrow IPC export of backtest inputs and results.
+
+Price frames (with their indicator and signal columns), the trades frame,
+the equity curves and the metrics are written as Arrow IPC files (Feather
+v2), optionally compressed with lz4 or zstd. Uncompressed files read back
+memory mapped: columns are views into the page cache, so several processes
+or a web server can share one export without copying or parsing.
+
+    paths = export_backtest(engine, "results/run-42", compression="zstd")
+    trades = read_table(paths["trades"]).to_pandas()
+
+    body = ipc_stream(engine.get_price("H1"))   # bytes for an HTTP response
+
+pyarrow is imported on first use.
+"""
+import os
+
+import numpy as np
+
+BATCH_ROWS = 65536
+
+
+# ==============================
+# WRITING
+# ==============================
+
+def _table(df):
+    import pyarrow as pa
+
+    return pa.Table.from_pandas(df, preserve_index=False)
+
+
+def _options(compression):
+    import pyarrow as pa
+
+    return pa.ipc.IpcWriteOptions(compression=compression)
+
+
+def write_table(table, path, compression=None, batch_rows=BATCH_ROWS):
+    """Arrow IPC file of record batches; compression None, "lz4" or "zstd" """
+    import pyarrow as pa
+
+    with pa.OSFile(path, "wb") as sink:
+        with pa.ipc.new_file(sink, table.schema, options=_options(compression)) as writer:
+            writer.write_table(table, max_chunksize=batch_rows)
+    return path
+
+
+def export_frame(df, path, compression=None):
+    return write_table(_table(df), path, compression)
+
+
+def ipc_stream(df, compression=None, batch_rows=BATCH_ROWS):
+    """Arrow IPC stream bytes of a frame, e.g. an application/vnd.apache.arrow.stream response body"""
+    import pyarrow as pa
+
+    table = _table(df)
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema, options=_options(compression)) as writer:
+        writer.write_table(table, max_chunksize=batch_rows)
+    return sink.getvalue()
+
+
+def metrics_table(metrics):
+    """Scalar metrics in long form: section, metric, value (equity_curve is exported on its own)"""
+    import pyarrow as pa
+
+    sections, names, values = [], [], []
+
+    def walk(prefix, node):
+        for key, value in node.items():
+            if isinstance(value, dict):
+                walk(f"{prefix}.{key}", value)
+            elif not isinstance(value, (list, tuple, np.ndarray)):
+                sections.append(prefix)
+                names.append(key)
+                values.append(float(value))
+
+    for section, node in metrics.items():
+        if isinstance(node, dict):
+            walk(section, node)
+
+    return pa.table({
+        "section": pa.array(sections, pa.string()),
+        "metric": pa.array(names, pa.string()),
+        "value": pa.array(values, pa.float64())
+    })
+
+
+def export_backtest(engine, folder, compression=None):
+    """
+    Write everything the last backtest of an Engine produced:
+
+        folder/prices_<timeframe>.arrow   price frames with indicator and signal columns
+        folder/trades.arrow               run_backtest trades
+        folder/equity.arrow               closed-trade equity curve (exit_time, balance)
+        folder/mtm_equity.arrow           bar-level equity, with mark_to_market only
+        folder/metrics.arrow              scalar metrics (section, metric, value)
+
+    Returns {name: path}.
+    """
+    import pyarrow as pa
+
+    os.makedirs(folder, exist_ok=True)
+    paths = {}
+
+    for tf, df in engine._price_data.items():
+        paths[f"prices_{tf}"] = export_frame(df, os.path.join(folder, f"prices_{tf}.arrow"), compression)
+
+    trades = engine._backtest
+    if trades is not None and len(trades):
+        paths["trades"] = export_frame(trades, os.path.join(folder, "trades.arrow"), compression)
+
+        # same order as the metrics equity_curve
+        closed = trades.sort_values("exit_time", kind="stable")
+        equity = pa.table({
+            "exit_time": pa.array(closed["exit_time"].to_numpy()),
+            "balance": pa.array(closed["balance"].to_numpy(dtype=np.float64))
+        })
+        paths["equity"] = write_table(equity, os.path.join(folder, "equity.arrow"), compression)
+
+    if engine._equity is not None and engine._backtest_spec is not None:
+        bars = engine._price_data[engine._backtest_spec.timeframe].sort_values("time")
+        mtm = pa.table({
+            "time": pa.array(bars["time"].to_numpy()),
+            "equity": pa.array(np.asarray(engine._equity))
+        })
+        paths["mtm_equity"] = write_table(mtm, os.path.join(folder, "mtm_equity.arrow"), compression)
+
+    if engine._backtest_metrics:
+        paths["metrics"] = write_table(metrics_table(engine._backtest_metrics),
+                                       os.path.join(folder, "metrics.arrow"), compression)
+
+    return paths
+
+
+# ==============================
+# READING
+# ==============================
+
+def read_table(path, memory_map=True):
+    """
+    Arrow table of an exported file. Memory mapped by default: the columns
+    of an uncompressed file point into the map, nothing is copied or parsed
+    (compressed batches are decompressed on read).
+    """
+    import pyarrow as pa
+
+    source = pa.memory_map(path, "r") if memory_map else pa.OSFile(path, "rb")
+    return pa.ipc.open_file(source).read_all()
+
+
+def read_frame(path, memory_map=True):
+    return read_table(path, memory_map).to_pandas()
+
+
+def iter_batches(path):
+    """Record batches of an exported file one at a time, memory mapped"""
+    import pyarrow as pa
+
+    reader = pa.ipc.open_file(pa.memory_map(path, "r"))
+    for i in range(reader.num_record_batches):
+        yield reader.get_batch(i)
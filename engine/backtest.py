@@ -1,5 +1,12 @@
+import heapq
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
 import pandas as pd
 
+from specs import convert_to_pip  # noqa: F401  (kept importable from here)
+
 # ----------------------------
 # ATR calculation
 # ----------------------------
@@ -12,38 +19,103 @@ def compute_atr(df, period=14):
     atr = tr.rolling(period).mean()
     return atr.bfill()
 
-def convert_to_pip(dollar_risk, lot_size, tick_size, tick_value, point):
-    if tick_value == 0 or tick_size == 0:
-        print("Error: Tick value or tick size is zero.")
-        return 0
+# ----------------------------
+# Trade rules (shared by the backtest and the live loop)
+# ----------------------------
+def new_trade(entry_time, direction, entry_price, sl, tp, balance):
+    return {
+        "entry_time": entry_time,
+        "direction": direction,
+        "entry_price": entry_price,
+        "sl": sl,
+        "tp": tp,
+        "exit_time": None,
+        "exit_price": None,
+        "pnl": None,
+        "balance": balance,
+        "reason": None
+    }
+
+def exit_prices(direction, mode, row):
+    """(high, low) a trade is tested against; in tick mode longs sell on bid, shorts on ask"""
+    if mode=="tick":
+        high = row["ask"] if direction==1 else row["bid"]
+        low = row["bid"] if direction==1 else row["ask"]
+    else:
+        high = row["high"]
+        low = row["low"]
+    return high, low
+
+def check_exit(trade, high, low):
+    """Return (exit_price, reason); TP wins when both levels are touched in the same bar"""
+    exit_price = None
+    reason = None
 
-    pips = (dollar_risk / (tick_value * lot_size)) * (tick_size / point)
+    # SL hit
+    if trade["direction"]==1 and low <= trade["sl"]:
+        exit_price = trade["sl"]
+        reason = "SL"
+    elif trade["direction"]==-1 and high >= trade["sl"]:
+        exit_price = trade["sl"]
+        reason = "SL"
 
-    return pips * point
+    # TP hit
+    if trade["direction"]==1 and high >= trade["tp"]:
+        exit_price = trade["tp"]
+        reason = "TP"
+    elif trade["direction"]==-1 and low <= trade["tp"]:
+        exit_price = trade["tp"]
+        reason = "TP"
+
+    return exit_price, reason
+
+def close_trade(trade, exit_time, exit_price, reason, balance, spec):
+    """Fill the exit fields and return the new balance"""
+    pnl = (exit_price - trade["entry_price"])*trade["direction"]*spec.account.lot_size/spec.symbol.pip_size*spec.symbol.pip_value
+    balance += pnl
+    trade["exit_time"] = exit_time
+    trade["exit_price"] = exit_price
+    trade["pnl"] = pnl
+    trade["balance"] = balance
+    trade["reason"] = reason
+    return balance
+
+def _prepare_frame(price_data, spec):
+    df = price_data.sort_values("time").reset_index(drop=True)
+
+    # ATR for SL/TP if needed
+    if spec.uses_atr:
+        if spec.mode=="tick":
+            df["close"] = df["bid"]
+            df["high"] = df["bid"]
+            df["low"] = df["bid"]
+        df["atr"] = compute_atr(df, period=14)
+
+    return df
 
 # ----------------------------
 # Universal backtester
 # ----------------------------
-def run_backtest(price_data, pip_size, pip_value, tick_size, tick_value, account_size, lot_size, spread_pips, slippage_pips, config, mode="candle"):
+def run_backtest(price_data, spec, accumulator=None):
     """
     price_data: DataFrame with columns:
         - Candle: 'open','high','low','close','signal','time'
         - Tick: 'bid','ask','signal','time'
-    mode: "candle" or "tick"
+    spec: BacktestSpec from specs.compile_backtest (mode "candle" or "tick")
+    accumulator: optional MetricsAccumulator fed every closed trade, readable
+        during the run; with spec.store_trades off the trades are not kept
+
+    With spec.mark_to_market, also returns the float32 equity at every bar
+    and adds entry_bar/exit_bar/mae/mfe to the trades -> (trades, equity)
     """
-    balance = account_size
+    balance = spec.account.account_size
     trades = []
     open_trades = []
+    mode = spec.mode
+    single_trade_per_direction = spec.single_trade_per_direction
+    uses_atr = spec.uses_atr
 
-    df = price_data.sort_values("time").reset_index(drop=True)
-
-    # ATR for SL/TP if needed
-    if any(tp.get("type")=="atr" for tp in config.get("take_profit",[])) or any(sl.get("type")=="atr" for sl in config.get("stop_loss",[])):
-        if mode=="tick":
-            df["close"] = df["bid"]
-            df["high"] = df["bid"]
-            df["low"] = df["bid"]
-        df["atr"] = compute_atr(df, period=14)
+    df = _prepare_frame(price_data, spec)
 
     for idx, row in df.iterrows():
 
@@ -54,7 +126,7 @@ def run_backtest(price_data, pip_size, pip_value, tick_size, tick_value, account
             direction = row["signal"]
 
             # Check single trade per direction
-            if config.get("single_trade_per_direction", False):
+            if single_trade_per_direction:
                 if any(t["direction"] == direction for t in open_trades):
                     continue  # skip new trade for this direction
 
@@ -65,102 +137,381 @@ def run_backtest(price_data, pip_size, pip_value, tick_size, tick_value, account
                 entry_price = row["close"]
 
             # Apply slippage + spread
-            entry_price += (slippage_pips + spread_pips/2)*pip_size if direction==1 else -(slippage_pips + spread_pips/2)*pip_size
-
-            trade = {
-                "entry_time": row["time"],
-                "direction": direction,
-                "entry_price": entry_price,
-                "sl": None,
-                "tp": None,
-                "exit_time": None,
-                "exit_price": None,
-                "pnl": None,
-                "balance": balance,
-                "reason": None
-            }
-
-            # Compute SL
-            sl_prices = []
-            for sl_cfg in config.get("stop_loss", []):
-                if sl_cfg["type"]=="pips":
-                    price = entry_price - sl_cfg["value"]*pip_size if direction==1 else entry_price + sl_cfg["value"]*pip_size
-                    sl_prices.append(price)
-                elif sl_cfg["type"]=="fixed":
-                    price = entry_price - sl_cfg["value"] if direction==1 else entry_price + sl_cfg["value"]
-                    sl_prices.append(price)
-                elif sl_cfg["type"]=="dollar":
-                    price_move = convert_to_pip(sl_cfg["value"], lot_size, tick_size=tick_size, tick_value=tick_value, point=pip_size)
-                    price = entry_price - price_move if direction==1 else entry_price + price_move
-                    sl_prices.append(price)
-                elif sl_cfg["type"]=="atr":
-                    atr_val = row["atr"] * sl_cfg["multiplier"]
-                    price = entry_price - atr_val if direction==1 else entry_price + atr_val
-                    sl_prices.append(price)
-
-            trade["sl"] = min(sl_prices) if direction==1 else max(sl_prices)
-
-            # Compute TP
-            tp_prices = []
-            for tp_cfg in config.get("take_profit", []):
-                if tp_cfg["type"]=="pips":
-                    price = entry_price + tp_cfg["value"]*pip_size if direction==1 else entry_price - tp_cfg["value"]*pip_size
-                    tp_prices.append(price)
-                elif tp_cfg["type"]=="fixed":
-                    price = entry_price + tp_cfg["value"] if direction==1 else entry_price - tp_cfg["value"]
-                    tp_prices.append(price)
-                elif tp_cfg["type"]=="dollar":
-                    price_move = convert_to_pip(tp_cfg["value"], lot_size, tick_size=tick_size, tick_value=tick_value, point=pip_size)
-                    price = entry_price + price_move if direction==1 else entry_price - price_move
-                    tp_prices.append(price)
-                elif tp_cfg["type"]=="atr":
-                    atr_val = row["atr"] * tp_cfg["multiplier"]
-                    price = entry_price + atr_val if direction==1 else entry_price - atr_val
-                    tp_prices.append(price)
-
-            trade["tp"] = max(tp_prices) if direction==1 else min(tp_prices)
+            entry_price = spec.entry_price(entry_price, direction)
+
+            sl, tp = spec.levels(direction, entry_price, row["atr"] if uses_atr else None)
+            trade = new_trade(row["time"], direction, entry_price, sl, tp, balance)
+            trade["entry_bar"] = idx
             open_trades.append(trade)
 
         # --------------------------
         # Check open trades for exit
         # --------------------------
         for t in open_trades.copy():
-            if mode=="tick":
-                high = row["ask"] if t["direction"]==1 else row["bid"]
-                low = row["bid"] if t["direction"]==1 else row["ask"]
-            else:
-                high = row["high"]
-                low = row["low"]
-
-            exit_price = None
-            reason = None
-
-            # SL hit
-            if t["direction"]==1 and low <= t["sl"]:
-                exit_price = t["sl"]
-                reason = "SL"
-            elif t["direction"]==-1 and high >= t["sl"]:
-                exit_price = t["sl"]
-                reason = "SL"
-
-            # TP hit
-            if t["direction"]==1 and high >= t["tp"]:
-                exit_price = t["tp"]
-                reason = "TP"
-            elif t["direction"]==-1 and low <= t["tp"]:
-                exit_price = t["tp"]
-                reason = "TP"
+            high, low = exit_prices(t["direction"], mode, row)
+            exit_price, reason = check_exit(t, high, low)
 
             if exit_price is not None:
-                pnl = (exit_price - t["entry_price"])*t["direction"]*lot_size/pip_size*pip_value
-                balance += pnl
-                t["exit_time"] = row["time"]
-                t["exit_price"] = exit_price
-                t["pnl"] = pnl
-                t["balance"] = balance
-                t["reason"] = reason
-
-                trades.append(t)
+                balance = close_trade(t, row["time"], exit_price, reason, balance, spec)
+                t["exit_bar"] = idx
+                if accumulator is not None:
+                    accumulator.add(t)
+                if spec.store_trades:
+                    trades.append(t)
                 open_trades.remove(t)
 
-    return pd.DataFrame(trades)
+    return _backtest_result(df, trades, open_trades, spec)
+
+# ----------------------------
+# Time-sharded backtester
+# ----------------------------
+def run_backtest_sharded(price_data, spec, shards=None, workers=None, accumulator=None):
+    """
+    Same result as run_backtest, computed over time shards in a process pool.
+
+    Each shard finds, for every signal in it, the first bar/tick inside the
+    shard where its SL or TP is touched, and reports the entries still open
+    at the shard end. A sequential pass over the signals then decides which
+    entries are actually taken (single_trade_per_direction) and resolves the
+    carried positions into the following shards.
+    """
+    df = _prepare_frame(price_data, spec)
+    mode = spec.mode
+    n = len(df)
+    workers = workers or spec.workers or os.cpu_count() or 1
+    shards = shards or spec.shards
+    shards = max(1, min(shards or workers, n))
+
+    arrays = _hit_arrays(df, mode)
+    rows, directions, entries, sls, tps = _candidates(df, spec)
+
+    # parallel part: first hit of every candidate inside its own shard
+    bounds = np.linspace(0, n, shards + 1).astype(int)
+    shard_of = np.searchsorted(bounds, rows, side="right") - 1
+    tasks = []
+    for k in range(shards):
+        lo, hi = bounds[k], bounds[k+1]
+        sel = np.flatnonzero(shard_of == k)
+        tasks.append((
+            [a[lo:hi] for a in arrays],
+            rows[sel] - lo,
+            directions[sel],
+            [sls[j] for j in sel],
+            [tps[j] for j in sel]
+        ))
+
+    if workers == 1 or shards == 1:
+        scanned = [_scan_shard(task) for task in tasks]
+    else:
+        with ProcessPoolExecutor(max_workers=min(workers, shards)) as pool:
+            scanned = list(pool.map(_scan_shard, tasks))
+
+    first_hit = [None] * len(rows)
+    for k in range(shards):
+        sel = np.flatnonzero(shard_of == k)
+        for j, (row, tp_hit) in zip(sel, scanned[k]):
+            first_hit[j] = (row + bounds[k], tp_hit) if row >= 0 else None
+
+    def find(j, start):
+        return _first_hit(arrays, directions[j], sls[j], tps[j], start, n)
+
+    def next_hit(j, start):
+        if start == rows[j] and first_hit[j] is not None:
+            return first_hit[j]
+        if start == rows[j]:
+            # unresolved at its shard end, carry into the next shards
+            start = bounds[shard_of[j] + 1]
+        return find(j, start)
+
+    return _reconcile(df, spec, rows, directions, entries, sls, tps, next_hit, find, accumulator)
+
+# ----------------------------
+# Event-skipping backtester
+# ----------------------------
+def run_backtest_events(price_data, spec, accumulator=None):
+    """
+    Same result as run_backtest, visiting only signal bars and exit bars.
+
+    The first bar where a trade's SL or TP is touched comes from block
+    max/min tables with a sparse table over the blocks (_LevelIndex), so
+    the cost is O(trades * (block + log bars)) instead of bars * open trades.
+    """
+    df = _prepare_frame(price_data, spec)
+    arrays = _hit_arrays(df, spec.mode)
+    rows, directions, entries, sls, tps = _candidates(df, spec)
+
+    # (long high, long low, short high, short low); candle mode shares arrays
+    indexes = {}
+    for k, values in enumerate(arrays):
+        key = (id(values), k % 2)
+        if key not in indexes:
+            indexes[key] = _LevelIndex(values, upper=k % 2 == 0)
+    long_high, long_low, short_high, short_low = (indexes[(id(a), k % 2)] for k, a in enumerate(arrays))
+
+    def find(j, start):
+        if directions[j]==1:
+            sl_row = long_low.first(sls[j], start)
+            tp_row = long_high.first(tps[j], start, stop=sl_row + 1)
+        else:
+            sl_row = short_high.first(sls[j], start)
+            tp_row = short_low.first(tps[j], start, stop=sl_row + 1)
+        row = min(sl_row, tp_row)
+        if row == len(df):
+            return -1, False
+        return row, tp_row == row  # TP wins a tie, like check_exit
+
+    return _reconcile(df, spec, rows, directions, entries, sls, tps, find, find, accumulator)
+
+class _LevelIndex:
+    """
+    First row at or after start where values >= level (upper) or
+    values <= level (lower), in O(block + log n): scan the rest of the
+    current block, jump over whole blocks with a sparse table of block
+    maxima (minima), then scan the block that holds the hit.
+    NaN never crosses a level, as in the bar-by-bar comparisons.
+    """
+
+    def __init__(self, values, upper=True, block=64):
+        self.values = values
+        self.upper = upper
+        self.block = block
+        reduce = np.fmax if upper else np.fmin
+        n_blocks = -(-len(values) // block)
+        level = reduce.reduceat(values, np.arange(n_blocks) * block) if n_blocks else values[:0]
+        self.table = [level]
+        span = 1
+        while 2 * span <= n_blocks:
+            level = reduce(level[:-span], level[span:])
+            self.table.append(level)
+            span *= 2
+
+    def _crosses(self, values, level):
+        return values >= level if self.upper else values <= level
+
+    def first(self, level, start, stop=None):
+        """Row index, or stop (default len(values)) when nothing crosses before it"""
+        n = len(self.values)
+        stop = n if stop is None else min(stop, n)
+        block = self.block
+        pos = start
+        while pos < stop:
+            end = min((pos // block + 1) * block, stop)
+            hit = self._crosses(self.values[pos:end], level)
+            i = hit.argmax()
+            if hit[i]:
+                return pos + i
+            if end == stop:
+                break
+
+            # whole blocks that cannot cross, longest jumps first
+            blk = end // block
+            for k in range(len(self.table) - 1, -1, -1):
+                table = self.table[k]
+                if blk < len(table) and not self._crosses(table[blk], level):
+                    blk += 1 << k
+            pos = max(end, blk * block)
+        return stop
+
+def _candidates(df, spec):
+    """Rows, directions, entry prices and levels of every nonzero signal"""
+    signal = df["signal"].to_numpy()
+    rows = np.flatnonzero(signal != 0)
+
+    atr = df["atr"].to_numpy() if "atr" in df.columns else None
+    entry_src = (df["ask"].to_numpy(), df["bid"].to_numpy()) if spec.mode=="tick" else (df["close"].to_numpy(),) * 2
+    directions = signal[rows]
+    entries, sls, tps = [], [], []
+    for i, direction in zip(rows, directions):
+        entry_price = entry_src[0][i] if direction==1 else entry_src[1][i]
+        entry_price = spec.entry_price(entry_price, direction)
+        sl, tp = spec.levels(direction, entry_price, atr[i] if atr is not None else None)
+        entries.append(entry_price)
+        sls.append(sl)
+        tps.append(tp)
+    return rows, directions, entries, sls, tps
+
+def _reconcile(df, spec, rows, directions, entries, sls, tps, next_hit, find, accumulator=None):
+    """
+    Sequential pass over the candidate entries only: which are taken
+    (single_trade_per_direction) and when each closes. next_hit(j, row) is
+    the first hit of candidate j entered at row, find(j, start) the first
+    hit from start on; both return (row, tp_hit) or (-1, False).
+    """
+    n = len(df)
+    times = df["time"]
+    single = spec.single_trade_per_direction
+    open_heap = []  # (exit row, entry row, candidate, tp hit)
+    open_count = {1: 0, -1: 0}
+    closed = []
+
+    def push(j, hit):
+        row, tp_hit = hit if hit[0] >= 0 else (n, False)
+        heapq.heappush(open_heap, (row, rows[j], j, tp_hit))
+
+    for j, r in enumerate(rows):
+        while open_heap and open_heap[0][0] < r:
+            item = heapq.heappop(open_heap)
+            closed.append(item)
+            open_count[directions[item[2]]] -= 1
+
+        if single and open_count[directions[j]] > 0:
+            # blocked entry: run_backtest skips the whole row, exits included
+            while open_heap and open_heap[0][0] == r:
+                _, _, k, _ = heapq.heappop(open_heap)
+                push(k, find(k, r + 1))
+            continue
+
+        push(j, next_hit(j, r))
+        open_count[directions[j]] += 1
+        while open_heap and open_heap[0][0] == r:
+            item = heapq.heappop(open_heap)
+            closed.append(item)
+            open_count[directions[item[2]]] -= 1
+
+    while open_heap and open_heap[0][0] < n:
+        closed.append(heapq.heappop(open_heap))
+
+    # balance path in the order run_backtest closes trades
+    balance = spec.account.account_size
+    trades = []
+    for exit_row, entry_row, j, tp_hit in sorted(closed, key=lambda c: (c[0], c[1])):
+        t = new_trade(times.iat[entry_row], directions[j], entries[j], sls[j], tps[j], balance)
+        t["entry_bar"] = entry_row
+        balance = close_trade(t, times.iat[exit_row], tps[j] if tp_hit else sls[j], "TP" if tp_hit else "SL",
+                              balance, spec)
+        t["exit_bar"] = exit_row
+        if accumulator is not None:
+            accumulator.add(t)
+        if spec.store_trades:
+            trades.append(t)
+
+    still_open = []
+    for _, entry_row, j, _ in sorted(open_heap, key=lambda c: c[1]):
+        t = new_trade(times.iat[entry_row], directions[j], entries[j], sls[j], tps[j], balance)
+        t["entry_bar"] = entry_row
+        still_open.append(t)
+
+    return _backtest_result(df, trades, still_open, spec)
+
+def _hit_arrays(df, mode):
+    """(long high, long low, short high, short low) as tested by check_exit"""
+    if mode=="tick":
+        bid = df["bid"].to_numpy()
+        ask = df["ask"].to_numpy()
+        return ask, bid, bid, ask
+    high = df["high"].to_numpy()
+    low = df["low"].to_numpy()
+    return high, low, high, low
+
+def _first_hit(arrays, direction, sl, tp, start, stop, chunk=64):
+    """First row in [start, stop) where SL or TP is touched: (row, tp_hit) or (-1, False)"""
+    high, low = (arrays[0], arrays[1]) if direction==1 else (arrays[2], arrays[3])
+    pos = start
+    while pos < stop:
+        end = min(pos + chunk, stop)
+        h = high[pos:end]
+        l = low[pos:end]
+        if direction==1:
+            tp_hit = h >= tp
+            hit = (l <= sl) | tp_hit
+        else:
+            tp_hit = l <= tp
+            hit = (h >= sl) | tp_hit
+        k = hit.argmax()
+        if hit[k]:
+            return pos + k, bool(tp_hit[k])
+        pos = end
+        chunk *= 2
+    return -1, False
+
+def _scan_shard(task):
+    arrays, rows, directions, sls, tps = task
+    stop = len(arrays[0])
+    return [
+        _first_hit(arrays, direction, sl, tp, row, stop)
+        for row, direction, sl, tp in zip(rows, directions, sls, tps)
+    ]
+
+# ----------------------------
+# Results and mark-to-market equity
+# ----------------------------
+def _backtest_result(df, trades, open_trades, spec):
+    trades_df = pd.DataFrame(trades)
+    if not spec.mark_to_market:
+        return trades_df.drop(columns=["entry_bar", "exit_bar"], errors="ignore")
+
+    equity, mae, mfe = compute_mark_to_market(df, trades, open_trades, spec)
+    if len(trades_df):
+        trades_df["mae"] = mae[:len(trades)]
+        trades_df["mfe"] = mfe[:len(trades)]
+    return trades_df, equity
+
+def compute_mark_to_market(df, trades, open_trades, spec):
+    """
+    Equity at every bar (float32) = account + realized PnL + open PnL, built
+    from per-trade entry/exit bar indices with cumulative sums of position
+    exposure instead of a bar loop. Longs are marked at the bid and shorts
+    at the ask in tick mode, both at the close in candle mode.
+
+    Also returns MAE/MFE (price distance) of every trade over its
+    [entry_bar, exit_bar] range; trades still open run to the last bar.
+    """
+    n = len(df)
+    if n == 0:
+        return np.zeros(0, dtype=np.float32), np.zeros(0), np.zeros(0)
+
+    every = list(trades) + list(open_trades)
+    entry_bar = np.array([t["entry_bar"] for t in every], dtype=np.intp)
+    exit_bar = np.array([t.get("exit_bar", n) for t in every], dtype=np.intp)
+    direction = np.array([t["direction"] for t in every], dtype=np.float64)
+    entry_price = np.array([t["entry_price"] for t in every], dtype=np.float64)
+    mode = spec.mode
+    value_per_price = spec.account.lot_size / spec.symbol.pip_size * spec.symbol.pip_value
+
+    # realized PnL lands on the exit bar
+    realized = np.zeros(n + 1)
+    np.add.at(realized, exit_bar[:len(trades)], [t["pnl"] for t in trades])
+    realized = np.cumsum(realized[:n])
+
+    # open quantity and entry basis per side: +1 on entry, -1 on exit (exit bar is realized)
+    long_qty, long_basis, short_qty, short_basis = (np.zeros(n + 1) for _ in range(4))
+    is_long = direction == 1
+    for qty, basis, sel in ((long_qty, long_basis, is_long), (short_qty, short_basis, ~is_long)):
+        np.add.at(qty, entry_bar[sel], 1.0)
+        np.add.at(qty, exit_bar[sel], -1.0)
+        np.add.at(basis, entry_bar[sel], entry_price[sel])
+        np.add.at(basis, exit_bar[sel], -entry_price[sel])
+
+    if mode=="tick":
+        long_mark = df["bid"].to_numpy(dtype=np.float64)
+        short_mark = df["ask"].to_numpy(dtype=np.float64)
+    else:
+        long_mark = short_mark = df["close"].to_numpy(dtype=np.float64)
+
+    unrealized = (
+        (long_mark * np.cumsum(long_qty)[:n] - np.cumsum(long_basis)[:n])
+        - (short_mark * np.cumsum(short_qty)[:n] - np.cumsum(short_basis)[:n])
+    ) * value_per_price
+    equity = (spec.account.account_size + realized + unrealized).astype(np.float32)
+
+    # MAE/MFE from range extrema over the same index ranges
+    long_high, long_low, short_high, short_low = _hit_arrays(df, mode)
+    last = np.minimum(exit_bar, n - 1)
+    mae = np.empty(len(every))
+    mfe = np.empty(len(every))
+    if is_long.any():
+        mae[is_long] = entry_price[is_long] - _range_reduce(np.minimum, long_low, entry_bar[is_long], last[is_long])
+        mfe[is_long] = _range_reduce(np.maximum, long_high, entry_bar[is_long], last[is_long]) - entry_price[is_long]
+    if (~is_long).any():
+        mae[~is_long] = _range_reduce(np.maximum, short_high, entry_bar[~is_long], last[~is_long]) - entry_price[~is_long]
+        mfe[~is_long] = entry_price[~is_long] - _range_reduce(np.minimum, short_low, entry_bar[~is_long], last[~is_long])
+
+    return equity, mae, mfe
+
+def _range_reduce(ufunc, values, starts, stops):
+    """ufunc.reduce over values[start:stop + 1] for every pair, in one reduceat call"""
+    extended = np.append(np.asarray(values, dtype=np.float64), 0.0)
+    idx = np.empty(2 * len(starts), dtype=np.intp)
+    idx[0::2] = starts
+    idx[1::2] = stops + 1
+    return ufunc.reduceat(extended, idx)[0::2]
@@ -1,19 +1,21 @@
+import threading
+
 import numpy as np
 
-sessions = {
-    "Asia": ("00:00", "08:00"),
-    "London": ("08:00", "16:00"),
-    "New_York": ("13:00", "21:00")
-}
+from session_calendar import SESSION_CALENDAR, SessionCalendar
+
+# session breakdown by entry time, hours from the session calendar
+sessions = {cfg["label"]: (cfg["start"], cfg["end"]) for cfg in SESSION_CALENDAR.values()}
 
 # ----------------------------
 # Compute all metrics
 # ----------------------------
-def compute_backtest_metrics(trades_df, sessions=sessions):
+def compute_backtest_metrics(trades_df, sessions=sessions, equity=None):
     if trades_df.empty:
         return {}
 
-    df = trades_df.copy().sort_values("exit_time").reset_index(drop=True)
+    # stable: trades closed on the same bar keep their closing order
+    df = trades_df.copy().sort_values("exit_time", kind="stable").reset_index(drop=True)
 
     # ==============================
     # TRADE STATS
@@ -98,6 +100,8 @@ def compute_backtest_metrics(trades_df, sessions=sessions):
             temp = 0
     risk_metrics['drawdown_duration_trades'] = dd_duration
 
+    _mtm_drawdown(risk_metrics, equity)
+
     avg_loss = abs(pnl_metrics['average_loss'])
     edge = pnl_metrics['expected_value']
 
@@ -144,24 +148,17 @@ def compute_backtest_metrics(trades_df, sessions=sessions):
     session_metrics = {}
 
     if sessions is not None:
-        df['entry_hour'] = df['entry_time'].dt.hour + df['entry_time'].dt.minute/60
-
-        for name, (start, end) in sessions.items():
-            start_h, start_m = map(int, start.split(":"))
-            end_h, end_m = map(int, end.split(":"))
+        calendar = SessionCalendar(sessions)
+        codes = calendar.codes(df['entry_time'])
+        pnl = df['pnl'].to_numpy()
 
-            start_decimal = start_h + start_m/60
-            end_decimal = end_h + end_m/60
-
-            s_df = df[
-                (df['entry_hour'] >= start_decimal) &
-                (df['entry_hour'] < end_decimal)
-            ]
+        for name in calendar.names:
+            s_pnl = pnl[calendar.mask(codes, name)]
 
             session_metrics[name] = {
-                "total_trades": len(s_df),
-                "net_profit": s_df['pnl'].sum(),
-                "win_rate": (len(s_df[s_df['pnl']>0]) / len(s_df)) if len(s_df)>0 else 0
+                "total_trades": len(s_pnl),
+                "net_profit": s_pnl.sum(),
+                "win_rate": (int(np.count_nonzero(s_pnl > 0)) / len(s_pnl)) if len(s_pnl) > 0 else 0
             }
 
     # ==============================
@@ -176,9 +173,239 @@ def compute_backtest_metrics(trades_df, sessions=sessions):
         "equity_curve": df['equity'].tolist()
     }
 
+# ----------------------------
+# Streaming accumulator
+# ----------------------------
+class MetricsAccumulator:
+    """
+    The compute_backtest_metrics dict, updated one closed trade at a time
+    (in closing order) instead of from the finished trades DataFrame.
+
+    metrics() can be read at any point of a run, also from another thread:
+    add() and metrics() take the same lock, so a read never sees a trade
+    half applied. At the end it holds the same keys and values as
+    compute_backtest_metrics on the same trades, up to float summation
+    order in the sums and means.
+    """
+
+    def __init__(self, sessions=sessions):
+        self._lock = threading.Lock()
+        self.calendar = SessionCalendar(sessions or {})
+        self.session_stats = {name: [0, 0.0, 0] for name in self.calendar.names}  # trades, net, wins
+
+        self.count = 0
+        self.buys = 0
+        self.sells = 0
+        self.wins = 0
+        self.losses = 0
+        self.win_streak = 0
+        self.loss_streak = 0
+        self.max_win_streak = 0
+        self.max_loss_streak = 0
+
+        self.gross_profit = 0.0
+        self.gross_loss = 0.0
+        self.net_profit = 0.0
+        self.largest_win = -np.inf
+        self.largest_loss = np.inf
+        self.starting_balance = None
+        self.duration_sum = 0.0
+        self.months = set()
+
+        # equity peak and drawdown over the closed-trade balance
+        self.equity = []
+        self.peak = -np.inf
+        self.max_drawdown = np.inf
+        self.max_drawdown_pct = np.nan
+        self.dd_run = 0
+        self.dd_duration = 0
+
+        self.daily = {}
+        self.rr = [0.0, 0]              # sum, count (NaN skipped like Series.mean)
+        self.rr_weighted = [0.0, 0.0]   # sum(rr * |pnl|), sum(|pnl|)
+        self.efficiency = [0.0, 0]
+
+    def add(self, trade):
+        with self._lock:
+            self._add(trade)
+
+    def metrics(self, equity=None):
+        with self._lock:
+            return self._metrics(equity)
+
+    def _add(self, trade):
+        pnl = trade["pnl"]
+        balance = trade["balance"]
+        exit_time = trade["exit_time"]
+        entry_time = trade["entry_time"]
+
+        if self.starting_balance is None:
+            self.starting_balance = balance - pnl
+        self.count += 1
+        self.buys += trade["direction"] == 1
+        self.sells += trade["direction"] == -1
+
+        # counts, streaks and gross PnL
+        if pnl > 0:
+            self.wins += 1
+            self.gross_profit += pnl
+            self.win_streak += 1
+            self.max_win_streak = max(self.max_win_streak, self.win_streak)
+        else:
+            self.win_streak = 0
+        if pnl < 0:
+            self.losses += 1
+            self.gross_loss += pnl
+            self.loss_streak += 1
+            self.max_loss_streak = max(self.max_loss_streak, self.loss_streak)
+        else:
+            self.loss_streak = 0
+        self.net_profit += pnl
+        self.largest_win = max(self.largest_win, pnl)
+        self.largest_loss = min(self.largest_loss, pnl)
+
+        self.duration_sum += (exit_time - entry_time).total_seconds() / 60
+        self.months.add((exit_time.year, exit_time.month))
+
+        # equity peak and drawdown
+        self.equity.append(balance)
+        self.peak = max(self.peak, balance)
+        drawdown = balance - self.peak
+        self.max_drawdown = min(self.max_drawdown, drawdown)
+        drawdown_pct = drawdown / self.peak * 100 if self.peak != 0 else np.nan
+        self.max_drawdown_pct = np.fmin(self.max_drawdown_pct, drawdown_pct)
+        self.dd_run = self.dd_run + 1 if drawdown < 0 else 0
+        self.dd_duration = max(self.dd_duration, self.dd_run)
+
+        # daily PnL buckets
+        day = exit_time.date()
+        self.daily[day] = self.daily.get(day, 0.0) + pnl
+
+        # reward/risk and efficiency, NaN skipped like the DataFrame means
+        with np.errstate(divide="ignore", invalid="ignore"):
+            rr = np.float64(abs(trade["tp"] - trade["entry_price"])) / abs(trade["entry_price"] - trade["sl"])
+            weighted = rr * abs(pnl)
+            efficiency = np.float64(pnl) / abs(trade["exit_price"] - trade["entry_price"])
+        if not np.isnan(rr):
+            self.rr[0] += rr
+            self.rr[1] += 1
+        if not np.isnan(weighted):
+            self.rr_weighted[0] += weighted
+        self.rr_weighted[1] += abs(pnl)
+        if not np.isnan(efficiency):
+            self.efficiency[0] += efficiency
+            self.efficiency[1] += 1
+
+        # session buckets by entry time
+        code = self.calendar.code(entry_time)
+        for name, bit in self.calendar.bits.items():
+            if code >> bit & 1:
+                stats = self.session_stats[name]
+                stats[0] += 1
+                stats[1] += pnl
+                stats[2] += pnl > 0
+
+    def _metrics(self, equity):
+        if self.count == 0:
+            return {}
+
+        trade_stats = {
+            "total_trades": self.count,
+            "total_buy_trades": self.buys,
+            "total_sell_trades": self.sells,
+            "winning_trades": self.wins,
+            "losing_trades": self.losses,
+            "win_rate": self.wins / self.count,
+            "loss_rate": self.losses / self.count,
+            "max_consecutive_wins": self.max_win_streak,
+            "max_consecutive_losses": self.max_loss_streak,
+            "average_trade_duration_min": self.duration_sum / self.count,
+            "trades_per_month": self.count / len(self.months)
+        }
+
+        pnl_metrics = {
+            "gross_profit": self.gross_profit,
+            "gross_loss": self.gross_loss,
+            "net_profit": self.net_profit,
+            "largest_win": self.largest_win,
+            "largest_loss": self.largest_loss,
+            "average_win": self.gross_profit / self.wins if self.wins > 0 else 0,
+            "average_loss": self.gross_loss / self.losses if self.losses > 0 else 0
+        }
+        pnl_metrics["profit_factor"] = (
+            pnl_metrics["gross_profit"] / abs(pnl_metrics["gross_loss"])
+            if pnl_metrics["gross_loss"] != 0 else np.inf
+        )
+        pnl_metrics["expected_value"] = (
+            pnl_metrics["average_win"] * trade_stats["win_rate"] +
+            pnl_metrics["average_loss"] * trade_stats["loss_rate"]
+        )
+        pnl_metrics["expectancy"] = (
+            pnl_metrics["average_win"] * trade_stats["win_rate"] -
+            abs(pnl_metrics["average_loss"]) * trade_stats["loss_rate"]
+        )
+        pnl_metrics["return_on_account"] = pnl_metrics["net_profit"] / self.starting_balance
+
+        risk_metrics = {
+            "max_drawdown": self.max_drawdown,
+            "max_drawdown_pct": self.max_drawdown_pct,
+            "drawdown_duration_trades": self.dd_duration
+        }
+        _mtm_drawdown(risk_metrics, equity)
+        avg_loss = abs(pnl_metrics["average_loss"])
+        edge = pnl_metrics["expected_value"]
+        risk_metrics["risk_of_ruin"] = (
+            np.exp(-2 * edge * self.starting_balance / (avg_loss ** 2))
+            if avg_loss != 0 else 0
+        )
+
+        daily_returns = np.fromiter(self.daily.values(), dtype=np.float64)
+        mean_daily = daily_returns.mean()
+        std_daily = _sample_std(daily_returns)
+        downside = daily_returns[daily_returns < 0]
+        downside_std = _sample_std(downside)
+        performance_metrics = {
+            "sharpe_ratio": mean_daily / std_daily if std_daily != 0 else 0,
+            "sortino_ratio": mean_daily / downside_std if len(downside) > 0 and downside_std != 0 else 0,
+            "risk_reward_ratio_avg": self.rr[0] / self.rr[1] if self.rr[1] else np.nan,
+            "risk_reward_ratio_weighted": self.rr_weighted[0] / self.rr_weighted[1],
+            "trade_efficiency": self.efficiency[0] / self.efficiency[1] if self.efficiency[1] else np.nan
+        }
+
+        session_metrics = {
+            name: {
+                "total_trades": trades,
+                "net_profit": net,
+                "win_rate": (wins / trades) if trades > 0 else 0
+            }
+            for name, (trades, net, wins) in self.session_stats.items()
+        }
+
+        return {
+            "trade_stats": trade_stats,
+            "pnl_metrics": pnl_metrics,
+            "risk_metrics": risk_metrics,
+            "performance_metrics": performance_metrics,
+            "session_metrics": session_metrics,
+            "equity_curve": list(self.equity)
+        }
+
 # ----------------------------
 # Helper function
 # ----------------------------
+def _mtm_drawdown(risk_metrics, equity):
+    # Bar-level mark-to-market drawdown, includes open-trade excursions
+    if equity is not None and len(equity) > 0:
+        mtm = np.asarray(equity, dtype=np.float64)
+        mtm_peak = np.maximum.accumulate(mtm)
+        mtm_drawdown = mtm - mtm_peak
+        risk_metrics['mtm_max_drawdown'] = mtm_drawdown.min()
+        risk_metrics['mtm_max_drawdown_pct'] = (mtm_drawdown / mtm_peak * 100).min()
+
+def _sample_std(values):
+    # pandas Series.std: ddof=1, NaN below two values
+    return values.std(ddof=1) if len(values) > 1 else np.nan
+
 def _max_consecutive(series):
     """
     Count max consecutive True values in boolean series
@@ -0,0 +1,181 @@
+"""
+Out-of-core indicator runs over memory-mapped columns.
+
+For histories that do not fit in RAM (multi-year M1, tick-derived bars):
+the input columns are read from .npy files (the jobs.PriceCache layout,
+root/<key>/<timeframe>/<column>.npy) block by block, each block prefixed
+by the indicator's lookback, and the outputs are written into .npy memory
+maps. Peak memory is (block_rows + overlap) rows of inputs and outputs.
+
+    spec = compile_indicator({"name": "roc", "indicator": "ROC", "timeframe": "M1",
+                              "params": {"timeperiod": 10}}, get_registry())
+    outputs = run_chunked_npy(spec, "/shared/prices/<key>/M1", "/scratch/roc_M1", block_rows=2_000_000)
+
+Only block-invariant indicators come out bit-identical to the in-memory
+run, and only those run by default (EXACT: price differences, rolling
+max/min, candlestick patterns, the CDLSCAN masks, pivots). TA-Lib keeps
+running sums for moving windows (SMA, BBANDS, STOCH, LINEARREG...), so a
+block restarts the sum and the last bits differ; recursive indicators
+(EMA, RSI, ATR, MACD, SAR, SuperTrend...) depend on all history and only
+converge. Both run with approximate=True, the recursive ones with `warmup`
+extra bars of overlap. Cumulative ones (OBV, AD, ADOSC) depend on where
+the history starts and are rejected.
+
+TA-Lib is imported on first use.
+"""
+import os
+import warnings
+
+import numpy as np
+
+from technical_indicators import IndicatorExecutor, IndicatorValidationError
+
+BLOCK_ROWS = 1_000_000
+
+# outputs depend only on the lookback window: bit-identical per block
+EXACT = {
+    "ROC", "ROCP", "ROCR", "ROCR100", "MOM", "MAX", "MIN", "MINMAX", "MIDPOINT", "MIDPRICE",
+    "WILLR", "AROON", "AROONOSC", "BOP", "TRANGE", "AVGPRICE", "MEDPRICE", "TYPPRICE", "WCLPRICE",
+    "AVGDEV"
+}
+
+# bar indices: block-invariant once the block start is added back
+INDEX_OUTPUTS = {"MAXINDEX", "MININDEX", "MINMAXINDEX"}
+
+# infinite memory: only converge with a warm-up
+RECURSIVE = {
+    "EMA", "DEMA", "TEMA", "TRIX", "KAMA", "T3", "MAMA", "MACD", "MACDEXT", "MACDFIX", "PPO", "APO",
+    "RSI", "STOCHRSI", "CMO", "ATR", "NATR", "ADX", "ADXR", "DX", "PLUS_DI", "MINUS_DI", "PLUS_DM",
+    "MINUS_DM", "SAR", "SAREXT", "HT_DCPERIOD", "HT_DCPHASE", "HT_PHASOR", "HT_SINE", "HT_TRENDLINE",
+    "HT_TRENDMODE"
+}
+
+# values depend on where the history starts
+CUMULATIVE = {"OBV", "AD", "ADOSC"}
+
+
+# ==============================
+# CLASSIFICATION
+# ==============================
+
+def chunking(meta):
+    """"exact", "windowed", "recursive" or "cumulative" for a registry entry"""
+    if "chunking" in meta:
+        return meta["chunking"]
+    function = meta["function"]
+    if function in EXACT or function in INDEX_OUTPUTS or function.startswith("CDL"):
+        return "exact"
+    if function in CUMULATIVE:
+        return "cumulative"
+    if function in RECURSIVE:
+        return "recursive"
+    return "windowed"
+
+
+def lookback(spec):
+    """Bars before the first valid output: TA-Lib's lookback, else the registry period params"""
+    meta = spec.meta
+    if meta.get("library", "talib") == "talib":
+        return _talib_lookback(meta["function"], spec.params)
+
+    if meta["function"] == "CDLSCAN":
+        from indicator_registry import get_registry
+
+        patterns = get_registry()["candlestick_patterns"]
+        keys = spec.params.get("patterns") or list(patterns)
+        return max((_talib_lookback(patterns[key]["function"], {}) for key in keys), default=0)
+
+    if "lookback" in meta:
+        return meta["lookback"]
+    periods = [
+        int(spec.params.get(p, param.get("default") or 0))
+        for p, param in meta.get("params", {}).items() if p.endswith("period")
+    ]
+    return max(periods, default=0)
+
+
+def _talib_lookback(name, params):
+    from talib import abstract
+
+    function = abstract.Function(name)
+    if params:
+        function.set_parameters(dict(params))
+    return function.lookback
+
+
+# ==============================
+# BLOCKED RUN
+# ==============================
+
+def run_chunked(spec, columns, out=None, block_rows=BLOCK_ROWS, approximate=False, warmup=0):
+    """
+    spec: compiled IndicatorSpec. columns: {input column: 1-D array}, e.g.
+    np.load(path, mmap_mode="r"). out: folder for <output column>.npy memory
+    maps, or None for in-memory arrays. Returns {output column: array}.
+    """
+    mode = chunking(spec.meta)
+    if mode == "cumulative":
+        raise IndicatorValidationError(f"{spec.indicator}: cumulative from the first bar, cannot be run in blocks")
+    if mode != "exact" and not approximate:
+        raise IndicatorValidationError(
+            f"{spec.indicator}: {mode} indicator is not bit-identical in blocks, pass approximate=True"
+        )
+    if mode == "recursive" and warmup <= 0:
+        warnings.warn(f"{spec.indicator} is recursive, blocks without warmup start unconverged", stacklevel=2)
+
+    required = spec.meta["inputs"]["required"]
+    missing = [col for col in required if col not in columns]
+    if missing:
+        raise IndicatorValidationError(f"{spec.indicator}: missing input columns {missing}")
+
+    func = IndicatorExecutor.resolve(spec.meta)
+    overlap = lookback(spec) + (warmup if mode != "exact" else 0)
+    n = len(columns[required[0]])
+    outputs = None
+
+    for start in range(0, n, block_rows):
+        stop = min(start + block_rows, n)
+        lo = max(0, start - overlap)
+        inputs = [np.ascontiguousarray(columns[col][lo:stop], dtype=np.float64) for col in required]
+        result = func(*inputs, **spec.params)
+        if not isinstance(result, tuple):
+            result = (result,)
+
+        if outputs is None:
+            outputs = {
+                column: _output(out, column, n, values.dtype)
+                for column, values in zip(spec.columns, result)
+            }
+        for column, values in zip(spec.columns, result):
+            values = values[start - lo:]
+            if spec.meta["function"] in INDEX_OUTPUTS:
+                values = values + lo
+            outputs[column][start:stop] = values
+
+    for array in (outputs or {}).values():
+        if isinstance(array, np.memmap):
+            array.flush()
+    return outputs or {}
+
+
+def _output(folder, column, n, dtype):
+    if folder is None:
+        return np.empty(n, dtype=dtype)
+    os.makedirs(folder, exist_ok=True)
+    return np.lib.format.open_memmap(os.path.join(folder, f"{column}.npy"), mode="w+", dtype=dtype, shape=(n,))
+
+
+def run_chunked_npy(spec, folder, out, **kwargs):
+    """
+    Inputs from folder/<column>.npy (a PriceCache timeframe folder), outputs
+    to out/<column>.npy. out must be another folder: outputs are opened
+    "w+", which would truncate an input still mapped (or a shared cache entry).
+    """
+    if os.path.realpath(out) == os.path.realpath(folder):
+        raise IndicatorValidationError(f"chunked run: output folder {out!r} must differ from the input folder")
+    columns = {
+        col: np.load(os.path.join(folder, f"{col}.npy"), mmap_mode="r")
+        for col in spec.meta["inputs"]["required"]
+        if os.path.exists(os.path.join(folder, f"{col}.npy"))
+    }
+    return run_chunked(spec, columns, out=out, **kwargs)
@@ -0,0 +1,378 @@
+"""
+quantnoon command line interface.
+
+    python cli.py run jobs.jsonl --output metrics.jsonl --workers 8
+    python cli.py validate jobs.jsonl
+    python cli.py indicators --patterns
+
+    python cli.py submit jobs.jsonl --broker queue.db --cache prices/
+    python cli.py worker --broker queue.db --cache prices/ --processes 8
+    python cli.py results --broker queue.db --output metrics.jsonl
+
+Each line of the jobs file is one strategy run:
+
+    {
+        "id": "eurusd-ema-cross",
+        "price": {"symbol": "EURUSD", "timeframes": ["H1"], "files": ["eurusd_h1.parquet"],
+                  "pip_size": 0.0001, "pip_value": 10, "tick_size": 0.00001, "tick_value": 1},
+        "indicators": [...],
+        "signal": {...},
+        "backtest": {...},
+        "account": {...}
+    }
+
+Price data comes from "files" (csv/parquet/qtk tick store, one per timeframe) or, without
+"files", from an MT5 terminal using the --connection json file.
+Results are appended to the output file as soon as a job finishes, so an
+interrupted run picks up where it stopped when started again.
+
+submit/worker/results spread the jobs over several machines through a
+shared queue and price cache (see jobs.py).
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime, timezone
+
+from job_runner import json_default, run_job
+# validate runs the same compilers as the job
+from specs import SymbolSpec, compile_account, compile_backtest, compile_indicator, compile_signal, compile_symbol
+from technical_indicators import IndicatorValidationError
+
+
+# ==============================
+# JOB FILES
+# ==============================
+
+def read_jobs(path):
+    jobs = []
+    seen = set()
+    with open(path) as f:
+        for lineno, line in enumerate(f, start=1):
+            line = line.strip()
+            if not line:
+                continue
+            job = json.loads(line)
+            job.setdefault("id", f"job-{lineno}")
+            if job["id"] in seen:
+                raise ValueError(f"Duplicate job id '{job['id']}' on line {lineno}")
+            seen.add(job["id"])
+            jobs.append(job)
+    return jobs
+
+
+def completed_job_ids(output_path):
+    """
+    Ids of jobs that already finished successfully in a previous run.
+    A half-written last line (run killed mid-write) is ignored.
+    """
+    done = set()
+    if not os.path.exists(output_path):
+        return done
+    with open(output_path) as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            if record.get("status") == "ok":
+                done.add(record["id"])
+    return done
+
+
+class ResultWriter:
+    def __init__(self, path):
+        needs_newline = False
+        if os.path.exists(path) and os.path.getsize(path) > 0:
+            with open(path, "rb") as f:
+                f.seek(-1, os.SEEK_END)
+                needs_newline = f.read(1) != b"\n"
+        self._file = open(path, "a")
+        if needs_newline:
+            self._file.write("\n")
+
+    def write(self, result):
+        self._file.write(json.dumps(result, default=json_default) + "\n")
+        self._file.flush()
+
+    def close(self):
+        self._file.close()
+
+
+# ==============================
+# VALIDATION
+# ==============================
+
+def _compile_errors(errors, prefix, compile_fn, *args):
+    """Run one of the specs compilers, recording its error instead of raising"""
+    try:
+        return compile_fn(*args)
+    except (ValueError, IndicatorValidationError) as exc:
+        errors.append(f"{prefix}{exc}")
+    except KeyError as exc:
+        errors.append(f"{prefix}missing {exc}")
+    return None
+
+
+def validate_job(job, registry):
+    """
+    Check a job's configs without loading any price data: the same spec
+    compilers the run uses, with the job's timeframes standing in for the
+    frames. Returns a list of error messages, empty when the job is valid.
+    """
+    errors = []
+    price = job.get("price", {})
+    timeframes = price.get("timeframes", [])
+    if not timeframes:
+        errors.append("price: no timeframes")
+    files = price.get("files")
+    if files is not None and len(files) != len(timeframes):
+        errors.append("price: one file per timeframe is required")
+
+    for cfg in job.get("indicators", []):
+        _compile_errors(errors, f"indicator {cfg.get('name')!r}: ", compile_indicator, cfg, registry, timeframes)
+
+    _compile_errors(errors, "", compile_signal, job.get("signal", {}), timeframes)
+
+    backtest = job.get("backtest", {})
+    if backtest.get("timeframe") not in timeframes:
+        errors.append(f"backtest: timeframe {backtest.get('timeframe')!r} is not loaded")
+    account = _compile_errors(errors, "", compile_account, job.get("account", {}))
+    # MT5 jobs get their symbol sizes from the terminal: size the levels with placeholders
+    symbol = SymbolSpec(pip_size=1, pip_value=1, tick_size=1, tick_value=1)
+    if all(key in price for key in ("pip_size", "pip_value", "tick_size", "tick_value")):
+        symbol = _compile_errors(errors, "price: ", compile_symbol, price)
+    if account is not None and symbol is not None:
+        _compile_errors(errors, "", compile_backtest, backtest, account, symbol)
+
+    return errors
+
+
+# ==============================
+# PROGRESS
+# ==============================
+
+class Progress:
+    def __init__(self, total, skipped=0, stream=sys.stderr):
+        self.total = total
+        self.skipped = skipped
+        self.ok = 0
+        self.failed = 0
+        self.stream = stream
+        self.started = time.perf_counter()
+
+    def update(self, result):
+        if result["status"] == "ok":
+            self.ok += 1
+        else:
+            self.failed += 1
+        self.render()
+
+    def render(self):
+        done = self.ok + self.failed
+        elapsed = time.perf_counter() - self.started
+        rate = done / elapsed if elapsed > 0 else 0
+        eta = (self.total - done) / rate if rate > 0 else 0
+        self.stream.write(
+            f"\r[{done}/{self.total}] ok={self.ok} failed={self.failed} "
+            f"skipped={self.skipped} {rate:.2f} jobs/s eta {eta:.0f}s"
+        )
+        self.stream.flush()
+
+    def finish(self):
+        self.render()
+        self.stream.write("\n")
+        self.stream.flush()
+
+
+# ==============================
+# COMMANDS
+# ==============================
+
+def run_batch(jobs_path, output_path, workers=1, connection=None):
+    jobs = read_jobs(jobs_path)
+    done = completed_job_ids(output_path)
+    pending = [job for job in jobs if job["id"] not in done]
+
+    progress = Progress(len(pending), skipped=len(jobs) - len(pending))
+    writer = ResultWriter(output_path)
+    progress.render()
+
+    try:
+        if workers <= 1:
+            for job in pending:
+                result = run_job(job, connection)
+                writer.write(result)
+                progress.update(result)
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                futures = [pool.submit(run_job, job, connection) for job in pending]
+                try:
+                    for future in as_completed(futures):
+                        result = future.result()
+                        writer.write(result)
+                        progress.update(result)
+                except KeyboardInterrupt:
+                    for future in futures:
+                        future.cancel()
+                    raise
+    except KeyboardInterrupt:
+        progress.finish()
+        print("interrupted, run again to resume", file=sys.stderr)
+        return 130
+    finally:
+        writer.close()
+
+    progress.finish()
+    return 1 if progress.failed else 0
+
+
+def _cmd_run(args):
+    connection = None
+    if args.connection:
+        with open(args.connection) as f:
+            connection = json.load(f)
+    return run_batch(args.jobs, args.output, workers=args.workers, connection=connection)
+
+
+def _cmd_indicators(args):
+    from indicator_registry import get_registry
+
+    registry = get_registry()
+    groups = ("indicators", "candlestick_patterns") if args.patterns else ("indicators",)
+    for group in groups:
+        for key, meta in registry[group].items():
+            params = ", ".join(f"{p}={spec.get('default')}" for p, spec in meta.get("params", {}).items())
+            print(f"{key:<20} {meta['category']:<16} {meta['library']:<8} {params}")
+    return 0
+
+
+def _cmd_validate(args):
+    from indicator_registry import get_registry
+
+    registry = get_registry()
+    invalid = 0
+    for job in read_jobs(args.jobs):
+        errors = validate_job(job, registry)
+        if errors:
+            invalid += 1
+            for error in errors:
+                print(f"{job['id']}: {error}")
+    print(f"{invalid} invalid job(s)", file=sys.stderr)
+    return 1 if invalid else 0
+
+
+def _cmd_submit(args):
+    from jobs import PriceCache, SQLiteBroker, cache_job_prices
+
+    connection = None
+    if args.connection:
+        with open(args.connection) as f:
+            connection = json.load(f)
+
+    # relative dateranges resolve against one "now" for the whole submit
+    now = datetime.now(timezone.utc)
+    cache = PriceCache(args.cache)
+    broker = SQLiteBroker(args.broker, max_attempts=args.max_attempts)
+    queued = 0
+    duplicates = 0
+    try:
+        for job in read_jobs(args.jobs):
+            job_id = broker.submit(cache_job_prices(job, cache, connection, now))
+            if job_id == job["id"]:
+                queued += 1
+            else:
+                duplicates += 1
+                print(f"{job['id']}: same job as {job_id}", file=sys.stderr)
+        print(f"{queued} job(s) queued, {duplicates} duplicate(s), queue {broker.counts()}", file=sys.stderr)
+    finally:
+        broker.close()
+    return 0
+
+
+def _cmd_worker(args):
+    from jobs import PriceCache, SQLiteBroker, run_local_workers, run_worker
+
+    if args.processes > 1:
+        ran = run_local_workers(args.broker, args.cache, args.processes, lease_seconds=args.lease)
+        print(f"{sum(ran)} job(s) run by {args.processes} worker(s)", file=sys.stderr)
+        return 0
+
+    broker = SQLiteBroker(args.broker, lease_seconds=args.lease)
+    try:
+        ran = run_worker(broker, PriceCache(args.cache), stream=sys.stderr)
+    finally:
+        broker.close()
+    print(f"{ran} job(s) run", file=sys.stderr)
+    return 0
+
+
+def _cmd_results(args):
+    from jobs import SQLiteBroker
+
+    broker = SQLiteBroker(args.broker)
+    writer = ResultWriter(args.output)
+    failed = 0
+    try:
+        for result in broker.results():
+            writer.write(result)
+            failed += result["status"] != "ok"
+        print(f"queue {broker.counts()}", file=sys.stderr)
+    finally:
+        writer.close()
+        broker.close()
+    return 1 if failed else 0
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="quantnoon", description="quantnoon trading engine")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run = commands.add_parser("run", help="run a JSONL file of backtest jobs")
+    run.add_argument("jobs", help="JSONL file, one job per line")
+    run.add_argument("-o", "--output", default="metrics.jsonl", help="JSONL file results are appended to")
+    run.add_argument("-w", "--workers", type=int, default=os.cpu_count() or 1)
+    run.add_argument("--connection", help="json file with MT5 login, password, server, path")
+    run.set_defaults(func=_cmd_run)
+
+    indicators = commands.add_parser("indicators", help="list the available indicators")
+    indicators.add_argument("--patterns", action="store_true", help="include candlestick patterns")
+    indicators.set_defaults(func=_cmd_indicators)
+
+    validate = commands.add_parser("validate", help="check a jobs file without running it")
+    validate.add_argument("jobs", help="JSONL file, one job per line")
+    validate.set_defaults(func=_cmd_validate)
+
+    submit = commands.add_parser("submit", help="queue jobs for distributed workers")
+    submit.add_argument("jobs", help="JSONL file, one job per line")
+    submit.add_argument("--broker", required=True, help="SQLite queue file, shared by all workers")
+    submit.add_argument("--cache", required=True, help="shared price cache directory")
+    submit.add_argument("--max-attempts", type=int, default=3, help="runs of a job before it is marked failed")
+    submit.add_argument("--connection", help="json file with MT5 login, password, server, path")
+    submit.set_defaults(func=_cmd_submit)
+
+    worker = commands.add_parser("worker", help="run queued jobs until the queue is drained")
+    worker.add_argument("--broker", required=True, help="SQLite queue file, shared by all workers")
+    worker.add_argument("--cache", required=True, help="shared price cache directory")
+    worker.add_argument("-p", "--processes", type=int, default=1, help="worker processes on this host")
+    worker.add_argument("--lease", type=float, default=3600, help="seconds before a silent worker's job is retried")
+    worker.set_defaults(func=_cmd_worker)
+
+    results = commands.add_parser("results", help="export finished jobs from the queue")
+    results.add_argument("--broker", required=True, help="SQLite queue file")
+    results.add_argument("-o", "--output", default="metrics.jsonl", help="JSONL file results are appended to")
+    results.set_defaults(func=_cmd_results)
+
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
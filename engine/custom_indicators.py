@@ -0,0 +1,213 @@
+"""
+Reference kernels for indicators that TA-Lib does not provide.
+
+Every kernel follows the TA-Lib calling convention: input arrays
+positionally, params as keywords, one array or a tuple of arrays out, with
+NaN during the warm-up period. They are registered with library "numpy" in
+indicator_registry.py and run through the same IndicatorExecutor.
+
+Recursive indicators (SuperTrend, Heikin-Ashi open) need a sequential loop;
+it is compiled with numba when installed and runs as plain Python otherwise.
+
+pattern_scan returns int64 masks rather than floats: bit pattern_bits()[key]
+is set on the bars where that candlestick pattern fired.
+"""
+import numpy as np
+
+try:
+    from numba import njit as _jit
+except ImportError:
+    def _jit(func):
+        return func
+
+
+def _as_float(*arrays):
+    return [np.asarray(a, dtype=np.float64) for a in arrays]
+
+
+# ==============================
+# VWAP
+# ==============================
+
+def vwap(high, low, close, volume, timeperiod=20):
+    """Rolling VWAP of the typical price over the last `timeperiod` bars."""
+    high, low, close, volume = _as_float(high, low, close, volume)
+    out = np.full(len(close), np.nan)
+    if timeperiod < 1 or len(close) < timeperiod:
+        return out
+
+    typical = (high + low + close) / 3.0
+    pv = np.concatenate(([0.0], np.cumsum(typical * volume)))
+    vv = np.concatenate(([0.0], np.cumsum(volume)))
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        out[timeperiod - 1:] = (
+            (pv[timeperiod:] - pv[:-timeperiod]) / (vv[timeperiod:] - vv[:-timeperiod])
+        )
+    return out
+
+
+# ==============================
+# SUPERTREND
+# ==============================
+
+def true_range(high, low, close):
+    prev_close = np.concatenate(([np.nan], close[:-1]))
+    tr = np.maximum(high - low, np.maximum(np.abs(high - prev_close), np.abs(low - prev_close)))
+    tr[0] = high[0] - low[0]
+    return tr
+
+
+@_jit
+def _supertrend_loop(high, low, close, tr, period, multiplier):
+    n = len(close)
+    line = np.full(n, np.nan)
+    direction = np.full(n, np.nan)
+    if n <= period:
+        return line, direction
+
+    # Wilder ATR seeded with the mean true range, as TA-Lib's ATR
+    atr = 0.0
+    for i in range(1, period + 1):
+        atr += tr[i]
+    atr /= period
+
+    upper = lower = 0.0
+    trend = 1.0
+    for i in range(period, n):
+        if i > period:
+            atr = (atr * (period - 1) + tr[i]) / period
+
+        mid = (high[i] + low[i]) / 2.0
+        basic_upper = mid + multiplier * atr
+        basic_lower = mid - multiplier * atr
+
+        if i == period:
+            upper = basic_upper
+            lower = basic_lower
+            trend = 1.0 if close[i] >= mid else -1.0
+        else:
+            upper = basic_upper if basic_upper < upper or close[i - 1] > upper else upper
+            lower = basic_lower if basic_lower > lower or close[i - 1] < lower else lower
+            if trend < 0:
+                trend = 1.0 if close[i] > upper else -1.0
+            else:
+                trend = -1.0 if close[i] < lower else 1.0
+
+        line[i] = lower if trend > 0 else upper
+        direction[i] = trend
+
+    return line, direction
+
+
+def supertrend(high, low, close, timeperiod=10, multiplier=3.0):
+    """SuperTrend line and direction (1 up, -1 down)."""
+    high, low, close = _as_float(high, low, close)
+    tr = true_range(high, low, close)
+    return _supertrend_loop(high, low, close, tr, int(timeperiod), float(multiplier))
+
+
+# ==============================
+# PIVOTS
+# ==============================
+
+def pivots(high, low, close):
+    """
+    Classic floor pivots from the previous bar. Run on D1/W1 and reference
+    the columns from the entry timeframe for daily/weekly pivots.
+    """
+    high, low, close = _as_float(high, low, close)
+    prev_high = np.concatenate(([np.nan], high[:-1]))
+    prev_low = np.concatenate(([np.nan], low[:-1]))
+    prev_close = np.concatenate(([np.nan], close[:-1]))
+
+    pp = (prev_high + prev_low + prev_close) / 3.0
+    rng = prev_high - prev_low
+
+    r1 = 2 * pp - prev_low
+    s1 = 2 * pp - prev_high
+    r2 = pp + rng
+    s2 = pp - rng
+    r3 = prev_high + 2 * (pp - prev_low)
+    s3 = prev_low - 2 * (prev_high - pp)
+
+    return pp, r1, s1, r2, s2, r3, s3
+
+
+# ==============================
+# HEIKIN-ASHI
+# ==============================
+
+@_jit
+def _ha_open_loop(open_, close, ha_close):
+    n = len(open_)
+    ha_open = np.empty(n)
+    if n == 0:
+        return ha_open
+    ha_open[0] = (open_[0] + close[0]) / 2.0
+    for i in range(1, n):
+        ha_open[i] = (ha_open[i - 1] + ha_close[i - 1]) / 2.0
+    return ha_open
+
+
+def heikin_ashi(open_, high, low, close):
+    open_, high, low, close = _as_float(open_, high, low, close)
+    ha_close = (open_ + high + low + close) / 4.0
+    ha_open = _ha_open_loop(open_, close, ha_close)
+    ha_high = np.maximum(high, np.maximum(ha_open, ha_close))
+    ha_low = np.minimum(low, np.minimum(ha_open, ha_close))
+    return ha_open, ha_high, ha_low, ha_close
+
+
+# ==============================
+# CANDLESTICK PATTERN SCAN
+# ==============================
+
+def pattern_scan(open_, high, low, close, patterns=None):
+    """
+    Bullish and bearish int64 bitmasks of the given candlestick patterns
+    (all registered ones by default). The OHLC arrays are converted once
+    and every pattern ORs its hits straight into the two masks.
+    """
+    from indicator_registry import get_registry, pattern_bits
+    from technical_indicators import IndicatorExecutor, IndicatorValidationError
+
+    registry = get_registry()
+    bits = pattern_bits(registry)
+    open_, high, low, close = _as_float(open_, high, low, close)
+    bull = np.zeros(len(close), dtype=np.int64)
+    bear = np.zeros(len(close), dtype=np.int64)
+
+    for key in bits if patterns is None else patterns:
+        if key not in bits:
+            raise IndicatorValidationError(f"CDLSCAN: unknown candlestick pattern {key!r}")
+        bit = np.left_shift(np.int64(1), bits[key])
+        hits = IndicatorExecutor.resolve(registry["candlestick_patterns"][key])(open_, high, low, close)
+        np.bitwise_or(bull, bit, out=bull, where=hits > 0)
+        np.bitwise_or(bear, bit, out=bear, where=hits < 0)
+
+    return bull, bear
+
+
+def pattern_events(bull, bear):
+    """Sparse form of the masks: {"row", "pattern", "direction"} arrays, sorted by row"""
+    from indicator_registry import pattern_bits
+
+    names = np.array(list(pattern_bits()), dtype=object)
+    shifts = np.arange(len(names), dtype=np.int64)
+    rows, patterns, directions = [], [], []
+    for direction, mask in ((1, bull), (-1, bear)):
+        mask = np.asarray(mask, dtype=np.int64)
+        hit_rows = np.flatnonzero(mask)
+        row, bit = np.nonzero((mask[hit_rows, None] >> shifts) & 1)
+        rows.append(hit_rows[row])
+        patterns.append(names[bit])
+        directions.append(np.full(len(row), direction, dtype=np.int8))
+
+    rows = np.concatenate(rows)
+    order = np.argsort(rows, kind="stable")
+    return {
+        "row": rows[order],
+        "pattern": np.concatenate(patterns)[order],
+        "direction": np.concatenate(directions)[order]
+    }
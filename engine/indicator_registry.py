@@ -1,225 +1,402 @@
-INDICATOR_REGISTRY = {
-    "indicators": {},
-    "candlestick_patterns": {}
-}
-
-# TREND INDICATORS
-INDICATOR_REGISTRY["indicators"]["SMA"] = {
-    "name": "Simple Moving Average",
-    "category": "trend",
-    "library": "talib",
-    "function": "SMA",
-    "inputs": {"required": ["close"]},
-    "params": {
-        "timeperiod": {"type": "int", "default": 14, "min": 1, "max": 500}
-    },
-    "outputs": ["sma"],
-    "ui": {"group": "Moving Averages", "overlay": True}
-}
-INDICATOR_REGISTRY["indicators"]["EMA"] = {
-    "name": "Exponential Moving Average",
-    "category": "trend",
-    "library": "talib",
-    "function": "EMA",
-    "inputs": {"required": ["close"]},
-    "params": {
-        "timeperiod": {"type": "int", "default": 14, "min": 1, "max": 500}
-    },
-    "outputs": ["ema"],
-    "ui": {"group": "Moving Averages", "overlay": True}
-}
-INDICATOR_REGISTRY["indicators"]["WMA"] = {
-    "name": "Weighted Moving Average",
-    "category": "trend",
-    "library": "talib",
-    "function": "WMA",
-    "inputs": {"required": ["close"]},
-    "params": {
-        "timeperiod": {"type": "int", "default": 14}
-    },
-    "outputs": ["wma"],
-    "ui": {"group": "Moving Averages", "overlay": True}
-}
-for ind in ["DEMA", "TEMA", "KAMA"]:
-    INDICATOR_REGISTRY["indicators"][ind] = {
-        "name": ind,
+"""
+Registry of every indicator the engine can compute.
+
+The registry is built on first access (``get_registry()`` or the
+``INDICATOR_REGISTRY`` module attribute) so importing the engine does not
+pay for it until an indicator is actually needed.
+
+Indicators that are not part of TA-Lib join the registry through
+``register_indicator`` with the same inputs/params/outputs schema and a
+kernel: any callable taking the input arrays positionally and the params as
+keywords, returning one array or a tuple of arrays (the TA-Lib convention).
+
+Candlestick patterns own a fixed bit each, in registration order (see
+``pattern_bits``): the CDLSCAN indicator packs every requested pattern into
+one bullish and one bearish int64 mask column.
+
+Kernels may declare "chunking" ("exact", "windowed", "recursive") and a
+fixed "lookback" for blocked out-of-core runs (see chunked_indicators.py).
+"""
+from importlib import import_module
+
+from technical_indicators import IndicatorValidationError
+
+_REGISTRY = None
+
+# (library, function) -> callable or "module:attribute" resolved on first use
+_KERNELS = {}
+
+PARAM_TYPES = ("int", "float", "list")
+
+# patterns fit the int64 CDLSCAN masks
+MAX_PATTERNS = 64
+
+
+def get_registry():
+    global _REGISTRY
+    if _REGISTRY is None:
+        _REGISTRY = _build_registry()
+    return _REGISTRY
+
+
+def __getattr__(name):
+    if name == "INDICATOR_REGISTRY":
+        return get_registry()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def register_indicator(key, meta, kernel=None, group="indicators", replace=False):
+    """
+    Add a custom indicator to the registry.
+
+    kernel may be a callable or a "module:function" string, which keeps
+    the import (and any JIT compilation) off the start-up path.
+    """
+    _add(get_registry(), group, key, meta, kernel, replace)
+
+
+def pattern_bits(registry=None):
+    """{pattern key: bit in the CDLSCAN masks}"""
+    registry = registry or get_registry()
+    return {key: bit for bit, key in enumerate(registry["candlestick_patterns"])}
+
+
+def get_kernel(library, function):
+    kernel = _KERNELS.get((library, function))
+    if kernel is None:
+        raise IndicatorValidationError(f"No kernel registered for {library}.{function}")
+    if isinstance(kernel, str):
+        module, attr = kernel.split(":")
+        kernel = getattr(import_module(module), attr)
+        _KERNELS[(library, function)] = kernel
+    return kernel
+
+
+def validate_meta(key, meta):
+    for field in ("name", "category", "library", "function", "inputs", "params", "outputs"):
+        if field not in meta:
+            raise IndicatorValidationError(f"{key}: missing '{field}'")
+
+    required = meta["inputs"].get("required")
+    if not required or not all(isinstance(col, str) for col in required):
+        raise IndicatorValidationError(f"{key}: inputs.required must be a non-empty list of columns")
+
+    for p, spec in meta["params"].items():
+        if spec.get("type") not in PARAM_TYPES:
+            raise IndicatorValidationError(f"{key}: param '{p}' type must be one of {PARAM_TYPES}")
+        if "default" not in spec:
+            raise IndicatorValidationError(f"{key}: param '{p}' has no default")
+
+    if not meta["outputs"] or len(set(meta["outputs"])) != len(meta["outputs"]):
+        raise IndicatorValidationError(f"{key}: outputs must be a non-empty list of unique names")
+
+
+def _add(registry, group, key, meta, kernel=None, replace=False):
+    if group not in registry:
+        raise IndicatorValidationError(f"Unknown registry group: {group}")
+    if not replace and (key in registry["indicators"] or key in registry["candlestick_patterns"]):
+        raise IndicatorValidationError(f"Indicator '{key}' is already registered")
+
+    validate_meta(key, meta)
+    if group == "candlestick_patterns" and key not in registry[group] and len(registry[group]) >= MAX_PATTERNS:
+        raise IndicatorValidationError(f"{key}: at most {MAX_PATTERNS} candlestick patterns can be registered")
+
+    if meta["library"] != "talib":
+        if kernel is None:
+            raise IndicatorValidationError(f"{key}: a kernel is required for library '{meta['library']}'")
+        if not (callable(kernel) or isinstance(kernel, str)):
+            raise IndicatorValidationError(f"{key}: kernel must be callable or 'module:function'")
+        _KERNELS[(meta["library"], meta["function"])] = kernel
+
+    registry[group][key] = meta
+
+
+def _cdl(name, desc):
+    return {
+        "name": desc,
+        "category": "candlestick",
+        "library": "talib",
+        "function": name,
+        "inputs": {"required": ["open", "high", "low", "close"]},
+        "params": {},
+        "outputs": ["signal"],
+        "signal_meaning": {100: "Bullish", -100: "Bearish", 0: "None"},
+        "ui": {"group": "Candlestick Patterns"}
+    }
+
+
+def _build_registry():
+    INDICATOR_REGISTRY = {
+        "indicators": {},
+        "candlestick_patterns": {}
+    }
+
+    # TREND INDICATORS
+    INDICATOR_REGISTRY["indicators"]["SMA"] = {
+        "name": "Simple Moving Average",
+        "category": "trend",
+        "library": "talib",
+        "function": "SMA",
+        "inputs": {"required": ["close"]},
+        "params": {
+            "timeperiod": {"type": "int", "default": 14, "min": 1, "max": 500}
+        },
+        "outputs": ["sma"],
+        "ui": {"group": "Moving Averages", "overlay": True}
+    }
+    INDICATOR_REGISTRY["indicators"]["EMA"] = {
+        "name": "Exponential Moving Average",
         "category": "trend",
         "library": "talib",
-        "function": ind,
+        "function": "EMA",
+        "inputs": {"required": ["close"]},
+        "params": {
+            "timeperiod": {"type": "int", "default": 14, "min": 1, "max": 500}
+        },
+        "outputs": ["ema"],
+        "ui": {"group": "Moving Averages", "overlay": True}
+    }
+    INDICATOR_REGISTRY["indicators"]["WMA"] = {
+        "name": "Weighted Moving Average",
+        "category": "trend",
+        "library": "talib",
+        "function": "WMA",
         "inputs": {"required": ["close"]},
         "params": {
             "timeperiod": {"type": "int", "default": 14}
         },
-        "outputs": [ind.lower()],
+        "outputs": ["wma"],
         "ui": {"group": "Moving Averages", "overlay": True}
     }
-INDICATOR_REGISTRY["indicators"]["SAR"] = {
-    "name": "Parabolic SAR",
-    "category": "trend",
-    "library": "talib",
-    "function": "SAR",
-    "inputs": {"required": ["high", "low"]},
-    "params": {
-        "acceleration": {"type": "float", "default": 0.02},
-        "maximum": {"type": "float", "default": 0.2}
-    },
-    "outputs": ["sar"],
-    "ui": {"group": "Trend", "overlay": True}
-}
-INDICATOR_REGISTRY["indicators"]["ADX"] = {
-    "name": "Average Directional Index",
-    "category": "trend",
-    "library": "talib",
-    "function": "ADX",
-    "inputs": {"required": ["high", "low", "close"]},
-    "params": {"timeperiod": {"type": "int", "default": 14}},
-    "outputs": ["adx"],
-    "ui": {"group": "Trend Strength", "overlay": False}
-}
-for ind in ["PLUS_DI", "MINUS_DI"]:
-    INDICATOR_REGISTRY["indicators"][ind] = {
-        "name": ind,
+    for ind in ["DEMA", "TEMA", "KAMA"]:
+        INDICATOR_REGISTRY["indicators"][ind] = {
+            "name": ind,
+            "category": "trend",
+            "library": "talib",
+            "function": ind,
+            "inputs": {"required": ["close"]},
+            "params": {
+                "timeperiod": {"type": "int", "default": 14}
+            },
+            "outputs": [ind.lower()],
+            "ui": {"group": "Moving Averages", "overlay": True}
+        }
+    INDICATOR_REGISTRY["indicators"]["SAR"] = {
+        "name": "Parabolic SAR",
         "category": "trend",
         "library": "talib",
-        "function": ind,
+        "function": "SAR",
+        "inputs": {"required": ["high", "low"]},
+        "params": {
+            "acceleration": {"type": "float", "default": 0.02},
+            "maximum": {"type": "float", "default": 0.2}
+        },
+        "outputs": ["sar"],
+        "ui": {"group": "Trend", "overlay": True}
+    }
+    INDICATOR_REGISTRY["indicators"]["ADX"] = {
+        "name": "Average Directional Index",
+        "category": "trend",
+        "library": "talib",
+        "function": "ADX",
         "inputs": {"required": ["high", "low", "close"]},
         "params": {"timeperiod": {"type": "int", "default": 14}},
-        "outputs": [ind.lower()],
+        "outputs": ["adx"],
         "ui": {"group": "Trend Strength", "overlay": False}
     }
+    for ind in ["PLUS_DI", "MINUS_DI"]:
+        INDICATOR_REGISTRY["indicators"][ind] = {
+            "name": ind,
+            "category": "trend",
+            "library": "talib",
+            "function": ind,
+            "inputs": {"required": ["high", "low", "close"]},
+            "params": {"timeperiod": {"type": "int", "default": 14}},
+            "outputs": [ind.lower()],
+            "ui": {"group": "Trend Strength", "overlay": False}
+        }
 
-# Momentum Indicators
-INDICATOR_REGISTRY["indicators"]["RSI"] = {
-    "name": "Relative Strength Index",
-    "category": "momentum",
-    "library": "talib",
-    "function": "RSI",
-    "inputs": {"required": ["close"]},
-    "params": {"timeperiod": {"type": "int", "default": 14}},
-    "outputs": ["rsi"],
-    "ui": {"group": "Momentum", "overlay": False}
-}
-INDICATOR_REGISTRY["indicators"]["MACD"] = {
-    "name": "MACD",
-    "category": "momentum",
-    "library": "talib",
-    "function": "MACD",
-    "inputs": {"required": ["close"]},
-    "params": {
-        "fastperiod": {"type": "int", "default": 12},
-        "slowperiod": {"type": "int", "default": 26},
-        "signalperiod": {"type": "int", "default": 9}
-    },
-    "outputs": ["macd", "signal", "hist"],
-    "ui": {"group": "Momentum", "overlay": False}
-}
-for ind in ["STOCH", "STOCHF"]:
-    INDICATOR_REGISTRY["indicators"][ind] = {
-        "name": ind,
+    # Momentum Indicators
+    INDICATOR_REGISTRY["indicators"]["RSI"] = {
+        "name": "Relative Strength Index",
         "category": "momentum",
         "library": "talib",
-        "function": ind,
-        "inputs": {"required": ["high", "low", "close"]},
-        "params": {},
-        "outputs": ["slowk", "slowd"] if ind == "STOCH" else ["fastk", "fastd"],
+        "function": "RSI",
+        "inputs": {"required": ["close"]},
+        "params": {"timeperiod": {"type": "int", "default": 14}},
+        "outputs": ["rsi"],
         "ui": {"group": "Momentum", "overlay": False}
     }
-for ind in ["CCI", "ROC", "MOM", "TRIX"]:
-    INDICATOR_REGISTRY["indicators"][ind] = {
-        "name": ind,
+    INDICATOR_REGISTRY["indicators"]["MACD"] = {
+        "name": "MACD",
         "category": "momentum",
         "library": "talib",
-        "function": ind,
+        "function": "MACD",
         "inputs": {"required": ["close"]},
-        "params": {"timeperiod": {"type": "int", "default": 14}},
-        "outputs": [ind.lower()],
+        "params": {
+            "fastperiod": {"type": "int", "default": 12},
+            "slowperiod": {"type": "int", "default": 26},
+            "signalperiod": {"type": "int", "default": 9}
+        },
+        "outputs": ["macd", "signal", "hist"],
         "ui": {"group": "Momentum", "overlay": False}
     }
-for ind in ["ATR", "NATR"]:
-    INDICATOR_REGISTRY["indicators"][ind] = {
-        "name": ind,
+    for ind in ["STOCH", "STOCHF"]:
+        INDICATOR_REGISTRY["indicators"][ind] = {
+            "name": ind,
+            "category": "momentum",
+            "library": "talib",
+            "function": ind,
+            "inputs": {"required": ["high", "low", "close"]},
+            "params": {},
+            "outputs": ["slowk", "slowd"] if ind == "STOCH" else ["fastk", "fastd"],
+            "ui": {"group": "Momentum", "overlay": False}
+        }
+    for ind in ["CCI", "ROC", "MOM", "TRIX"]:
+        INDICATOR_REGISTRY["indicators"][ind] = {
+            "name": ind,
+            "category": "momentum",
+            "library": "talib",
+            "function": ind,
+            "inputs": {"required": ["close"]},
+            "params": {"timeperiod": {"type": "int", "default": 14}},
+            "outputs": [ind.lower()],
+            "ui": {"group": "Momentum", "overlay": False}
+        }
+    for ind in ["ATR", "NATR"]:
+        INDICATOR_REGISTRY["indicators"][ind] = {
+            "name": ind,
+            "category": "volatility",
+            "library": "talib",
+            "function": ind,
+            "inputs": {"required": ["high", "low", "close"]},
+            "params": {"timeperiod": {"type": "int", "default": 14}},
+            "outputs": [ind.lower()],
+            "ui": {"group": "Volatility", "overlay": False}
+        }
+    INDICATOR_REGISTRY["indicators"]["BBANDS"] = {
+        "name": "Bollinger Bands",
         "category": "volatility",
         "library": "talib",
-        "function": ind,
-        "inputs": {"required": ["high", "low", "close"]},
-        "params": {"timeperiod": {"type": "int", "default": 14}},
-        "outputs": [ind.lower()],
-        "ui": {"group": "Volatility", "overlay": False}
-    }
-INDICATOR_REGISTRY["indicators"]["BBANDS"] = {
-    "name": "Bollinger Bands",
-    "category": "volatility",
-    "library": "talib",
-    "function": "BBANDS",
-    "inputs": {"required": ["close"]},
-    "params": {
-        "timeperiod": {"type": "int", "default": 20},
-        "nbdevup": {"type": "float", "default": 2},
-        "nbdevdn": {"type": "float", "default": 2}
-    },
-    "outputs": ["upper", "middle", "lower"],
-    "ui": {"group": "Volatility", "overlay": True}
-}
-
-# Volume Indicators
-for ind in ["OBV", "MFI", "AD", "ADOSC"]:
-    INDICATOR_REGISTRY["indicators"][ind] = {
-        "name": ind,
-        "category": "volume",
-        "library": "talib",
-        "function": ind,
-        "inputs": {"required": ["high", "low", "close", "volume"]},
-        "params": {},
-        "outputs": [ind.lower()],
-        "ui": {"group": "Volume", "overlay": False}
-    }
-
-# Price Transforms
-for ind in ["LINEARREG", "LINEARREG_SLOPE"]:
-    INDICATOR_REGISTRY["indicators"][ind] = {
-        "name": ind,
-        "category": "price_transform",
-        "library": "talib",
-        "function": ind,
+        "function": "BBANDS",
         "inputs": {"required": ["close"]},
-        "params": {"timeperiod": {"type": "int", "default": 14}},
-        "outputs": [ind.lower()],
-        "ui": {"group": "Price Transform", "overlay": False}
+        "params": {
+            "timeperiod": {"type": "int", "default": 20},
+            "nbdevup": {"type": "float", "default": 2},
+            "nbdevdn": {"type": "float", "default": 2}
+        },
+        "outputs": ["upper", "middle", "lower"],
+        "ui": {"group": "Volatility", "overlay": True}
     }
 
-# CANDLESTICK PATTERNS
-def _cdl(name, desc):
-    return {
-        "name": desc,
+    # Volume Indicators
+    for ind in ["OBV", "MFI", "AD", "ADOSC"]:
+        INDICATOR_REGISTRY["indicators"][ind] = {
+            "name": ind,
+            "category": "volume",
+            "library": "talib",
+            "function": ind,
+            "inputs": {"required": ["high", "low", "close", "volume"]},
+            "params": {},
+            "outputs": [ind.lower()],
+            "ui": {"group": "Volume", "overlay": False}
+        }
+
+    # Price Transforms
+    for ind in ["LINEARREG", "LINEARREG_SLOPE"]:
+        INDICATOR_REGISTRY["indicators"][ind] = {
+            "name": ind,
+            "category": "price_transform",
+            "library": "talib",
+            "function": ind,
+            "inputs": {"required": ["close"]},
+            "params": {"timeperiod": {"type": "int", "default": 14}},
+            "outputs": [ind.lower()],
+            "ui": {"group": "Price Transform", "overlay": False}
+        }
+
+    # CANDLESTICK PATTERNS
+    for cdl, desc in {
+        "CDLENGULFING": "Engulfing",
+        "CDLHAMMER": "Hammer",
+        "CDLINVERTEDHAMMER": "Inverted Hammer",
+        "CDLSHOOTINGSTAR": "Shooting Star",
+        "CDLDOJI": "Doji",
+        "CDLDRAGONFLYDOJI": "Dragonfly Doji",
+        "CDLGRAVESTONEDOJI": "Gravestone Doji",
+        "CDLMORNINGSTAR": "Morning Star",
+        "CDLEVENINGSTAR": "Evening Star",
+        "CDLPIERCING": "Piercing",
+        "CDLDARKCLOUDCOVER": "Dark Cloud Cover",
+        "CDL3WHITESOLDIERS": "Three White Soldiers",
+        "CDL3BLACKCROWS": "Three Black Crows",
+        "CDLHARAMI": "Harami",
+        "CDLHARAMICROSS": "Harami Cross",
+        "CDLSPINNINGTOP": "Spinning Top",
+        "CDLTAKURI": "Takuri",
+        "CDLUPSIDEGAP2CROWS": "Upside Gap Two Crows",
+        "CDLSEPARATINGLINES": "Separating Lines"
+    }.items():
+        INDICATOR_REGISTRY["candlestick_patterns"][cdl] = _cdl(cdl, desc)
+
+    # CUSTOM INDICATORS (vectorized NumPy kernels in custom_indicators.py)
+    _add(INDICATOR_REGISTRY, "indicators", "CDLSCAN", {
+        "name": "Candlestick Pattern Scan",
         "category": "candlestick",
-        "library": "talib",
-        "function": name,
+        "library": "numpy",
+        "function": "CDLSCAN",
         "inputs": {"required": ["open", "high", "low", "close"]},
-        "params": {},
-        "outputs": ["signal"],
-        "signal_meaning": {100: "Bullish", -100: "Bearish", 0: "None"},
+        "params": {"patterns": {"type": "list", "default": None}},
+        "outputs": ["bull", "bear"],
+        "chunking": "exact",
         "ui": {"group": "Candlestick Patterns"}
-    }
-for cdl, desc in {
-    "CDLENGULFING": "Engulfing",
-    "CDLHAMMER": "Hammer",
-    "CDLINVERTEDHAMMER": "Inverted Hammer",
-    "CDLSHOOTINGSTAR": "Shooting Star",
-    "CDLDOJI": "Doji",
-    "CDLDRAGONFLYDOJI": "Dragonfly Doji",
-    "CDLGRAVESTONEDOJI": "Gravestone Doji",
-    "CDLMORNINGSTAR": "Morning Star",
-    "CDLEVENINGSTAR": "Evening Star",
-    "CDLPIERCING": "Piercing",
-    "CDLDARKCLOUDCOVER": "Dark Cloud Cover",
-    "CDL3WHITESOLDIERS": "Three White Soldiers",
-    "CDL3BLACKCROWS": "Three Black Crows",
-    "CDLHARAMI": "Harami",
-    "CDLHARAMICROSS": "Harami Cross",
-    "CDLSPINNINGTOP": "Spinning Top",
-    "CDLTAKURI": "Takuri",
-    "CDLUPSIDEGAP2CROWS": "Upside Gap Two Crows",
-    "CDLSEPARATINGLINES": "Separating Lines"
-}.items():
-    INDICATOR_REGISTRY["candlestick_patterns"][cdl] = _cdl(cdl, desc)
+    }, "custom_indicators:pattern_scan")
+    _add(INDICATOR_REGISTRY, "indicators", "VWAP", {
+        "name": "Rolling Volume Weighted Average Price",
+        "category": "volume",
+        "library": "numpy",
+        "function": "VWAP",
+        "inputs": {"required": ["high", "low", "close", "tick_volume"]},
+        "params": {"timeperiod": {"type": "int", "default": 20, "min": 1, "max": 5000}},
+        "outputs": ["vwap"],
+        "ui": {"group": "Volume", "overlay": True}
+    }, "custom_indicators:vwap")
+    _add(INDICATOR_REGISTRY, "indicators", "SUPERTREND", {
+        "name": "SuperTrend",
+        "category": "trend",
+        "library": "numpy",
+        "function": "SUPERTREND",
+        "inputs": {"required": ["high", "low", "close"]},
+        "params": {
+            "timeperiod": {"type": "int", "default": 10, "min": 1, "max": 500},
+            "multiplier": {"type": "float", "default": 3.0}
+        },
+        "outputs": ["supertrend", "direction"],
+        "chunking": "recursive",
+        "ui": {"group": "Trend", "overlay": True}
+    }, "custom_indicators:supertrend")
+    _add(INDICATOR_REGISTRY, "indicators", "PIVOTS", {
+        "name": "Floor Pivot Points",
+        "category": "support_resistance",
+        "library": "numpy",
+        "function": "PIVOTS",
+        "inputs": {"required": ["high", "low", "close"]},
+        "params": {},
+        "outputs": ["pp", "r1", "s1", "r2", "s2", "r3", "s3"],
+        "chunking": "exact",
+        "lookback": 1,
+        "ui": {"group": "Support/Resistance", "overlay": True}
+    }, "custom_indicators:pivots")
+    _add(INDICATOR_REGISTRY, "indicators", "HEIKIN_ASHI", {
+        "name": "Heikin-Ashi",
+        "category": "price_transform",
+        "library": "numpy",
+        "function": "HEIKIN_ASHI",
+        "inputs": {"required": ["open", "high", "low", "close"]},
+        "params": {},
+        "outputs": ["open", "high", "low", "close"],
+        "chunking": "recursive",
+        "ui": {"group": "Price Transform", "overlay": True}
+    }, "custom_indicators:heikin_ashi")
 
+    return INDICATOR_REGISTRY
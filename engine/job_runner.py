@@ -0,0 +1,98 @@
+"""
+Running one job end to end: price data from files, the shared price cache
+or MT5, then indicators, signal, backtest and metrics. Shared by the batch
+CLI (cli.py) and the distributed workers (jobs.py).
+"""
+import time
+
+
+# ==============================
+# JOB EXECUTION
+# ==============================
+
+def load_price_file(path):
+    import pandas as pd
+
+    if path.endswith(".parquet"):
+        df = pd.read_parquet(path)
+    elif path.endswith(".qtk"):
+        # tick store: time/bid/ask for tick-mode backtests
+        from tick_store import TickStore
+
+        with TickStore(path) as store:
+            df = store.read_frame()
+    else:
+        df = pd.read_csv(path)
+
+    if "time" in df.columns and not pd.api.types.is_datetime64_any_dtype(df["time"]):
+        if pd.api.types.is_numeric_dtype(df["time"]):
+            df["time"] = pd.to_datetime(df["time"], unit="s")
+        else:
+            df["time"] = pd.to_datetime(df["time"])
+
+    return df.sort_values("time").reset_index(drop=True)
+
+
+def build_engine(price_config, connection=None, cache=None):
+    from app import CustomEngine, MT5Engine
+
+    if price_config.get("cache"):
+        # distributed jobs: price data from the shared columnar cache (jobs.PriceCache)
+        if cache is None:
+            raise ValueError("Job reads a price cache entry but no cache was given")
+        frames, symbol = cache.get(price_config["cache"])
+        engine = CustomEngine()
+        engine.set_custom_price_data(dict(
+            symbol,
+            timeframes=price_config["timeframes"],
+            is_custom=True,
+            custom_prices=[frames[tf] for tf in price_config["timeframes"]]
+        ))
+        return engine
+
+    if price_config.get("files"):
+        engine = CustomEngine()
+        config = dict(price_config)
+        config["is_custom"] = True
+        config["custom_prices"] = [load_price_file(p) for p in price_config["files"]]
+        engine.set_custom_price_data(config)
+        return engine
+
+    if connection is None:
+        raise ValueError("Job has no price files and no MT5 connection was given")
+
+    import MetaTrader5 as mt5
+
+    engine = MT5Engine(mt5)
+    engine.connect(**connection)
+    engine.set_price_data(price_config)
+    return engine
+
+
+def run_job(job, connection=None, cache=None):
+    """
+    Run one job end to end. Never raises: failures are reported in the result
+    so a single bad strategy does not stop the batch.
+    """
+    started = time.perf_counter()
+    result = {"id": job["id"]}
+    try:
+        engine = build_engine(job["price"], connection, cache)
+        message = engine.set_technical_indicators(job.get("indicators", []))
+        if isinstance(message, str):
+            raise ValueError(message)
+        engine.set_signal(job["signal"])
+        result["metrics"] = engine.run_backtest(job["backtest"], job["account"])
+        result["status"] = "ok"
+    except Exception as exc:
+        result["status"] = "error"
+        result["error"] = f"{type(exc).__name__}: {exc}"
+    result["elapsed"] = time.perf_counter() - started
+    return result
+
+
+def json_default(value):
+    # numpy scalars, pandas periods/timestamps
+    if hasattr(value, "item"):
+        return value.item()
+    return str(value)
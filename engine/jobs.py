@@ -0,0 +1,361 @@
+"""
+Backtest jobs distributed over several machines.
+
+A broker holds the queue; workers on any node pull one job at a time, load
+its price data from a shared columnar cache (the job only carries a cache
+key, never the data) and post the metrics back.
+
+    python cli.py submit jobs.jsonl --broker /shared/queue.db --cache /shared/prices
+    python cli.py worker --broker /shared/queue.db --cache /shared/prices --processes 8
+    python cli.py results --broker /shared/queue.db --output metrics.jsonl
+
+SQLiteBroker is the default: one file, safe for many worker processes on
+one host and on a shared volume with working file locks. Other queues
+(Redis, SQS, a database server) implement the Broker interface.
+
+Jobs are deduplicated on their content: submitting the same price, signal,
+indicator, backtest and account configs twice queues one job, whose result
+is reported under every id it was submitted as. A job whose
+worker dies is handed out again when its lease expires, up to the
+max_attempts it was submitted with (stored per job); a job that fails inside the engine (bad config) is recorded
+as an error result and not retried.
+"""
+import hashlib
+import json
+import os
+import socket
+import sqlite3
+import time
+from abc import ABC, abstractmethod
+from datetime import datetime, timezone
+
+import numpy as np
+
+from job_runner import build_engine, json_default, run_job
+from pipeline import fingerprint
+
+SYMBOL_FIELDS = ("pip_size", "pip_value", "tick_size", "tick_value")
+
+
+def job_key(job):
+    """Content hash of a job, ignoring its id"""
+    content = {k: v for k, v in job.items() if k != "id"}
+    return hashlib.sha256(fingerprint(content).encode()).hexdigest()
+
+
+# ==============================
+# BROKERS
+# ==============================
+
+class Broker(ABC):
+    @abstractmethod
+    def submit(self, job):
+        """
+        Queue a job; returns the id of the queued job (an existing one for
+        duplicates). Raises ValueError when the id is taken by another job.
+        """
+
+    @abstractmethod
+    def claim(self, worker):
+        """Lease the next pending job to worker, or None when nothing is pending"""
+
+    @abstractmethod
+    def complete(self, job_id, result):
+        """Store the result of a claimed job"""
+
+    @abstractmethod
+    def fail(self, job_id, error):
+        """Give a claimed job back for a retry, or mark it failed after its max_attempts"""
+
+    @abstractmethod
+    def counts(self):
+        """{status: number of jobs}"""
+
+    @abstractmethod
+    def results(self):
+        """Iterate the stored results, once per submitted id (duplicates share a result)"""
+
+
+class SQLiteBroker(Broker):
+    """max_attempts applies to the jobs this broker submits; workers use each job's own"""
+
+    def __init__(self, path, lease_seconds=3600, max_attempts=3):
+        self.path = path
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self._db = sqlite3.connect(path, timeout=60, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("""
+            CREATE TABLE IF NOT EXISTS jobs (
+                id TEXT PRIMARY KEY,
+                key TEXT UNIQUE NOT NULL,
+                payload TEXT NOT NULL,
+                status TEXT NOT NULL DEFAULT 'pending',
+                attempts INTEGER NOT NULL DEFAULT 0,
+                max_attempts INTEGER NOT NULL DEFAULT 3,
+                worker TEXT,
+                lease_until REAL,
+                result TEXT,
+                error TEXT
+            )
+        """)
+        # ids of deduplicated submissions -> the queued job that runs for them
+        self._db.execute("CREATE TABLE IF NOT EXISTS aliases (id TEXT PRIMARY KEY, job_id TEXT NOT NULL)")
+        columns = [row[1] for row in self._db.execute("PRAGMA table_info(jobs)")]
+        if "max_attempts" not in columns:
+            self._db.execute("ALTER TABLE jobs ADD COLUMN max_attempts INTEGER NOT NULL DEFAULT 3")
+
+    def submit(self, job):
+        key = job_key(job)
+        db = self._db
+        queued = db.execute(
+            "SELECT key FROM jobs WHERE id = ? "
+            "UNION ALL SELECT jobs.key FROM aliases JOIN jobs ON jobs.id = aliases.job_id WHERE aliases.id = ?",
+            (job["id"], job["id"])
+        ).fetchone()
+        if queued is not None and queued[0] != key:
+            raise ValueError(f"job '{job['id']}': id already queued with a different config")
+        db.execute(
+            "INSERT OR IGNORE INTO jobs (id, key, payload, max_attempts) VALUES (?, ?, ?, ?)",
+            (job["id"], key, json.dumps(job), self.max_attempts)
+        )
+        job_id = db.execute("SELECT id FROM jobs WHERE key = ?", (key,)).fetchone()[0]
+        if job_id != job["id"]:
+            db.execute("INSERT OR IGNORE INTO aliases (id, job_id) VALUES (?, ?)", (job["id"], job_id))
+        return job_id
+
+    def claim(self, worker):
+        now = time.time()
+        db = self._db
+        db.execute("BEGIN IMMEDIATE")
+        try:
+            # expired leases: the worker died, count it as a failed attempt
+            db.execute(
+                "UPDATE jobs SET status = 'failed', error = 'lease expired' "
+                "WHERE status = 'running' AND lease_until < ? AND attempts >= max_attempts",
+                (now,)
+            )
+            row = db.execute(
+                "SELECT id, payload FROM jobs "
+                "WHERE status = 'pending' OR (status = 'running' AND lease_until < ?) "
+                "ORDER BY rowid LIMIT 1",
+                (now,)
+            ).fetchone()
+            if row is not None:
+                db.execute(
+                    "UPDATE jobs SET status = 'running', attempts = attempts + 1, worker = ?, lease_until = ? "
+                    "WHERE id = ?",
+                    (worker, now + self.lease_seconds, row[0])
+                )
+            db.execute("COMMIT")
+        except BaseException:
+            db.execute("ROLLBACK")
+            raise
+        return json.loads(row[1]) if row else None
+
+    def complete(self, job_id, result):
+        # a late worker whose lease was taken over does not overwrite the result
+        self._db.execute(
+            "UPDATE jobs SET status = 'done', result = ?, lease_until = NULL WHERE id = ? AND status = 'running'",
+            (json.dumps(result, default=json_default), job_id)
+        )
+
+    def fail(self, job_id, error):
+        self._db.execute(
+            "UPDATE jobs SET status = CASE WHEN attempts >= max_attempts THEN 'failed' ELSE 'pending' END, "
+            "error = ?, lease_until = NULL WHERE id = ? AND status = 'running'",
+            (error, job_id)
+        )
+
+    def counts(self):
+        counts = {"pending": 0, "running": 0, "done": 0, "failed": 0}
+        for status, count in self._db.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status"):
+            counts[status] = count
+        return counts
+
+    def results(self):
+        aliases = {}
+        for alias, job_id in self._db.execute("SELECT id, job_id FROM aliases"):
+            aliases.setdefault(job_id, []).append(alias)
+
+        rows = self._db.execute("SELECT id, status, result, error, attempts FROM jobs WHERE status IN ('done', 'failed')")
+        for job_id, status, result, error, attempts in rows:
+            if status == "done":
+                record = json.loads(result)
+            else:
+                record = {"id": job_id, "status": "error", "error": error, "attempts": attempts}
+            yield record
+            for alias in aliases.get(job_id, ()):
+                yield dict(record, id=alias)
+
+    def close(self):
+        self._db.close()
+
+
+# ==============================
+# PRICE CACHE
+# ==============================
+
+class PriceCache:
+    """
+    Price frames stored column by column as .npy files under a shared root:
+
+        root/<key>/<timeframe>/<column>.npy
+        root/<key>/meta.json        column order per timeframe, symbol pip/tick sizes
+
+    Reads are memory mapped, so workers on one host share the page cache.
+    """
+
+    def __init__(self, root):
+        self.root = root
+
+    def has(self, key):
+        return os.path.exists(os.path.join(self.root, key, "meta.json"))
+
+    def put(self, key, frames, symbol):
+        """frames: {timeframe: DataFrame} with numeric or datetime columns"""
+        folder = os.path.join(self.root, key)
+        meta = {"timeframes": {}, "symbol": symbol}
+        for tf, df in frames.items():
+            os.makedirs(os.path.join(folder, tf), exist_ok=True)
+            for col in df.columns:
+                values = df[col].to_numpy()
+                if values.dtype == object:
+                    raise ValueError(f"price cache: column '{col}' on {tf} is not numeric")
+                np.save(os.path.join(folder, tf, f"{col}.npy"), values)
+            meta["timeframes"][tf] = list(df.columns)
+
+        # meta.json last: a cache entry only exists once it is complete
+        tmp = os.path.join(folder, f"meta.json.{os.getpid()}")
+        with open(tmp, "w") as f:
+            json.dump(meta, f)
+        os.replace(tmp, os.path.join(folder, "meta.json"))
+
+    def get(self, key):
+        """Returns ({timeframe: DataFrame}, symbol)"""
+        import pandas as pd
+
+        folder = os.path.join(self.root, key)
+        with open(os.path.join(folder, "meta.json")) as f:
+            meta = json.load(f)
+        frames = {
+            tf: pd.DataFrame({
+                col: np.load(os.path.join(folder, tf, f"{col}.npy"), mmap_mode="r")
+                for col in columns
+            })
+            for tf, columns in meta["timeframes"].items()
+        }
+        return frames, meta["symbol"]
+
+
+def pin_price_range(price_config, now=None):
+    """
+    An MT5 config whose range is relative to now (a daterange, or a start
+    without an end) turned into the explicit start/end it resolves to at
+    `now`, so its cache entry is not reused once "now" has moved on. Other
+    configs are returned as they are.
+    """
+    if price_config.get("files") or price_config.get("end"):
+        return price_config
+    from app import get_time_range
+
+    now = now or datetime.now(timezone.utc)
+    pinned = {k: v for k, v in price_config.items() if k != "daterange"}
+    if price_config.get("start"):
+        pinned["end"] = now.isoformat()
+    elif price_config.get("daterange"):
+        start, end = get_time_range(price_config["daterange"], now)
+        pinned.update(start=start.isoformat(), end=end.isoformat())
+    else:
+        return price_config
+    return pinned
+
+
+def price_key(price_config, now=None):
+    """Cache key of a price config: the files' identity, or the MT5 query with its resolved range"""
+    price_config = pin_price_range(price_config, now)
+    content = {k: v for k, v in price_config.items() if k != "files"}
+    if price_config.get("files"):
+        content["files"] = [
+            (os.path.abspath(p), os.path.getsize(p), os.path.getmtime(p)) for p in price_config["files"]
+        ]
+    return hashlib.sha256(fingerprint(content).encode()).hexdigest()[:32]
+
+
+def cache_job_prices(job, cache, connection=None, now=None):
+    """
+    Load the job's price data into the cache; returns the job pointing at
+    the cache entry. now: the time relative dateranges resolve against,
+    one value for a whole submit so equal configs share an entry.
+    """
+    price = job["price"]
+    if price.get("cache"):
+        return job
+
+    price = pin_price_range(price, now)
+    key = price_key(price)
+    if not cache.has(key):
+        engine = build_engine(price, connection)
+        frames = {tf: engine.get_price(tf) for tf in price["timeframes"]}
+        cache.put(key, frames, {field: getattr(engine, f"_{field}") for field in SYMBOL_FIELDS})
+
+    return dict(job, price={"cache": key, "timeframes": price["timeframes"]})
+
+
+# ==============================
+# WORKER
+# ==============================
+
+def worker_name():
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def run_worker(broker, cache, poll=1.0, max_jobs=None, stream=None):
+    """
+    Pull jobs until the queue is drained (nothing pending or running).
+    Returns the number of jobs this worker ran.
+    """
+    name = worker_name()
+    ran = 0
+    while max_jobs is None or ran < max_jobs:
+        job = broker.claim(name)
+        if job is None:
+            counts = broker.counts()
+            if not counts["pending"] and not counts["running"]:
+                break
+            # running jobs may still come back when a lease expires
+            time.sleep(poll)
+            continue
+
+        try:
+            result = run_job(job, cache=cache)
+        except Exception as exc:
+            broker.fail(job["id"], f"{type(exc).__name__}: {exc}")
+            continue
+        result["worker"] = name
+        broker.complete(job["id"], result)
+        ran += 1
+        if stream is not None:
+            stream.write(f"{name} {job['id']} {result['status']} {result['elapsed']:.2f}s\n")
+            stream.flush()
+    return ran
+
+
+def _worker_process(broker_path, cache_root, lease_seconds):
+    broker = SQLiteBroker(broker_path, lease_seconds=lease_seconds)
+    try:
+        return run_worker(broker, PriceCache(cache_root))
+    finally:
+        broker.close()
+
+
+def run_local_workers(broker_path, cache_root, processes, lease_seconds=3600):
+    """Several worker processes on this host, each standing in for a node"""
+    from concurrent.futures import ProcessPoolExecutor
+
+    with ProcessPoolExecutor(max_workers=processes) as pool:
+        futures = [
+            pool.submit(_worker_process, broker_path, cache_root, lease_seconds)
+            for _ in range(processes)
+        ]
+        return [future.result() for future in futures]
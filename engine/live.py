@@ -0,0 +1,391 @@
+"""
+Event-driven live/paper trading loop.
+
+Ticks come from an async source (MT5 polling or a local replay standing in
+for it), are aggregated into bars for every timeframe the strategy uses, and
+on each entry-timeframe bar close the indicators are refreshed over a
+bounded window and the compiled buy/sell logic is evaluated for that bar
+only. Open positions are managed on every tick with the same SL/TP rules as
+run_backtest in tick mode.
+
+    trader = LiveTrader(strategy, indicators, backtest_config, account_config, symbol_info,
+                        history=engine._price_data)
+    report = asyncio.run(trader.run(ReplayTickSource.from_frame(ticks, speed=100)))
+"""
+import asyncio
+import time
+from collections import deque
+from datetime import datetime, timezone
+
+import numpy as np
+import pandas as pd
+
+from backtest import check_exit, close_trade, compute_atr, exit_prices, new_trade
+from indicator_registry import get_registry
+from signal_registry import SESSION_DEFINITIONS
+from specs import compile_account, compile_backtest, compile_indicator, compile_signal, compile_symbol
+from technical_indicators import ColumnWriter, IndicatorExecutor
+from trade_signal import compile_strategy, compute_session_levels
+
+TIMEFRAME_SECONDS = {
+    "M1": 60,
+    "M5": 300,
+    "M15": 900,
+    "H1": 3600,
+    "H4": 14400,
+    "D1": 86400,
+    "W1": 604800
+}
+
+# the epoch is a Thursday, weekly bars open on Sunday like MT5
+_WEEK_OFFSET = 3 * 86400
+
+BAR_COLUMNS = ("open", "high", "low", "close", "tick_volume", "bid", "ask")
+
+
+def bar_open_time(ts, timeframe):
+    seconds = TIMEFRAME_SECONDS[timeframe]
+    offset = _WEEK_OFFSET if timeframe == "W1" else 0
+    return (int(ts) - offset) // seconds * seconds + offset
+
+
+class Tick:
+    __slots__ = ("time", "bid", "ask", "volume")
+
+    def __init__(self, time, bid, ask, volume=0.0):
+        self.time = time  # seconds since epoch (float, ms precision)
+        self.bid = bid
+        self.ask = ask
+        self.volume = volume
+
+
+# ==============================
+# TICK SOURCES
+# ==============================
+
+class ReplayTickSource:
+    """
+    Replays recorded ticks. speed=None replays as fast as possible, otherwise
+    the replay is paced at `speed` times real time.
+    """
+
+    def __init__(self, times, bid, ask, volume=None, speed=None, yield_every=1000):
+        self.times = np.asarray(times, dtype=np.float64)
+        self.bid = np.asarray(bid, dtype=np.float64)
+        self.ask = np.asarray(ask, dtype=np.float64)
+        self.volume = np.zeros(len(self.times)) if volume is None else np.asarray(volume, dtype=np.float64)
+        self.speed = speed
+        self.yield_every = yield_every
+
+    @classmethod
+    def from_frame(cls, df, speed=None):
+        if "time_msc" in df.columns:
+            times = df["time_msc"].to_numpy(dtype=np.float64) / 1000
+        else:
+            times = pd.to_datetime(df["time"]).to_numpy(dtype="datetime64[ns]").astype(np.int64) / 1e9
+        volume = df["volume"].to_numpy() if "volume" in df.columns else None
+        return cls(times, df["bid"].to_numpy(), df["ask"].to_numpy(), volume, speed=speed)
+
+    async def __aiter__(self):
+        loop = asyncio.get_running_loop()
+        wall_start = loop.time()
+        sim_start = self.times[0] if len(self.times) else 0.0
+
+        for i in range(len(self.times)):
+            if self.speed:
+                delay = (self.times[i] - sim_start) / self.speed - (loop.time() - wall_start)
+                if delay > 0:
+                    await asyncio.sleep(delay)
+            elif i % self.yield_every == 0:
+                await asyncio.sleep(0)
+            yield Tick(self.times[i], self.bid[i], self.ask[i], self.volume[i])
+
+
+class MT5TickSource:
+    """Polls copy_ticks_from; the blocking MT5 call runs in the default executor."""
+
+    def __init__(self, mt5, symbol, poll_interval=0.05, batch=1000):
+        self.mt5 = mt5
+        self.symbol = symbol
+        self.poll_interval = poll_interval
+        self.batch = batch
+
+    async def __aiter__(self):
+        loop = asyncio.get_running_loop()
+        last_msc = 0
+        since = datetime.now(timezone.utc)
+
+        while True:
+            ticks = await loop.run_in_executor(
+                None, self.mt5.copy_ticks_from, self.symbol, since, self.batch, self.mt5.COPY_TICKS_ALL
+            )
+            if ticks is not None:
+                for tick in ticks:
+                    if tick["time_msc"] <= last_msc:
+                        continue
+                    last_msc = int(tick["time_msc"])
+                    yield Tick(last_msc / 1000, float(tick["bid"]), float(tick["ask"]), float(tick["volume"]))
+                if last_msc:
+                    since = datetime.fromtimestamp(last_msc / 1000, timezone.utc)
+            await asyncio.sleep(self.poll_interval)
+
+
+# ==============================
+# BAR AGGREGATION
+# ==============================
+
+class BarBuilder:
+    """Builds bid bars for one timeframe; a bar closes on the first tick of the next one."""
+
+    def __init__(self, timeframe):
+        self.timeframe = timeframe
+        self.bar = None
+
+    def update(self, tick):
+        opened = bar_open_time(tick.time, self.timeframe)
+        closed = None
+
+        if self.bar is not None and opened != self.bar["time"]:
+            closed = self.bar
+            self.bar = None
+
+        if self.bar is None:
+            self.bar = {
+                "time": opened,
+                "open": tick.bid,
+                "high": tick.bid,
+                "low": tick.bid,
+                "close": tick.bid,
+                "tick_volume": 0,
+                "bid": tick.bid,
+                "ask": tick.ask
+            }
+
+        bar = self.bar
+        bar["high"] = max(bar["high"], tick.bid)
+        bar["low"] = min(bar["low"], tick.bid)
+        bar["close"] = tick.bid
+        bar["tick_volume"] += 1
+        bar["bid"] = tick.bid
+        bar["ask"] = tick.ask
+
+        return closed
+
+
+# ==============================
+# LATENCY
+# ==============================
+
+class LatencyStats:
+    """
+    Latency summary in bounded memory for loops that never end: count, mean
+    and max over every sample, percentiles over the last `recent` samples.
+    """
+
+    def __init__(self, recent=100_000):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.recent = deque(maxlen=recent)
+
+    def add(self, seconds):
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+        self.recent.append(seconds)
+
+    def summary_us(self):
+        if not self.count:
+            return {"mean": 0.0, "p50": 0.0, "p99": 0.0, "max": 0.0}
+        recent = np.fromiter(self.recent, dtype=np.float64, count=len(self.recent)) * 1e6
+        return {
+            "mean": self.total / self.count * 1e6,
+            "p50": float(np.percentile(recent, 50)),
+            "p99": float(np.percentile(recent, 99)),
+            "max": self.max * 1e6
+        }
+
+
+def empty_bars():
+    """Bar frame without rows, typed like the bars BarBuilder closes (TA-Lib needs float64)"""
+    frame = pd.DataFrame({col: pd.Series(dtype=np.float64) for col in BAR_COLUMNS})
+    frame.insert(0, "time", pd.Series(dtype="datetime64[ns]"))
+    return frame
+
+
+# ==============================
+# TRADER
+# ==============================
+
+class LiveTrader:
+    """
+    symbol: dict with pip_size, pip_value, tick_size, tick_value (see Engine).
+    history: optional {timeframe: DataFrame} warm-up bars, e.g. engine._price_data.
+    window: bars kept per timeframe; indicators are recomputed over this window,
+            so recursive ones (EMA, RSI...) need it comfortably above their period.
+    on_open / on_close: callbacks receiving the trade dict, to route orders when paper
+            trading is promoted to live.
+    """
+
+    def __init__(self, strategy, indicators, backtest_config, account_config, symbol,
+                 history=None, window=500, registry=None, on_open=None, on_close=None):
+        self.strategy = compile_signal(strategy)
+        self.spec = compile_backtest(backtest_config, compile_account(account_config), compile_symbol(symbol))
+        self.entry_tf = self.strategy.entry_timeframe
+        self.window = window
+        self.on_open = on_open
+        self.on_close = on_close
+
+        self.balance = self.spec.account.account_size
+
+        self.registry = registry or get_registry()
+        self.executor = IndicatorExecutor(self.registry)
+        self.indicators = [compile_indicator(cfg, self.registry) for cfg in indicators]
+        self.evaluate = compile_strategy(strategy)
+
+        timeframes = {self.entry_tf} | {spec.timeframe for spec in self.indicators}
+        timeframes |= {tf for tf, _ in self.strategy.columns}
+        self.builders = {tf: BarBuilder(tf) for tf in timeframes}
+        self.frames = {}
+        for tf in timeframes:
+            frame = history.get(tf) if history else None
+            if frame is None:
+                frame = empty_bars()
+            self.frames[tf] = frame.tail(window).reset_index(drop=True).copy()
+
+        self.open_trades = []
+        self.trades = []
+        self.bars = 0
+        self.latencies = LatencyStats()
+        self.first_tick = None
+        self.last_tick = None
+        self.wall_seconds = 0.0
+
+    # ------------------------------
+    # tick pipeline
+    # ------------------------------
+
+    def on_tick(self, tick):
+        started = time.perf_counter()
+
+        if self.first_tick is None:
+            self.first_tick = tick.time
+        self.last_tick = tick.time
+
+        entry_bar_closed = False
+        for tf, builder in self.builders.items():
+            bar = builder.update(tick)
+            if bar is not None:
+                self._on_bar(tf, bar)
+                entry_bar_closed |= tf == self.entry_tf
+
+        # every timeframe is up to date before the entry bar is evaluated
+        if entry_bar_closed:
+            self._on_entry_bar(tick)
+
+        self._check_exits(tick)
+
+        self.latencies.add(time.perf_counter() - started)
+
+    def _on_bar(self, tf, bar):
+        self.bars += 1
+        row = dict(bar)
+        row["time"] = pd.Timestamp(bar["time"], unit="s")
+        row = pd.DataFrame([row]).astype({col: np.float64 for col in BAR_COLUMNS})
+        frame = self.frames[tf]
+        # cold start: the first bar becomes the frame
+        frame = row if frame.empty else pd.concat([frame, row], ignore_index=True)
+        frame = frame.tail(self.window).reset_index(drop=True)
+
+        for spec in self.indicators:
+            if spec.timeframe != tf:
+                continue
+            values = self.executor.run_spec(frame, spec)
+            ColumnWriter.write(frame, spec.name, spec.meta["outputs"], values)
+
+        self.frames[tf] = frame
+
+    def _on_entry_bar(self, tick):
+        sessions = {}
+        frames = self.frames
+        entry_tf = self.entry_tf
+
+        def resolve(ref):
+            ref_type = ref["type"]
+            if ref_type == "column":
+                return frames[ref.get("timeframe", entry_tf)][ref["column"]].iloc[-1]
+            if ref_type == "session":
+                name = ref["session"]
+                if name not in sessions:
+                    levels = compute_session_levels(frames, {name: SESSION_DEFINITIONS[name]}, entry_tf)
+                    sessions[name] = levels[name].iloc[-1]
+                return sessions[name][ref["value"]]
+            if ref_type == "literal":
+                return ref["value"]
+            raise ValueError(f"Unknown reference type: {ref_type}")
+
+        direction = self.evaluate(resolve)
+        if direction == 0:
+            return
+
+        if self.spec.single_trade_per_direction:
+            if any(t["direction"] == direction for t in self.open_trades):
+                return
+
+        entry_price = tick.ask if direction == 1 else tick.bid
+        entry_price = self.spec.entry_price(entry_price, direction)
+
+        atr = compute_atr(frames[entry_tf], period=14).iloc[-1] if self.spec.uses_atr else None
+        sl, tp = self.spec.levels(direction, entry_price, atr)
+        trade = new_trade(pd.Timestamp(tick.time, unit="s"), direction, entry_price, sl, tp, self.balance)
+        self.open_trades.append(trade)
+        if self.on_open:
+            self.on_open(trade)
+
+    def _check_exits(self, tick):
+        if not self.open_trades:
+            return
+        quote = {"bid": tick.bid, "ask": tick.ask}
+        for t in self.open_trades.copy():
+            high, low = exit_prices(t["direction"], "tick", quote)
+            exit_price, reason = check_exit(t, high, low)
+            if exit_price is not None:
+                self.balance = close_trade(t, pd.Timestamp(tick.time, unit="s"), exit_price, reason,
+                                           self.balance, self.spec)
+                self.trades.append(t)
+                self.open_trades.remove(t)
+                if self.on_close:
+                    self.on_close(t)
+
+    # ------------------------------
+    # driver and reporting
+    # ------------------------------
+
+    async def run(self, source, max_ticks=None):
+        started = time.perf_counter()
+        count = 0
+        async for tick in source:
+            self.on_tick(tick)
+            count += 1
+            if max_ticks is not None and count >= max_ticks:
+                break
+        self.wall_seconds += time.perf_counter() - started
+        return self.report()
+
+    def report(self):
+        sim_seconds = float(self.last_tick - self.first_tick) if self.first_tick is not None else 0.0
+        return {
+            "ticks": self.latencies.count,
+            "bars": self.bars,
+            "closed_trades": len(self.trades),
+            "open_trades": len(self.open_trades),
+            "balance": float(self.balance),
+            "latency_us": self.latencies.summary_us(),
+            "sim_seconds": sim_seconds,
+            "wall_seconds": self.wall_seconds,
+            "speed_vs_realtime": sim_seconds / self.wall_seconds if self.wall_seconds else 0.0
+        }
+
+    def trades_frame(self):
+        return pd.DataFrame(self.trades)
+
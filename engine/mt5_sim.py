@@ -0,0 +1,248 @@
+"""
+File-backed stand-in for the MetaTrader5 module.
+
+FileMT5 answers the calls MT5Engine makes (initialize, symbol_info,
+copy_ticks_range, copy_rates_range, copy_ticks_from) from recorded files,
+so the full _set_price_data path runs without a terminal or network:
+
+    root/
+      EURUSD/
+        symbol.json        symbol_info fields (point, digits, trade_tick_size, ...)
+        ticks.npy          structured array, TICK_DTYPE
+        ticks.qtk          or a compact tick store (tick_store.py): time_msc, bid, ask only
+        rates_M1.npy       structured array, RATES_DTYPE, one file per timeframe
+        rates_H1.npy
+
+.npy files are memory mapped and range queries return views into the map;
+.parquet files with the same columns are accepted in place of .npy.
+
+    engine = MT5SimEngine("recordings")
+    engine.connect()
+    engine.set_price_data({"symbol": "EURUSD", "timeframes": ["H1"],
+                           "start": "2024-01-01", "end": "2024-06-30"})
+"""
+import json
+import os
+from bisect import bisect_left, bisect_right
+from collections import namedtuple
+
+import numpy as np
+
+from app import MT5Engine
+from tick_store import TickStore, epoch_seconds as _epoch, write_ticks
+
+TICK_DTYPE = np.dtype([
+    ("time", "<i8"), ("bid", "<f8"), ("ask", "<f8"), ("last", "<f8"), ("volume", "<u8"),
+    ("time_msc", "<i8"), ("flags", "<u4"), ("volume_real", "<f8")
+])
+
+RATES_DTYPE = np.dtype([
+    ("time", "<i8"), ("open", "<f8"), ("high", "<f8"), ("low", "<f8"), ("close", "<f8"),
+    ("tick_volume", "<u8"), ("spread", "<i4"), ("real_volume", "<u8")
+])
+
+# numeric values of the MetaTrader5 constants
+TIMEFRAMES = {
+    "M1": 1,
+    "M5": 5,
+    "M15": 15,
+    "H1": 16385,
+    "H4": 16388,
+    "D1": 16408,
+    "W1": 32769
+}
+
+SymbolInfo = namedtuple("SymbolInfo", [
+    "name", "point", "digits", "trade_tick_size", "trade_tick_value", "trade_contract_size"
+])
+
+
+class FileMT5:
+    COPY_TICKS_ALL = -1
+    COPY_TICKS_INFO = 1
+    COPY_TICKS_TRADE = 2
+
+    TIMEFRAME_M1 = TIMEFRAMES["M1"]
+    TIMEFRAME_M5 = TIMEFRAMES["M5"]
+    TIMEFRAME_M15 = TIMEFRAMES["M15"]
+    TIMEFRAME_H1 = TIMEFRAMES["H1"]
+    TIMEFRAME_H4 = TIMEFRAMES["H4"]
+    TIMEFRAME_D1 = TIMEFRAMES["D1"]
+    TIMEFRAME_W1 = TIMEFRAMES["W1"]
+
+    def __init__(self, root):
+        self.root = root
+        self._arrays = {}
+        self._symbols = {}
+        self._timeframe_names = {v: k for k, v in TIMEFRAMES.items()}
+
+    # ------------------------------
+    # terminal
+    # ------------------------------
+
+    def initialize(self, *args, **kwargs):
+        return os.path.isdir(self.root)
+
+    def shutdown(self):
+        self._arrays.clear()
+
+    def last_error(self):
+        return (1, "Success")
+
+    def symbol_info(self, symbol):
+        if symbol not in self._symbols:
+            path = os.path.join(self.root, symbol, "symbol.json")
+            if not os.path.exists(path):
+                return None
+            with open(path) as f:
+                info = json.load(f)
+            self._symbols[symbol] = SymbolInfo(
+                name=symbol,
+                point=info["point"],
+                digits=info.get("digits", 5),
+                trade_tick_size=info["trade_tick_size"],
+                trade_tick_value=info["trade_tick_value"],
+                trade_contract_size=info.get("trade_contract_size", 100000)
+            )
+        return self._symbols[symbol]
+
+    # ------------------------------
+    # data
+    # ------------------------------
+
+    def copy_ticks_range(self, symbol, date_from, date_to, flags):
+        ticks = self._load(symbol, "ticks")
+        if ticks is None:
+            return None
+        if isinstance(ticks, TickStore):
+            # decodes only the chunks of the range; fields not stored stay zero
+            return _tick_array(ticks.range(_epoch(date_from), _epoch(date_to)))
+        start, stop = self._range(ticks, _epoch(date_from), _epoch(date_to))
+        return ticks[start:stop]
+
+    def copy_ticks_from(self, symbol, date_from, count, flags):
+        ticks = self._load(symbol, "ticks")
+        if ticks is None:
+            return None
+        if isinstance(ticks, TickStore):
+            return _tick_array(ticks.from_msc(_epoch(date_from) * 1000, count))
+        times = ticks["time"]
+        start = bisect_left(times, _epoch(date_from))
+        return ticks[start:start + count]
+
+    def copy_rates_range(self, symbol, timeframe, date_from, date_to):
+        name = self._timeframe_names.get(timeframe)
+        rates = self._load(symbol, f"rates_{name}") if name else None
+        if rates is None:
+            return None
+        start, stop = self._range(rates, _epoch(date_from), _epoch(date_to))
+        return rates[start:stop]
+
+    @staticmethod
+    def _range(array, start, end):
+        # bisect on the strided field view: O(log n) reads, no copy of the column
+        times = array["time"]
+        return bisect_left(times, start), bisect_right(times, end)
+
+    def _load(self, symbol, name):
+        key = (symbol, name)
+        if key not in self._arrays:
+            base = os.path.join(self.root, symbol, name)
+            if name == "ticks" and os.path.exists(base + ".qtk"):
+                self._arrays[key] = TickStore(base + ".qtk")
+            elif os.path.exists(base + ".npy"):
+                self._arrays[key] = np.load(base + ".npy", mmap_mode="r")
+            elif os.path.exists(base + ".parquet"):
+                import pyarrow.parquet as pq
+
+                table = pq.read_table(base + ".parquet", memory_map=True)
+                dtype = TICK_DTYPE if name == "ticks" else RATES_DTYPE
+                array = np.empty(table.num_rows, dtype=dtype)
+                for field in dtype.names:
+                    if field in table.column_names:
+                        array[field] = table.column(field).to_numpy()
+                    else:
+                        array[field] = 0
+                self._arrays[key] = array
+            else:
+                self._arrays[key] = None
+        return self._arrays[key]
+
+
+def _tick_array(decoded):
+    # fields the tick store does not keep stay zero
+    array = np.zeros(len(decoded["time"]), dtype=TICK_DTYPE)
+    for field, values in decoded.items():
+        array[field] = values
+    return array
+
+
+# ==============================
+# RECORDING
+# ==============================
+
+def write_symbol(root, symbol, info, ticks=None, rates=None, tick_store=False):
+    """
+    Write a symbol's recording. info: symbol_info fields, ticks: array-like
+    convertible to TICK_DTYPE, rates: {timeframe: array-like of RATES_DTYPE}.
+    tick_store: write ticks.qtk (time_msc, bid, ask, chunk-compressed) instead of ticks.npy.
+    """
+    folder = os.path.join(root, symbol)
+    os.makedirs(folder, exist_ok=True)
+    with open(os.path.join(folder, "symbol.json"), "w") as f:
+        json.dump(info, f, indent=2)
+
+    if ticks is not None and tick_store:
+        write_ticks(os.path.join(folder, "ticks.qtk"), _as_structured(ticks, TICK_DTYPE), info.get("digits", 5))
+    elif ticks is not None:
+        np.save(os.path.join(folder, "ticks.npy"), _as_structured(ticks, TICK_DTYPE))
+    for tf, array in (rates or {}).items():
+        np.save(os.path.join(folder, f"rates_{tf}.npy"), _as_structured(array, RATES_DTYPE))
+
+
+def record_symbol(mt5, root, symbol, start, end, timeframes):
+    """Record a symbol from a live terminal for later simulated runs."""
+    info = mt5.symbol_info(symbol)
+    ticks = mt5.copy_ticks_range(symbol, start, end, mt5.COPY_TICKS_ALL)
+    rates = {
+        tf: mt5.copy_rates_range(symbol, getattr(mt5, f"TIMEFRAME_{tf}"), start, end)
+        for tf in timeframes
+    }
+    write_symbol(root, symbol, {
+        "point": info.point,
+        "digits": info.digits,
+        "trade_tick_size": info.trade_tick_size,
+        "trade_tick_value": info.trade_tick_value,
+        "trade_contract_size": info.trade_contract_size
+    }, ticks, rates)
+
+
+def _as_structured(array, dtype):
+    if isinstance(array, np.ndarray) and array.dtype == dtype:
+        return array
+    out = np.zeros(len(array), dtype=dtype)
+    names = array.dtype.names if isinstance(array, np.ndarray) else array.columns
+    for field in dtype.names:
+        if field in names:
+            out[field] = np.asarray(array[field])
+    if "time_msc" in dtype.names and "time_msc" not in names:
+        out["time_msc"] = out["time"] * 1000
+    return out
+
+
+# ==============================
+# ENGINE
+# ==============================
+
+class MT5SimEngine(MT5Engine):
+    """MT5Engine over recorded files: same code path, no terminal, no connect delay."""
+
+    def __init__(self, root):
+        self.mt5 = FileMT5(root)
+        super().__init__(self.mt5)
+
+    def connect(self, login=None, password=None, server=None, path=None):
+        if self.mt5.initialize(login=login, password=password, server=server, path=path):
+            self._connect()
+        else:
+            raise ValueError(f"No recordings found in {self.mt5.root}")
@@ -0,0 +1,176 @@
+"""
+Incremental price -> indicators -> signal -> trades -> metrics pipeline.
+
+Every node remembers the inputs it was last computed from (config
+fingerprints, the engine data version, the revisions of the nodes it reads)
+and takes a new revision when it recomputes. Revisions come from one
+pipeline-wide counter, so a removed and re-added node never reuses one. Pulling metrics walks the
+graph from the end and recomputes only nodes whose inputs changed, so
+editing one indicator period recomputes that indicator, then the signal
+only if it reads that indicator's columns, then trades and metrics.
+
+    pipe = engine.pipeline
+    pipe.set_indicators(indicators)
+    pipe.set_signal(signal)
+    pipe.set_backtest(backtest_config, account_config)
+    metrics = pipe.metrics()
+
+    pipe.set_indicator(dict(indicators[0], params={"timeperiod": 50}))
+    metrics = pipe.metrics()          # one indicator, signal, trades, metrics
+
+Indicators no signal reads are only computed by pipe.indicators(). Session
+levels sit between price data and the signal inside the engine's
+SessionLevelCache, which is keyed by the same data version.
+"""
+import json
+
+
+def fingerprint(config):
+    return json.dumps(config, sort_keys=True, default=str)
+
+
+class _Node:
+    __slots__ = ("inputs", "revision")
+
+    def __init__(self):
+        self.inputs = None
+        self.revision = 0
+
+
+class Pipeline:
+    def __init__(self, engine):
+        self.engine = engine
+        self._indicators = {}   # name -> (cfg, IndicatorSpec)
+        self._signal = None
+        self._backtest = None   # (backtest_config, account_config)
+        self._nodes = {}
+        self._revision = 0      # last revision handed out, only ever increases
+        self.recomputed = []    # node keys recomputed by the last pull
+
+    # ------------------------------
+    # configuration (marks nodes dirty through their inputs)
+    # ------------------------------
+
+    def set_indicators(self, indicators):
+        """Replace the indicator set; unchanged configs keep their columns"""
+        names = {cfg["name"] for cfg in indicators}
+        for name in list(self._indicators):
+            if name not in names:
+                self.remove_indicator(name)
+        for cfg in indicators:
+            self.set_indicator(cfg)
+
+    def set_indicator(self, cfg):
+        from specs import compile_indicator
+
+        spec = compile_indicator(cfg, self.engine._registry, self.engine._price_data)
+        previous = self._indicators.get(spec.name)
+        if previous and (previous[1].timeframe, previous[1].columns) != (spec.timeframe, spec.columns):
+            self._drop_columns(previous[1])
+        self._indicators[spec.name] = (cfg, spec)
+
+    def remove_indicator(self, name):
+        _, spec = self._indicators.pop(name)
+        self._drop_columns(spec)
+        self._nodes.pop(("indicator", name), None)
+        self.engine._user_indicators.pop(name, None)
+
+    def set_signal(self, signal):
+        from specs import compile_signal
+
+        compile_signal(signal, self.engine._price_data)
+        self._signal = signal
+
+    def set_backtest(self, backtest_config, account_config):
+        self._backtest = (backtest_config, account_config)
+
+    # ------------------------------
+    # pulls
+    # ------------------------------
+
+    def indicators(self):
+        self.recomputed = []
+        for name in self._indicators:
+            self._indicator(name)
+
+    def signal(self):
+        self.recomputed = []
+        return self._signal_node()
+
+    def trades(self):
+        self.recomputed = []
+        self._trades_node()
+        return self.engine._backtest
+
+    def metrics(self):
+        self.recomputed = []
+        self._metrics_node()
+        return self.engine._backtest_metrics
+
+    # ------------------------------
+    # nodes
+    # ------------------------------
+
+    def _pull(self, key, inputs, compute):
+        node = self._nodes.setdefault(key, _Node())
+        if node.inputs != inputs:
+            compute()
+            node.inputs = inputs
+            self._revision += 1
+            node.revision = self._revision
+            self.recomputed.append(key)
+        return node.revision
+
+    def _indicator(self, name):
+        cfg, spec = self._indicators[name]
+
+        def compute():
+            from technical_indicators import ColumnWriter, IndicatorValidator
+
+            engine = self.engine
+            IndicatorValidator(engine._registry, engine._price_data).validate(cfg)
+            df = engine._price_data[spec.timeframe]
+            ColumnWriter.write(df, spec.name, spec.meta["outputs"], engine._executor.run_spec(df, spec))
+            engine._user_indicators[name] = cfg
+
+        return self._pull(("indicator", name), (self.engine._data_version, fingerprint(cfg)), compute)
+
+    def _signal_node(self):
+        if self._signal is None:
+            raise ValueError("No signal set, call set_signal first")
+        from specs import compile_signal
+
+        # only the indicators whose columns the logic reads
+        owners = {
+            (spec.timeframe, column): name
+            for name, (_, spec) in self._indicators.items()
+            for column in spec.columns
+        }
+        read = sorted({owners[ref] for ref in compile_signal(self._signal).columns if ref in owners})
+        inputs = (
+            self.engine._data_version,
+            fingerprint(self._signal),
+            tuple((name, self._indicator(name)) for name in read)
+        )
+        return self._pull(("signal",), inputs, lambda: self.engine.set_signal(self._signal))
+
+    def _trades_node(self):
+        if self._backtest is None:
+            raise ValueError("No backtest set, call set_backtest first")
+        inputs = (
+            self._signal_node(),
+            fingerprint(self._backtest),
+            self.engine._symbol_spec()
+        )
+        return self._pull(("trades",), inputs, lambda: self.engine._run_trades(*self._backtest))
+
+    def _metrics_node(self):
+        def compute():
+            self.engine._backtest_metrics = self.engine._final_metrics()
+
+        return self._pull(("metrics",), (self._trades_node(),), compute)
+
+    def _drop_columns(self, spec):
+        df = self.engine._price_data.get(spec.timeframe)
+        if df is not None:
+            df.drop(columns=[c for c in spec.columns if c in df.columns], inplace=True)
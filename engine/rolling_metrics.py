@@ -0,0 +1,143 @@
+"""
+Rolling performance metrics as time series, for charting long backtests.
+
+Every series is computed in one linear pass: window sums come from prefix
+sums and the rolling equity peak from a monotonic deque, so the cost does
+not depend on the window length. Definitions follow compute_backtest_metrics
+(sample std, Sortino on losing periods only, profit factor inf without
+losses), evaluated over each window instead of the whole run.
+"""
+from collections import deque
+
+import numpy as np
+import pandas as pd
+
+
+# ==============================
+# WINDOW HELPERS
+# ==============================
+
+def _window_sum(prefix, starts):
+    # prefix[i + 1] - prefix[start_i] for every point i
+    return prefix[1:] - prefix[starts]
+
+
+def _prefix(values):
+    return np.concatenate(([0.0], np.cumsum(values, dtype=np.float64)))
+
+
+def _rolling_max(values, starts):
+    """Max of values[starts[i]:i + 1] for every i; starts must be non-decreasing"""
+    out = np.empty(len(values))
+    window = deque()
+    for i, value in enumerate(values):
+        while window and values[window[-1]] <= value:
+            window.pop()
+        window.append(i)
+        while window[0] < starts[i]:
+            window.popleft()
+        out[i] = values[window[0]]
+    return out
+
+
+def _ratio(num, den, count, empty_value):
+    """num / den like the whole-period metrics: 0 when den == 0, NaN below two samples"""
+    with np.errstate(divide="ignore", invalid="ignore"):
+        out = np.where(den != 0, num / den, empty_value)
+    return np.where(count < 2, np.nan, out)
+
+
+def _std(sums, squares, count):
+    with np.errstate(divide="ignore", invalid="ignore"):
+        mean = sums / count
+        var = (squares - count * mean * mean) / (count - 1)
+        # prefix-sum cancellation noise on constant windows is a zero variance
+        var = np.where(var <= 1e-12 * squares / count, 0.0, var)
+    return np.sqrt(var)
+
+
+# ==============================
+# ROLLING METRICS
+# ==============================
+
+def compute_rolling_metrics(trades_df, window, by="trades", dtype=np.float32):
+    """
+    by="trades": window of the last `window` trades, one point per trade.
+    by="days":   window of the last `window` calendar days, one point per
+                 day with closed trades; Sharpe/Sortino use daily PnL.
+
+    Returns a dict of equal-length arrays: time, equity, sharpe, sortino,
+    win_rate, profit_factor, drawdown, drawdown_pct.
+    """
+    if trades_df.empty:
+        return {}
+    if window < 1:
+        raise ValueError("window must be at least 1")
+
+    df = trades_df.sort_values("exit_time", kind="stable")
+    pnl = df["pnl"].to_numpy(dtype=np.float64)
+    balance = df["balance"].to_numpy(dtype=np.float64)
+
+    if by == "trades":
+        time = df["exit_time"].to_numpy()
+        returns = pnl
+        gross_profit = np.where(pnl > 0, pnl, 0.0)
+        gross_loss = np.where(pnl < 0, pnl, 0.0)
+        wins = (pnl > 0).astype(np.float64)
+        trades = np.ones(len(pnl))
+        equity = balance
+        starts = np.maximum(np.arange(len(pnl)) - window + 1, 0)
+    elif by == "days":
+        days = df["exit_time"].dt.floor("D").to_numpy()
+        time, first, counts = np.unique(days, return_index=True, return_counts=True)
+        last = first + counts - 1
+        returns = np.add.reduceat(pnl, first)
+        gross_profit = np.add.reduceat(np.where(pnl > 0, pnl, 0.0), first)
+        gross_loss = np.add.reduceat(np.where(pnl < 0, pnl, 0.0), first)
+        wins = np.add.reduceat((pnl > 0).astype(np.float64), first)
+        trades = counts.astype(np.float64)
+        equity = balance[last]
+        starts = np.searchsorted(time, time - pd.Timedelta(days=window - 1).to_timedelta64(), side="left")
+    else:
+        raise ValueError(f"Unknown rolling window unit: {by}")
+
+    count = np.arange(len(returns)) - starts + 1.0
+
+    # Sharpe over the window returns
+    sums = _window_sum(_prefix(returns), starts)
+    squares = _window_sum(_prefix(returns * returns), starts)
+    mean = sums / count
+    sharpe = _ratio(mean, _std(sums, squares, count), count, 0.0)
+
+    # Sortino: std of the losing periods only
+    negative = np.where(returns < 0, returns, 0.0)
+    neg_count = _window_sum(_prefix(returns < 0), starts)
+    neg_std = _std(_window_sum(_prefix(negative), starts),
+                   _window_sum(_prefix(negative * negative), starts), neg_count)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        sortino = np.where((neg_count > 0) & (neg_std != 0), mean / neg_std, 0.0)
+    sortino = np.where(neg_count == 1, np.nan, sortino)
+
+    # trade counts and gross PnL
+    win_rate = _window_sum(_prefix(wins), starts) / _window_sum(_prefix(trades), starts)
+    gp = _window_sum(_prefix(gross_profit), starts)
+    gl = _window_sum(_prefix(gross_loss), starts)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        profit_factor = np.where(gl != 0, gp / np.abs(gl), np.inf)
+
+    # drawdown from the peak equity inside the window
+    peak = _rolling_max(equity, starts)
+    drawdown = equity - peak
+    with np.errstate(divide="ignore", invalid="ignore"):
+        drawdown_pct = drawdown / peak * 100
+
+    return {
+        "time": time,
+        "equity": equity.astype(dtype),
+        "sharpe": sharpe.astype(dtype),
+        "sortino": sortino.astype(dtype),
+        "win_rate": win_rate.astype(dtype),
+        "profit_factor": profit_factor.astype(dtype),
+        "drawdown": drawdown.astype(dtype),
+        "drawdown_pct": drawdown_pct.astype(dtype)
+    }
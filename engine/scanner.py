@@ -0,0 +1,378 @@
+"""
+Multi-symbol signal scanner.
+
+Holds the last `window` bars of every symbol and timeframe a strategy uses
+in preallocated ring buffers. Each batch of closed bars is appended, the
+indicators of the timeframes that closed are refreshed over the window and,
+for symbols whose entry bar closed, the compiled buy/sell logic is
+evaluated for that bar only. Symbols are split over worker processes, each
+owning the rings of its symbols, so a batch is scanned in parallel.
+
+    feed = ReplayBarFeed.from_mt5(FileMT5("recordings"), symbols, ["H1", "H4"], start, end)
+    with Scanner(strategy, indicators, symbols, workers=4) as scanner:
+        report = asyncio.run(scanner.run(feed, on_signal=print))
+
+on_signal receives {"symbol", "time", "signal"} for every fresh buy (1) or
+sell (-1). As in LiveTrader, recursive indicators need a window comfortably
+above their period.
+"""
+import asyncio
+import time
+
+import numpy as np
+import pandas as pd
+
+from indicator_registry import get_registry
+from live import TIMEFRAME_SECONDS, LatencyStats
+from signal_registry import SESSION_DEFINITIONS
+from specs import compile_indicator, compile_signal
+from technical_indicators import IndicatorExecutor
+from trade_signal import compile_strategy, compute_session_levels
+
+BAR_FIELDS = ("time", "open", "high", "low", "close", "tick_volume", "bid", "ask")
+
+
+def _seconds(values):
+    values = np.asarray(values)
+    if np.issubdtype(values.dtype, np.datetime64):
+        return values.astype("datetime64[s]").astype(np.int64)
+    return values.astype(np.int64)
+
+
+# ==============================
+# RING BUFFER
+# ==============================
+
+class BarRing:
+    """
+    Last `capacity` bars, one preallocated array per field. Every bar is
+    written twice (at i and i + capacity) so the window is always one
+    contiguous slice, which is what TA-Lib takes without a copy.
+    """
+
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self.count = 0
+        self._head = 0
+        self._data = {
+            field: np.zeros(2 * capacity, dtype=np.int64 if field == "time" else np.float64)
+            for field in BAR_FIELDS
+        }
+
+    def append(self, bar):
+        i = self._head
+        cap = self.capacity
+        for field, data in self._data.items():
+            data[i] = data[i + cap] = bar.get(field, np.nan)
+        self._head = (i + 1) % cap
+        self.count = min(self.count + 1, cap)
+
+    def fill(self, columns):
+        """Replace the contents with the last bars of {field: array}"""
+        n = min(len(columns["time"]), self.capacity)
+        for field, data in self._data.items():
+            values = columns[field][len(columns[field]) - n:] if field in columns else np.nan
+            data[:n] = values
+            data[self.capacity:self.capacity + n] = values
+        self._head = n % self.capacity
+        self.count = n
+
+    def view(self, field):
+        data = self._data[field]
+        if self.count < self.capacity:
+            return data[:self.count]
+        return data[self._head:self._head + self.capacity]
+
+    def last(self, field):
+        return self._data[field][(self._head - 1) % self.capacity]
+
+    def frame(self):
+        df = pd.DataFrame({field: self.view(field) for field in BAR_FIELDS})
+        df["time"] = pd.to_datetime(df["time"], unit="s")
+        return df
+
+
+# ==============================
+# SHARD
+# ==============================
+
+class _ScanShard:
+    """Rings, latest indicator values and compiled logic of a subset of the symbols"""
+
+    def __init__(self, strategy, indicators, symbols, window, history=None, registry=None):
+        signal = compile_signal(strategy)
+        self.entry_tf = signal.entry_timeframe
+        self.evaluate = compile_strategy(strategy)
+
+        registry = registry or get_registry()
+        self.indicators = [compile_indicator(cfg, registry) for cfg in indicators]
+        self.kernels = [IndicatorExecutor.resolve(spec.meta) for spec in self.indicators]
+        self.timeframes = {self.entry_tf} | {spec.timeframe for spec in self.indicators}
+        self.timeframes |= {tf for tf, _ in signal.columns}
+
+        self.rings = {symbol: {tf: BarRing(window) for tf in self.timeframes} for symbol in symbols}
+        self.latest = {symbol: {} for symbol in symbols}   # (tf, column) -> last indicator value
+
+        for symbol in symbols:
+            for tf, df in (history or {}).get(symbol, {}).items():
+                if tf in self.timeframes:
+                    self.rings[symbol][tf].fill({
+                        field: _seconds(df[field]) if field == "time" else np.asarray(df[field], dtype=np.float64)
+                        for field in BAR_FIELDS if field in df
+                    })
+                    self._refresh(symbol, tf)
+
+    def _refresh(self, symbol, tf):
+        ring = self.rings[symbol][tf]
+        latest = self.latest[symbol]
+        for spec, kernel in zip(self.indicators, self.kernels):
+            if spec.timeframe != tf:
+                continue
+            result = kernel(*[ring.view(col) for col in spec.meta["inputs"]["required"]], **spec.params)
+            if not isinstance(result, tuple):
+                result = (result,)
+            for column, values in zip(spec.columns, result):
+                latest[(tf, column)] = values[-1] if len(values) else np.nan
+
+    def evaluate_symbol(self, symbol):
+        rings = self.rings[symbol]
+        latest = self.latest[symbol]
+        entry_tf = self.entry_tf
+        sessions = {}
+
+        def resolve(ref):
+            ref_type = ref["type"]
+            if ref_type == "column":
+                key = (ref.get("timeframe", entry_tf), ref["column"])
+                if key in latest:
+                    return latest[key]
+                return rings[key[0]].last(key[1])
+            if ref_type == "session":
+                name = ref["session"]
+                if name not in sessions:
+                    frames = {tf: ring.frame() for tf, ring in rings.items()}
+                    levels = compute_session_levels(frames, {name: SESSION_DEFINITIONS[name]}, entry_tf)
+                    sessions[name] = levels[name].iloc[-1]
+                return sessions[name][ref["value"]]
+            if ref_type == "literal":
+                return ref["value"]
+            raise ValueError(f"Unknown reference type: {ref_type}")
+
+        return self.evaluate(resolve)
+
+    def step(self, updates):
+        """Apply [(symbol, timeframe, bar)]; returns (signals, compute seconds)"""
+        started = time.perf_counter()
+        closed = {}
+        for symbol, tf, bar in updates:
+            if tf in self.timeframes:
+                self.rings[symbol][tf].append(bar)
+                closed.setdefault(symbol, set()).add(tf)
+
+        signals = []
+        for symbol, timeframes in closed.items():
+            # every timeframe is refreshed before the entry bar is evaluated
+            for tf in timeframes:
+                self._refresh(symbol, tf)
+            if self.entry_tf in timeframes:
+                direction = self.evaluate_symbol(symbol)
+                if direction:
+                    opened = int(self.rings[symbol][self.entry_tf].last("time"))
+                    signals.append({"symbol": symbol, "time": opened, "signal": direction})
+        return signals, time.perf_counter() - started
+
+
+def _shard_process(conn, args):
+    shard = _ScanShard(*args)
+    conn.send("ready")
+    while True:
+        message = conn.recv()
+        if message is None:
+            break
+        conn.send(shard.step(message))
+    conn.close()
+
+
+# ==============================
+# SCANNER
+# ==============================
+
+class Scanner:
+    """
+    strategy / indicators: the same configs as Engine.set_signal and
+    set_technical_indicators. history: optional {symbol: {timeframe: DataFrame}}
+    warm-up bars. workers: processes to split the symbols over; None or 1
+    scans in this process.
+    """
+
+    def __init__(self, strategy, indicators, symbols, window=500, workers=None, history=None):
+        self.symbols = list(symbols)
+        self.workers = max(1, min(workers or 1, len(self.symbols)))
+        self._owner = {symbol: i % self.workers for i, symbol in enumerate(self.symbols)}
+        shard_symbols = [self.symbols[i::self.workers] for i in range(self.workers)]
+
+        self._local = None
+        self._conns = []
+        self._processes = []
+        if self.workers == 1:
+            self._local = _ScanShard(strategy, indicators, self.symbols, window, history)
+        else:
+            import multiprocessing
+
+            for symbols in shard_symbols:
+                history_part = {s: history[s] for s in symbols if s in history} if history else None
+                parent, child = multiprocessing.Pipe()
+                process = multiprocessing.Process(
+                    target=_shard_process,
+                    args=(child, (strategy, indicators, symbols, window, history_part)),
+                    daemon=True
+                )
+                process.start()
+                self._conns.append(parent)
+                self._processes.append(process)
+            for conn in self._conns:
+                conn.recv()
+
+        self.scans = 0
+        self.bars = 0
+        self.signals = []
+        self.latencies = LatencyStats()      # per scan, wall seconds
+        self.shard_seconds = LatencyStats()  # per scan, slowest shard compute seconds
+
+    def step(self, updates):
+        """
+        One batch of closed bars [(symbol, timeframe, bar)], bar a dict with
+        time (seconds), open, high, low, close and optionally tick_volume,
+        bid, ask. Returns the fresh signals, sorted by symbol.
+        """
+        started = time.perf_counter()
+        if self._local is not None:
+            signals, compute = self._local.step(updates)
+        else:
+            parts = [[] for _ in self._conns]
+            for update in updates:
+                parts[self._owner[update[0]]].append(update)
+            busy = [i for i, part in enumerate(parts) if part]
+            for i in busy:
+                self._conns[i].send(parts[i])
+            signals, compute = [], 0.0
+            for i in busy:
+                shard_signals, seconds = self._conns[i].recv()
+                signals.extend(shard_signals)
+                compute = max(compute, seconds)
+
+        signals.sort(key=lambda s: s["symbol"])
+        self.scans += 1
+        self.bars += len(updates)
+        self.signals.extend(signals)
+        self.latencies.add(time.perf_counter() - started)
+        self.shard_seconds.add(compute)
+        return signals
+
+    async def run(self, feed, on_signal=None, max_batches=None):
+        count = 0
+        async for updates in feed:
+            for signal in self.step(updates):
+                if on_signal:
+                    on_signal(signal)
+            count += 1
+            if max_batches is not None and count >= max_batches:
+                break
+        return self.report()
+
+    def report(self):
+        compute = self.shard_seconds.summary_us()
+        return {
+            "symbols": len(self.symbols),
+            "workers": self.workers,
+            "scans": self.scans,
+            "bars": self.bars,
+            "signals": len(self.signals),
+            "latency_us": self.latencies.summary_us(),
+            "shard_compute_us": {"mean": compute["mean"], "max": compute["max"]}
+        }
+
+    def close(self):
+        for conn in self._conns:
+            conn.send(None)
+        for process in self._processes:
+            process.join()
+        self._conns = []
+        self._processes = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+# ==============================
+# BAR FEEDS
+# ==============================
+
+class ReplayBarFeed:
+    """
+    Replays recorded bars of several symbols in close-time order, one batch
+    per close time, standing in for a live bar feed. bars: {symbol:
+    {timeframe: DataFrame or MT5 rates array}}. speed=None replays as fast
+    as possible, otherwise paced at `speed` times real time.
+    """
+
+    def __init__(self, bars, speed=None):
+        self.speed = speed
+        self._columns = []
+        keys, closes, rows = [], [], []
+        for symbol, frames in bars.items():
+            for tf, data in frames.items():
+                names = data.dtype.names if isinstance(data, np.ndarray) else data.columns
+                columns = {
+                    field: _seconds(data[field]) if field == "time" else np.asarray(data[field], dtype=np.float64)
+                    for field in BAR_FIELDS if field in names
+                }
+                keys.append(np.full(len(columns["time"]), len(self._columns)))
+                closes.append(columns["time"] + TIMEFRAME_SECONDS[tf])
+                rows.append(np.arange(len(columns["time"])))
+                self._columns.append((symbol, tf, columns))
+
+        close = np.concatenate(closes) if closes else np.empty(0, dtype=np.int64)
+        order = np.argsort(close, kind="stable")
+        self._close = close[order]
+        self._key = np.concatenate(keys)[order] if keys else self._close
+        self._row = np.concatenate(rows)[order] if rows else self._close
+        self._bounds = np.flatnonzero(np.diff(self._close, prepend=-1, append=-1)) if len(close) else []
+
+    @classmethod
+    def from_mt5(cls, mt5, symbols, timeframes, date_from, date_to, speed=None):
+        """Bars from copy_rates_range, e.g. of mt5_sim.FileMT5 over a recording"""
+        bars = {}
+        for symbol in symbols:
+            bars[symbol] = {}
+            for tf in timeframes:
+                rates = mt5.copy_rates_range(symbol, getattr(mt5, f"TIMEFRAME_{tf}"), date_from, date_to)
+                if rates is not None and len(rates):
+                    bars[symbol][tf] = rates
+        return cls(bars, speed=speed)
+
+    def __len__(self):
+        return max(len(self._bounds) - 1, 0)
+
+    async def __aiter__(self):
+        loop = asyncio.get_running_loop()
+        wall_start = loop.time()
+        bounds = self._bounds
+
+        for b in range(len(self)):
+            start, stop = bounds[b], bounds[b + 1]
+            if self.speed:
+                delay = (self._close[start] - self._close[0]) / self.speed - (loop.time() - wall_start)
+                if delay > 0:
+                    await asyncio.sleep(delay)
+            else:
+                await asyncio.sleep(0)
+
+            batch = []
+            for key, row in zip(self._key[start:stop], self._row[start:stop]):
+                symbol, tf, columns = self._columns[key]
+                batch.append((symbol, tf, {field: values[row] for field, values in columns.items()}))
+            yield batch
@@ -0,0 +1,100 @@
+"""
+The one definition of the trading sessions.
+
+Every session owns a bit of a uint8 code; a bar's code has the bits of all
+sessions its open time falls in, so overlaps (London/New York) are two bits
+and a session may cross midnight (start > end). Codes come from a
+1440-entry minute-of-day table, so a whole column is one integer lookup:
+
+    codes = session_codes(price_data["H1"])        # the frame is left untouched
+    in_london = CALENDAR.mask(codes, "london")
+
+trade_signal.SessionLevelCache.codes keeps them per timeframe and data
+version, so a signal computes each timeframe's codes once.
+
+Times are read on the wall clock of the data: tz-aware values in their own
+zone (a New York index gets New York hours), naive values and epoch seconds
+as they are, i.e. UTC for broker data. The column path (codes) and the one
+bar path (code) agree on this.
+
+Session levels (trade_signal), "in_session" logic nodes and the session
+breakdown of the backtest metrics all read these codes.
+"""
+import numpy as np
+
+# name -> wall-clock hours (start inclusive, end exclusive) and metrics label
+SESSION_CALENDAR = {
+    "asia": {"start": "00:00", "end": "08:00", "label": "Asia"},
+    "london": {"start": "08:00", "end": "17:00", "label": "London"},
+    "ny": {"start": "13:00", "end": "22:00", "label": "New_York"}
+}
+
+def clock_minutes(clock):
+    hours, minutes = map(int, clock.split(":"))
+    return hours * 60 + minutes
+
+
+def wall_times(times):
+    """datetime64[ns] array of the wall-clock times (a Series, index or array; tz-aware in its own zone)"""
+    accessor = getattr(times, "dt", times)
+    if getattr(accessor, "tz", None) is not None:
+        times = accessor.tz_localize(None)
+    return np.asarray(times, dtype="datetime64[ns]")
+
+
+def minute_of_day(times):
+    """Wall-clock minute of the day of datetime values (a Series, index or array)"""
+    minutes = wall_times(times).astype("datetime64[m]").astype(np.int64)
+    return minutes % 1440
+
+
+def window_mask(minutes, start, end):
+    """minutes within [start, end), wrapping past midnight when start > end"""
+    if start < end:
+        return (minutes >= start) & (minutes < end)
+    if start > end:
+        return (minutes >= start) | (minutes < end)
+    return np.ones(np.shape(minutes), dtype=bool)
+
+
+class SessionCalendar:
+    """sessions: {name: (start "HH:MM", end "HH:MM")}, at most 8"""
+
+    def __init__(self, sessions):
+        if len(sessions) > 8:
+            raise ValueError("session calendar: at most 8 sessions fit a uint8 code")
+        self.names = list(sessions)
+        self.bits = {name: bit for bit, name in enumerate(self.names)}
+        self.windows = {name: (clock_minutes(start), clock_minutes(end)) for name, (start, end) in sessions.items()}
+
+        self.table = np.zeros(1440, dtype=np.uint8)
+        minutes = np.arange(1440)
+        for name, (start, end) in self.windows.items():
+            self.table[window_mask(minutes, start, end)] |= np.uint8(1 << self.bits[name])
+
+    def codes(self, times):
+        return self.table[minute_of_day(times)]
+
+    def code(self, value):
+        """Code of one timestamp: datetime-like (wall clock) or epoch seconds (UTC)"""
+        if isinstance(value, (int, float, np.integer, np.floating)):
+            return int(self.table[int(value) // 60 % 1440])
+        if hasattr(value, "hour"):
+            return int(self.table[value.hour * 60 + value.minute])
+        return int(self.codes(np.array([np.datetime64(value, "ns")]))[0])
+
+    def mask(self, codes, name):
+        return (np.asarray(codes) & np.uint8(1 << self.bits[name])) != 0
+
+    def contains(self, value, name):
+        return bool(self.code(value) & (1 << self.bits[name]))
+
+
+CALENDAR = SessionCalendar({name: (cfg["start"], cfg["end"]) for name, cfg in SESSION_CALENDAR.items()})
+
+
+def session_codes(df):
+    """Session codes of a price frame's bars; nothing is written to the frame"""
+    from trade_signal import get_time_series
+
+    return CALENDAR.codes(get_time_series(df))
@@ -1,3 +1,5 @@
+from session_calendar import SESSION_CALENDAR
+
 SESSION_DEFINITIONS = {
     # "prev_day": {
     #     "type": "higher_tf",
@@ -9,19 +11,9 @@ SESSION_DEFINITIONS = {
     #     "timeframe": "W1",
     #     "shift": 1
     # },
-    "london": {
-        "type": "intraday",
-        "start": "08:00",
-        "end": "17:00"
-    },
-    "ny": {
-        "type": "intraday",
-        "start": "13:00",
-        "end": "22:00"
-    },
-    "asia": {
-        "type": "intraday",
-        "start": "00:00",
-        "end": "08:00"
+    # intraday sessions: hours live in session_calendar.py
+    **{
+        name: {"type": "intraday", "start": cfg["start"], "end": cfg["end"]}
+        for name, cfg in SESSION_CALENDAR.items()
     }
 }
@@ -0,0 +1,323 @@
+"""
+Compiled, immutable forms of the user configs.
+
+Strategy, indicator, backtest and account configs are validated once and
+turned into frozen slotted objects before any hot loop runs. Constant
+SL/TP distances (pips, fixed, dollar) are folded into one offset per side
+at compile time, so only the ATR part is evaluated per entry.
+
+Folding keeps results bit-identical to evaluating every level: for a long,
+min(entry - d_i) == entry - max(d_i) because float subtraction is monotone.
+"""
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import Optional
+
+from technical_indicators import IndicatorValidationError
+
+LEVEL_TYPES = ("pips", "fixed", "dollar", "atr")
+BACKTEST_MODES = ("candle", "tick")
+LOGIC_OPERATORS = (">", "<", ">=", "<=", "==", "!=")
+REFERENCE_TYPES = ("column", "session", "literal")
+PATTERN_DIRECTIONS = ("bull", "bear", "any")
+
+
+def convert_to_pip(dollar_risk, lot_size, tick_size, tick_value, point):
+    if tick_value == 0 or tick_size == 0:
+        print("Error: Tick value or tick size is zero.")
+        return 0
+
+    pips = (dollar_risk / (tick_value * lot_size)) * (tick_size / point)
+
+    return pips * point
+
+
+# ==============================
+# SPECS
+# ==============================
+
+@dataclass(frozen=True, slots=True)
+class SymbolSpec:
+    pip_size: float
+    pip_value: float
+    tick_size: float
+    tick_value: float
+
+
+@dataclass(frozen=True, slots=True)
+class AccountSpec:
+    account_size: float
+    lot_size: float
+    spread_pips: float
+    slippage_pips: float
+
+
+@dataclass(frozen=True, slots=True)
+class LevelSpec:
+    """One side (SL or TP): widest constant distance and largest ATR multiplier"""
+    offset: Optional[float]
+    atr_multiplier: Optional[float]
+
+    def distance(self, atr):
+        if self.atr_multiplier is None:
+            return self.offset
+        atr_distance = atr * self.atr_multiplier
+        return atr_distance if self.offset is None else max(self.offset, atr_distance)
+
+
+@dataclass(frozen=True, slots=True)
+class BacktestSpec:
+    timeframe: str
+    mode: str
+    single_trade_per_direction: bool
+    mark_to_market: bool
+    events: bool
+    store_trades: bool
+    shards: Optional[int]
+    workers: Optional[int]
+    stop_loss: LevelSpec
+    take_profit: LevelSpec
+    uses_atr: bool
+    entry_offset: float
+    symbol: SymbolSpec
+    account: AccountSpec
+
+    def entry_price(self, price, direction):
+        """Fill price after slippage and half the spread"""
+        return price + self.entry_offset if direction==1 else price - self.entry_offset
+
+    def levels(self, direction, entry_price, atr=None):
+        """Return (sl, tp): the widest stop and the furthest target of all configured levels"""
+        sl_distance = self.stop_loss.distance(atr)
+        tp_distance = self.take_profit.distance(atr)
+        if direction==1:
+            return entry_price - sl_distance, entry_price + tp_distance
+        return entry_price + sl_distance, entry_price - tp_distance
+
+
+@dataclass(frozen=True, slots=True)
+class IndicatorSpec:
+    name: str
+    indicator: str
+    timeframe: str
+    params: MappingProxyType
+    meta: MappingProxyType
+    columns: tuple
+
+
+@dataclass(frozen=True, slots=True)
+class StrategySpec:
+    entry_timeframe: str
+    buy_logic: MappingProxyType
+    sell_logic: MappingProxyType
+    sessions: frozenset  # session names referenced by the logic
+    columns: frozenset   # (timeframe, column) pairs referenced by the logic
+
+
+# ==============================
+# COMPILERS
+# ==============================
+
+def compile_symbol(symbol):
+    spec = SymbolSpec(
+        pip_size=symbol["pip_size"],
+        pip_value=symbol["pip_value"],
+        tick_size=symbol["tick_size"],
+        tick_value=symbol["tick_value"]
+    )
+    if not spec.pip_size:
+        raise ValueError("pip_size is required to size trades")
+    return spec
+
+
+def compile_account(account_config):
+    for key in ("account_size", "lot_size"):
+        if not isinstance(account_config.get(key), (int, float)):
+            raise ValueError(f"account: {key} must be a number")
+    return AccountSpec(
+        account_size=account_config["account_size"],
+        lot_size=account_config["lot_size"],
+        spread_pips=account_config.get("spread_pips") or 0,
+        slippage_pips=account_config.get("slippage_pips") or 0
+    )
+
+
+def _compile_levels(kind, levels, account, symbol):
+    if not levels:
+        raise ValueError(f"backtest: at least one {kind} is required")
+
+    offsets = []
+    multipliers = []
+    for idx, level in enumerate(levels):
+        level_type = level.get("type")
+        if level_type not in LEVEL_TYPES:
+            raise ValueError(f"backtest.{kind}[{idx}]: unknown {kind} type {level_type!r}")
+        field = "multiplier" if level_type == "atr" else "value"
+        if not isinstance(level.get(field), (int, float)):
+            raise ValueError(f"backtest.{kind}[{idx}]: {level_type} level needs a number in {field!r}")
+
+        if level_type == "pips":
+            offsets.append(level["value"]*symbol.pip_size)
+        elif level_type == "fixed":
+            offsets.append(level["value"])
+        elif level_type == "dollar":
+            offsets.append(convert_to_pip(level["value"], account.lot_size, tick_size=symbol.tick_size,
+                                          tick_value=symbol.tick_value, point=symbol.pip_size))
+        else:
+            multipliers.append(level["multiplier"])
+
+    return LevelSpec(
+        offset=max(offsets) if offsets else None,
+        atr_multiplier=max(multipliers) if multipliers else None
+    )
+
+
+def compile_backtest(config, account, symbol):
+    """config: backtest config dict, account: AccountSpec, symbol: SymbolSpec"""
+    mode = config.get("mode") or "candle"
+    if mode not in BACKTEST_MODES:
+        raise ValueError(f"backtest: unknown mode {mode!r}")
+
+    if config.get("mark_to_market") and not config.get("store_trades", True):
+        raise ValueError("backtest: mark_to_market needs store_trades")
+
+    stop_loss = _compile_levels("stop_loss", config.get("stop_loss"), account, symbol)
+    take_profit = _compile_levels("take_profit", config.get("take_profit"), account, symbol)
+
+    return BacktestSpec(
+        timeframe=config.get("timeframe"),
+        mode=mode,
+        single_trade_per_direction=bool(config.get("single_trade_per_direction", False)),
+        mark_to_market=bool(config.get("mark_to_market", False)),
+        events=bool(config.get("events", False)),
+        store_trades=bool(config.get("store_trades", True)),
+        shards=config.get("shards"),
+        workers=config.get("workers"),
+        stop_loss=stop_loss,
+        take_profit=take_profit,
+        uses_atr=stop_loss.atr_multiplier is not None or take_profit.atr_multiplier is not None,
+        entry_offset=(account.slippage_pips + account.spread_pips/2)*symbol.pip_size,
+        symbol=symbol,
+        account=account
+    )
+
+
+def compile_indicator(cfg, registry, timeframes=None):
+    key = cfg.get("indicator")
+    meta = registry["indicators"].get(key) or registry["candlestick_patterns"].get(key)
+    if not meta:
+        raise IndicatorValidationError(f"Unknown indicator: {key}")
+    if not cfg.get("name"):
+        raise IndicatorValidationError(f"{key}: indicator name is required")
+    if timeframes is not None and cfg.get("timeframe") not in timeframes:
+        raise IndicatorValidationError(f"Timeframe '{cfg.get('timeframe')}' not found")
+
+    params = dict(cfg.get("params", {}))
+    for p, val in params.items():
+        spec = meta.get("params", {}).get(p)
+        if spec is None:
+            continue  # passed through to the kernel as-is (e.g. TA-Lib matype)
+        if spec["type"] == "int" and not isinstance(val, int):
+            raise IndicatorValidationError(f"{p} must be int")
+        if spec["type"] == "float" and not isinstance(val, (float, int)):
+            raise IndicatorValidationError(f"{p} must be float")
+        if spec["type"] == "list" and not isinstance(val, (list, tuple)):
+            raise IndicatorValidationError(f"{p} must be a list")
+        if "min" in spec and val < spec["min"] or "max" in spec and val > spec["max"]:
+            raise IndicatorValidationError(f"{p} must be within [{spec.get('min')}, {spec.get('max')}]")
+
+    outputs = meta["outputs"]
+    name = cfg["name"]
+    return IndicatorSpec(
+        name=name,
+        indicator=key,
+        timeframe=cfg.get("timeframe"),
+        params=MappingProxyType(params),
+        meta=MappingProxyType(meta),
+        columns=tuple(name if len(outputs) == 1 else f"{name}_{out}" for out in outputs)
+    )
+
+
+def _compile_logic(node, entry_tf, path, sessions, columns):
+    node_type = node.get("type")
+
+    if node_type in ("AND", "OR"):
+        if not node.get("children"):
+            raise ValueError(f"{path}: {node_type} node has no children")
+        for idx, child in enumerate(node["children"]):
+            _compile_logic(child, entry_tf, f"{path}.children[{idx}]", sessions, columns)
+        return
+
+    if node_type == "pattern":
+        from indicator_registry import pattern_bits
+
+        if node.get("pattern") not in pattern_bits():
+            raise ValueError(f"{path}: unknown candlestick pattern {node.get('pattern')!r}")
+        if not node.get("scan"):
+            raise ValueError(f"{path}: pattern node needs the name of a CDLSCAN indicator in 'scan'")
+        direction = node.get("direction", "any")
+        if direction not in PATTERN_DIRECTIONS:
+            raise ValueError(f"{path}: pattern direction must be one of {PATTERN_DIRECTIONS}")
+        for side in pattern_columns(node):
+            columns.add((node.get("timeframe", entry_tf), side))
+        return
+
+    if node_type == "in_session":
+        from session_calendar import CALENDAR
+
+        if node.get("session") not in CALENDAR.bits:
+            raise ValueError(f"{path}: unknown session {node.get('session')!r}, one of {CALENDAR.names}")
+        columns.add((node.get("timeframe", entry_tf), "time"))
+        return
+
+    if node_type != "condition":
+        raise ValueError(f"{path}: unknown logic node type {node_type!r}")
+    if node.get("operator") not in LOGIC_OPERATORS:
+        raise ValueError(f"{path}: unknown operator {node.get('operator')!r}")
+
+    for side in ("left", "right"):
+        ref = node.get(side) or {}
+        ref_type = ref.get("type")
+        if ref_type not in REFERENCE_TYPES:
+            raise ValueError(f"{path}.{side}: unknown reference type {ref_type!r}")
+        if ref_type == "column":
+            if not ref.get("column"):
+                raise ValueError(f"{path}.{side}: column reference needs 'column'")
+            columns.add((ref.get("timeframe", entry_tf), ref["column"]))
+        elif ref_type == "session":
+            if not ref.get("session"):
+                raise ValueError(f"{path}.{side}: session reference needs 'session'")
+            sessions.add(ref["session"])
+
+
+def pattern_columns(node):
+    """Mask columns a pattern node reads: <scan>_bull and/or <scan>_bear of a CDLSCAN indicator"""
+    direction = node.get("direction", "any")
+    sides = ("bull", "bear") if direction == "any" else (direction,)
+    return [f"{node['scan']}_{side}" for side in sides]
+
+
+def compile_signal(strategy, timeframes=None):
+    entry_tf = strategy.get("entry_timeframe")
+    if timeframes is not None and entry_tf not in timeframes:
+        raise ValueError(f"signal: entry timeframe {entry_tf!r} is not loaded")
+
+    sessions = set()
+    columns = set()
+    for side in ("buy_logic", "sell_logic"):
+        if side not in strategy:
+            raise ValueError(f"signal: missing {side}")
+        _compile_logic(strategy[side], entry_tf, f"signal.{side}", sessions, columns)
+
+    if timeframes is not None:
+        for tf, col in columns:
+            if tf not in timeframes:
+                raise ValueError(f"signal: column {col!r} references timeframe {tf!r} which is not loaded")
+
+    return StrategySpec(
+        entry_timeframe=entry_tf,
+        buy_logic=MappingProxyType(strategy["buy_logic"]),
+        sell_logic=MappingProxyType(strategy["sell_logic"]),
+        sessions=frozenset(sessions),
+        columns=frozenset(columns)
+    )
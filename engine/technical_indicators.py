@@ -1,5 +1,3 @@
-import talib
-
 class IndicatorValidationError(Exception):
     pass
 
@@ -51,7 +49,7 @@ class IndicatorExecutor:
             or self.registry["candlestick_patterns"].get(cfg["indicator"])
         )
 
-        func = getattr(talib, meta["function"])
+        func = self.resolve(meta)
 
         inputs = [df[col].values for col in meta["inputs"]["required"]]
         params = cfg.get("params", {})
@@ -63,6 +61,27 @@ class IndicatorExecutor:
 
         return result, meta["outputs"]
 
+    def run_spec(self, df, spec):
+        """Run a compiled IndicatorSpec, returns the output arrays"""
+        func = self.resolve(spec.meta)
+        inputs = [df[col].values for col in spec.meta["inputs"]["required"]]
+        result = func(*inputs, **spec.params)
+
+        if not isinstance(result, tuple):
+            result = (result,)
+        return result
+
+    @staticmethod
+    def resolve(meta):
+        """Dispatch on the registry 'library' field."""
+        library = meta.get("library", "talib")
+        if library == "talib":
+            import talib
+            return getattr(talib, meta["function"])
+
+        from indicator_registry import get_kernel
+        return get_kernel(library, meta["function"])
+
 class ColumnWriter:
     @staticmethod
     def write(df, name, outputs, values):
@@ -0,0 +1,229 @@
+"""
+Compact on-disk tick history.
+
+Only what the engine reads from ticks is kept: time_msc, bid and ask.
+Rows are cut into fixed-size chunks; inside a chunk, time is stored as
+millisecond deltas, bid as deltas in points and ask as the spread in
+points, each packed into the narrowest integer type that fits, then
+zlib-compressed. A time -> chunk index at the end of the file lets a
+range read decompress only the chunks it overlaps, straight into
+preallocated NumPy arrays.
+
+    write_ticks("EURUSD.qtk", ticks, digits=5)     # MT5 structured array or DataFrame
+    with TickStore("EURUSD.qtk") as store:         # the file stays mapped until close()
+        ticks = store.range(start, end)            # {"time", "time_msc", "bid", "ask"}
+        frame = store.read_frame(start, end)       # time/bid/ask DataFrame for tick backtests
+
+Prices must lie on the 10**-digits grid (MT5 quotes do); they decode as
+integer / 10**digits, which gives back the same doubles.
+
+File layout: MAGIC, u32 header length, JSON header, chunks, index
+(INDEX_DTYPE), then u64 index offset and u64 chunk count.
+"""
+import json
+import mmap
+import struct
+import zlib
+from datetime import timezone
+
+import numpy as np
+
+MAGIC = b"QTK1"
+CHUNK_ROWS = 65536
+
+INDEX_DTYPE = np.dtype([
+    ("first_msc", "<i8"), ("last_msc", "<i8"), ("offset", "<u8"), ("nbytes", "<u8"), ("rows", "<u4")
+])
+
+_INT_TYPES = (np.dtype("<i1"), np.dtype("<i2"), np.dtype("<i4"), np.dtype("<i8"))
+
+
+# ==============================
+# ENCODING
+# ==============================
+
+def _pack(values):
+    """Code byte + values in the narrowest signed integer type that holds them"""
+    for code, dtype in enumerate(_INT_TYPES):
+        info = np.iinfo(dtype)
+        if len(values) == 0 or (values.min() >= info.min and values.max() <= info.max):
+            return bytes([code]) + values.astype(dtype).tobytes()
+
+
+def _unpack(buffer, pos, count):
+    dtype = _INT_TYPES[buffer[pos]]
+    end = pos + 1 + count * dtype.itemsize
+    return np.frombuffer(buffer, dtype=dtype, count=count, offset=pos + 1), end
+
+
+def _encode_chunk(time_msc, bid, spread):
+    return (
+        struct.pack("<qq", time_msc[0], bid[0])
+        + _pack(np.diff(time_msc))
+        + _pack(np.diff(bid))
+        + _pack(spread)
+    )
+
+
+def _decode_chunk(payload, rows, time_out, bid_out, ask_out, scale):
+    time0, bid0 = struct.unpack_from("<qq", payload, 0)
+    dt, pos = _unpack(payload, 16, rows - 1)
+    dbid, pos = _unpack(payload, pos, rows - 1)
+    spread, _ = _unpack(payload, pos, rows)
+
+    time_out[0] = 0
+    np.cumsum(dt, out=time_out[1:])
+    time_out += time0
+
+    points = np.empty(rows, dtype=np.int64)
+    points[0] = 0
+    np.cumsum(dbid, out=points[1:])
+    points += bid0
+    np.divide(points, scale, out=bid_out)
+    points += spread
+    np.divide(points, scale, out=ask_out)
+
+
+def _points(prices, scale, name):
+    points = np.rint(np.asarray(prices, dtype=np.float64) * scale).astype(np.int64)
+    if not np.array_equal(points / scale, prices):
+        raise ValueError(f"tick store: {name} prices are not on the point grid of the given digits")
+    return points
+
+
+def write_ticks(path, ticks, digits, chunk_rows=CHUNK_ROWS, level=6):
+    """
+    ticks: MT5 tick array or DataFrame with bid, ask and time_msc (or time
+    in seconds), sorted by time. digits: price decimals of the symbol.
+    """
+    names = ticks.dtype.names if isinstance(ticks, np.ndarray) else ticks.columns
+    if "time_msc" in names:
+        time_msc = np.asarray(ticks["time_msc"], dtype=np.int64)
+    else:
+        time_msc = np.asarray(ticks["time"], dtype=np.int64) * 1000
+    if len(time_msc) and np.any(np.diff(time_msc) < 0):
+        raise ValueError("tick store: ticks must be sorted by time")
+
+    scale = 10 ** digits
+    bid = _points(ticks["bid"], scale, "bid")
+    spread = _points(ticks["ask"], scale, "ask") - bid
+
+    header = json.dumps({"digits": digits, "rows": len(time_msc), "chunk_rows": chunk_rows}).encode()
+    index = np.zeros(-(-len(time_msc) // chunk_rows), dtype=INDEX_DTYPE)
+
+    with open(path, "wb") as f:
+        f.write(MAGIC + struct.pack("<I", len(header)) + header)
+        for k, start in enumerate(range(0, len(time_msc), chunk_rows)):
+            stop = min(start + chunk_rows, len(time_msc))
+            blob = zlib.compress(_encode_chunk(time_msc[start:stop], bid[start:stop], spread[start:stop]), level)
+            index[k] = (time_msc[start], time_msc[stop - 1], f.tell(), len(blob), stop - start)
+            f.write(blob)
+        index_offset = f.tell()
+        f.write(index.tobytes())
+        f.write(struct.pack("<QQ", index_offset, len(index)))
+    return path
+
+
+# ==============================
+# READING
+# ==============================
+
+def epoch_seconds(value):
+    if isinstance(value, (int, float, np.integer)):
+        return int(value)
+    if getattr(value, "tzinfo", None) is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return int(value.timestamp())
+
+
+def _ticks(time_msc, bid, ask):
+    return {"time_msc": time_msc, "time": time_msc // 1000, "bid": bid, "ask": ask}
+
+
+class TickStore:
+    def __init__(self, path):
+        self.path = path
+        with open(path, "rb") as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if self._map[:4] != MAGIC:
+            raise ValueError(f"{path} is not a tick store")
+
+        (header_len,) = struct.unpack_from("<I", self._map, 4)
+        self.header = json.loads(self._map[8:8 + header_len])
+        self.digits = self.header["digits"]
+        self.scale = 10 ** self.digits
+
+        index_offset, n_chunks = struct.unpack_from("<QQ", self._map, len(self._map) - 16)
+        self.index = np.frombuffer(self._map, dtype=INDEX_DTYPE, count=n_chunks, offset=index_offset).copy()
+
+    def __len__(self):
+        return self.header["rows"]
+
+    def close(self):
+        self._map.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _decode(self, first, last):
+        chunks = self.index[first:max(first, last)]
+        rows = int(chunks["rows"].sum())
+        time_msc = np.empty(rows, dtype=np.int64)
+        bid = np.empty(rows, dtype=np.float64)
+        ask = np.empty(rows, dtype=np.float64)
+
+        pos = 0
+        for entry in chunks:
+            n = int(entry["rows"])
+            offset = int(entry["offset"])
+            payload = zlib.decompress(self._map[offset:offset + int(entry["nbytes"])])
+            _decode_chunk(payload, n, time_msc[pos:pos + n], bid[pos:pos + n], ask[pos:pos + n], self.scale)
+            pos += n
+        return time_msc, bid, ask
+
+    def range_msc(self, start_msc=None, stop_msc=None):
+        """Ticks with start_msc <= time_msc < stop_msc, decoding only the overlapping chunks"""
+        index = self.index
+        first = 0 if start_msc is None else int(np.searchsorted(index["last_msc"], start_msc, side="left"))
+        last = len(index) if stop_msc is None else int(np.searchsorted(index["first_msc"], stop_msc, side="left"))
+        time_msc, bid, ask = self._decode(first, last)
+
+        # trim the partial first and last chunks
+        lo = 0 if start_msc is None else np.searchsorted(time_msc, start_msc, side="left")
+        hi = len(time_msc) if stop_msc is None else np.searchsorted(time_msc, stop_msc, side="left")
+        return _ticks(time_msc[lo:hi], bid[lo:hi], ask[lo:hi])
+
+    def from_msc(self, start_msc, count):
+        """count ticks from start_msc on, like copy_ticks_from"""
+        index = self.index
+        first = int(np.searchsorted(index["last_msc"], start_msc, side="left"))
+        last = first
+        rows = 0
+        while last < len(index) and rows < count + int(index["rows"][first]):
+            rows += int(index["rows"][last])
+            last += 1
+        time_msc, bid, ask = self._decode(first, last)
+
+        lo = np.searchsorted(time_msc, start_msc, side="left")
+        return _ticks(time_msc[lo:lo + count], bid[lo:lo + count], ask[lo:lo + count])
+
+    def range(self, start=None, end=None):
+        """Ticks whose time in seconds is within [start, end], like copy_ticks_range"""
+        return self.range_msc(
+            None if start is None else epoch_seconds(start) * 1000,
+            None if end is None else (epoch_seconds(end) + 1) * 1000
+        )
+
+    def read_frame(self, start=None, end=None):
+        """time/bid/ask DataFrame, the tick-mode backtest input once a signal column is added"""
+        import pandas as pd
+
+        ticks = self.range(start, end)
+        return pd.DataFrame({
+            "time": pd.to_datetime(ticks["time_msc"], unit="ms"),
+            "bid": ticks["bid"],
+            "ask": ticks["ask"]
+        })
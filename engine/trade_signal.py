@@ -1,6 +1,9 @@
+import numpy as np
 import pandas as pd
 import operator
+from session_calendar import CALENDAR, clock_minutes, minute_of_day, session_codes, wall_times, window_mask
 from signal_registry import SESSION_DEFINITIONS
+from specs import StrategySpec, compile_signal, pattern_columns
 
 
 # ==============================
@@ -36,11 +39,21 @@ def get_time_series(df):
 # SESSION COMPUTATION
 # ==============================
 
-def compute_session_levels(price_data, session_defs, base_timeframe):
+def compute_session_levels(price_data, session_defs, base_timeframe, codes=None):
+    """codes: the base timeframe's session codes when already known (SessionLevelCache.codes)"""
 
     session_levels = {}
-    base_df = price_data[base_timeframe].copy()
-    base_df["_time"] = get_time_series(base_df)
+    base_df = price_data[base_timeframe]
+    intraday = [name for name, cfg in session_defs.items() if cfg["type"] != "higher_tf"]
+
+    if intraday:
+        times = wall_times(get_time_series(base_df))
+        if codes is None:
+            codes = CALENDAR.codes(times)
+        minutes = minute_of_day(times)
+        day = times.astype("datetime64[D]").astype(np.int64)
+        high, low = base_df["high"].to_numpy(), base_df["low"].to_numpy()
+        open_, close = base_df["open"].to_numpy(), base_df["close"].to_numpy()
 
     for name, cfg in session_defs.items():
 
@@ -60,46 +73,32 @@ def compute_session_levels(price_data, session_defs, base_timeframe):
             continue
 
         # -------- Intraday sessions
-        start = pd.to_datetime(cfg["start"]).time()
-        end = pd.to_datetime(cfg["end"]).time()
+        start, end = clock_minutes(cfg["start"]), clock_minutes(cfg["end"])
+        if CALENDAR.windows.get(name) == (start, end):
+            in_session = CALENDAR.mask(codes, name)
+        else:
+            in_session = window_mask(minutes, start, end)
 
-        session_high = []
-        session_low = []
-        session_open = []
-        session_close = []
+        # after midnight, a midnight-crossing session still belongs to the day it started
+        session_day = day - (in_session & (start > end) & (minutes < end))
+        rows = np.flatnonzero(in_session)
+        levels = {value: np.full(len(base_df), np.nan) for value in ("high", "low", "open", "close")}
 
-        for date, group in base_df.groupby(base_df["_time"].dt.date):
+        if len(rows):
+            days, firsts = np.unique(session_day[rows], return_index=True)
+            lasts = np.append(firsts[1:], len(rows)) - 1
 
-            mask = (
-                (group["_time"].dt.time >= start) &
-                (group["_time"].dt.time < end)
-            )
-
-            session_df = group[mask]
-
-            if session_df.empty:
-                session_high.extend([None] * len(group))
-                session_low.extend([None] * len(group))
-                session_open.extend([None] * len(group))
-                session_close.extend([None] * len(group))
-                continue
+            # every bar of a date gets the levels of that date's session
+            pos = np.minimum(np.searchsorted(days, day), len(days) - 1)
+            found = days[pos] == day
+            pos = pos[found]
 
-            high = session_df["high"].max()
-            low = session_df["low"].min()
-            open_ = session_df.iloc[0]["open"]
-            close_ = session_df.iloc[-1]["close"]
+            levels["high"][found] = np.maximum.reduceat(high[rows], firsts)[pos]
+            levels["low"][found] = np.minimum.reduceat(low[rows], firsts)[pos]
+            levels["open"][found] = open_[rows[firsts]][pos]
+            levels["close"][found] = close[rows[lasts]][pos]
 
-            session_high.extend([high] * len(group))
-            session_low.extend([low] * len(group))
-            session_open.extend([open_] * len(group))
-            session_close.extend([close_] * len(group))
-
-        session_levels[name] = pd.DataFrame({
-            "high": session_high,
-            "low": session_low,
-            "open": session_open,
-            "close": session_close
-        }, index=base_df.index)
+        session_levels[name] = pd.DataFrame(levels, index=base_df.index)
 
     return session_levels
 
@@ -144,18 +143,46 @@ def evaluate_condition(price_data, session_levels, node, entry_tf):
     return OPS[node["operator"]](left, right)
 
 
+def evaluate_pattern(price_data, node, entry_tf):
+    """
+    {"type": "pattern", "scan": <CDLSCAN name>, "pattern": "CDLHAMMER",
+     "direction": "bull" | "bear" | "any", "timeframe": optional}
+    True where the pattern's bit is set in the scan's mask column(s).
+    """
+    from indicator_registry import pattern_bits
+
+    df = price_data[node.get("timeframe", entry_tf)]
+    bit = np.int64(pattern_bits()[node["pattern"]])
+
+    hits = np.zeros(len(df), dtype=bool)
+    for col in pattern_columns(node):
+        hits |= ((df[col].to_numpy(dtype=np.int64) >> bit) & 1).astype(bool)
+    return pd.Series(hits, index=df.index)
+
+
+def evaluate_in_session(price_data, node, entry_tf, codes=None):
+    """
+    {"type": "in_session", "session": "london", "timeframe": optional}: bars opened in the session.
+    codes: optional fn(timeframe) -> session codes, e.g. a SessionLevelCache's.
+    """
+    tf = node.get("timeframe", entry_tf)
+    df = price_data[tf]
+    bar_codes = codes(tf) if codes else session_codes(df)
+    return pd.Series(CALENDAR.mask(bar_codes, node["session"]), index=df.index)
+
+
 # ==============================
 # LOGIC TREE (RECURSIVE VECTOR)
 # ==============================
 
-def evaluate_logic(price_data, session_levels, node, entry_tf):
+def evaluate_logic(price_data, session_levels, node, entry_tf, codes=None):
 
     node_type = node["type"]
 
     if node_type in ("AND", "OR"):
 
         children = [
-            evaluate_logic(price_data, session_levels, c, entry_tf)
+            evaluate_logic(price_data, session_levels, c, entry_tf, codes)
             for c in node["children"]
         ]
 
@@ -172,35 +199,174 @@ def evaluate_logic(price_data, session_levels, node, entry_tf):
     if node_type == "condition":
         return evaluate_condition(price_data, session_levels, node, entry_tf)
 
+    if node_type == "pattern":
+        return evaluate_pattern(price_data, node, entry_tf)
+
+    if node_type == "in_session":
+        return evaluate_in_session(price_data, node, entry_tf, codes)
+
+    raise ValueError(f"Unknown logic node type: {node_type}")
+
+
+# ==============================
+# COMPILED LOGIC (SINGLE BAR)
+# ==============================
+
+def compile_logic(node):
+    """
+    Compile a logic tree into a function of a reference resolver, for
+    evaluating one bar at a time (live trading). resolve(ref) returns the
+    scalar value of a column/session/literal reference for that bar.
+    """
+    node_type = node["type"]
+
+    if node_type in ("AND", "OR"):
+        children = [compile_logic(c) for c in node["children"]]
+        if node_type == "AND":
+            return lambda resolve: all(child(resolve) for child in children)
+        return lambda resolve: any(child(resolve) for child in children)
+
+    if node_type == "condition":
+        op = OPS[node["operator"]]
+        left = node["left"]
+        right = node["right"]
+        return lambda resolve: bool(op(resolve(left), resolve(right)))
+
+    if node_type == "pattern":
+        from indicator_registry import pattern_bits
+
+        bit = pattern_bits()[node["pattern"]]
+        tf = {"timeframe": node["timeframe"]} if "timeframe" in node else {}
+        refs = [{"type": "column", "column": col, **tf} for col in pattern_columns(node)]
+        return lambda resolve: any((int(resolve(ref)) >> bit) & 1 for ref in refs)
+
+    if node_type == "in_session":
+        session = node["session"]
+        ref = {"type": "column", "column": "time"}
+        if "timeframe" in node:
+            ref["timeframe"] = node["timeframe"]
+        return lambda resolve: CALENDAR.contains(resolve(ref), session)
+
     raise ValueError(f"Unknown logic node type: {node_type}")
 
 
+def compile_strategy(strategy):
+    """Return fn(resolve) -> 1, -1 or 0 for the latest bar"""
+    buy = compile_logic(strategy["buy_logic"])
+    sell = compile_logic(strategy["sell_logic"])
+
+    def evaluate(resolve):
+        is_buy = buy(resolve)
+        is_sell = sell(resolve)
+        if is_buy and not is_sell:
+            return 1
+        if is_sell and not is_buy:
+            return -1
+        return 0
+
+    return evaluate
+
+
+# ==============================
+# SESSION CACHE
+# ==============================
+
+class SessionLevelCache:
+    """
+    Session levels keyed by (entry timeframe, data version, session, definition),
+    and the session codes of each timeframe's bars, computed once per version.
+
+    The owner bumps the data version whenever price data is reloaded or
+    appended; entries of older versions are dropped on the next lookup.
+    """
+
+    def __init__(self):
+        self._levels = {}
+        self._codes = {}
+        self._version = None
+
+    def _check_version(self, version):
+        if version != self._version:
+            self._levels.clear()
+            self._codes.clear()
+            self._version = version
+
+    def codes(self, price_data, timeframe, version):
+        self._check_version(version)
+        if timeframe not in self._codes:
+            self._codes[timeframe] = session_codes(price_data[timeframe])
+        return self._codes[timeframe]
+
+    def get(self, price_data, names, entry_tf, version):
+        self._check_version(version)
+
+        levels = {}
+        missing = {}
+        for name in names:
+            if name not in SESSION_DEFINITIONS:
+                raise ValueError(f"Unknown session: {name}")
+            cfg = SESSION_DEFINITIONS[name]
+            key = (entry_tf, version, name, tuple(sorted(cfg.items())))
+            if key in self._levels:
+                levels[name] = self._levels[key]
+            else:
+                missing[name] = key
+
+        if missing:
+            defs = {name: SESSION_DEFINITIONS[name] for name in missing}
+            intraday = any(cfg["type"] != "higher_tf" for cfg in defs.values())
+            computed = compute_session_levels(
+                price_data,
+                defs,
+                base_timeframe=entry_tf,
+                codes=self.codes(price_data, entry_tf, version) if intraday else None
+            )
+            for name, key in missing.items():
+                self._levels[key] = levels[name] = computed[name]
+
+        return levels
+
+    def clear(self):
+        self._levels.clear()
+        self._codes.clear()
+
+
 # ==============================
 # FINAL SIGNAL GENERATOR
 # ==============================
 
-def generate_signal(price_data, strategy):
+def generate_signal(price_data, strategy, session_cache=None, data_version=None):
+    """
+    strategy: signal config dict, or a StrategySpec already compiled by the
+    caller. Only the sessions referenced by the logic are computed. With a
+    session_cache they, and the bars' session codes, are reused until
+    data_version changes.
+    """
 
-    entry_tf = strategy["entry_timeframe"]
+    spec = strategy if isinstance(strategy, StrategySpec) else compile_signal(strategy)
+    entry_tf = spec.entry_timeframe
 
-    session_levels = compute_session_levels(
-        price_data,
-        SESSION_DEFINITIONS,
-        base_timeframe=entry_tf
-    )
+    if session_cache is None:
+        session_cache = SessionLevelCache()
+    session_levels = session_cache.get(price_data, spec.sessions, entry_tf, data_version)
+
+    def codes(tf):
+        return session_cache.codes(price_data, tf, data_version)
 
     buy_series = evaluate_logic(
         price_data,
         session_levels,
-        strategy["buy_logic"],
-        entry_tf
+        spec.buy_logic,
+        entry_tf,
+        codes
     )
 
     sell_series = evaluate_logic(
         price_data,
         session_levels,
-        strategy["sell_logic"],
-        entry_tf
+        spec.sell_logic,
+        entry_tf,
+        codes
     )
 
     signal = pd.Series(0, index=price_data[entry_tf].index)
@@ -0,0 +1,84 @@
+"""
+Shared synthetic data for the equivalence tests. The engine modules use
+script-style imports, so engine/ goes on sys.path like the CLI does.
+"""
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "engine"))
+
+PRICE = {"pip_size": 0.0001, "pip_value": 10, "tick_size": 0.00001, "tick_value": 1}
+
+INDICATORS = [
+    {"name": "ema", "indicator": "EMA", "timeframe": "H1", "params": {"timeperiod": 20}},
+    {"name": "rsi", "indicator": "RSI", "timeframe": "H1", "params": {"timeperiod": 14}}
+]
+
+SIGNAL = {
+    "entry_timeframe": "H1",
+    "buy_logic": {"type": "AND", "children": [
+        {"type": "condition", "left": {"type": "column", "column": "close"}, "operator": ">",
+         "right": {"type": "column", "column": "ema"}},
+        {"type": "condition", "left": {"type": "column", "column": "rsi"}, "operator": "<",
+         "right": {"type": "literal", "value": 60}}
+    ]},
+    "sell_logic": {"type": "condition", "left": {"type": "column", "column": "close"}, "operator": "<",
+                   "right": {"type": "column", "column": "ema"}}
+}
+
+BACKTEST = {
+    "timeframe": "H1", "mode": "candle",
+    "stop_loss": [{"type": "pips", "value": 20}, {"type": "atr", "multiplier": 1.5}],
+    "take_profit": [{"type": "pips", "value": 30}, {"type": "dollar", "value": 50}]
+}
+
+ACCOUNT = {"account_size": 10000, "lot_size": 1, "spread_pips": 1, "slippage_pips": 0.5}
+
+
+def make_bars(n=3000, seed=1, freq="h"):
+    rng = np.random.default_rng(seed)
+    close = 1.10 + np.cumsum(rng.normal(0, 0.0008, n))
+    open_ = np.concatenate(([close[0]], close[:-1]))
+    df = pd.DataFrame({
+        "time": pd.date_range("2024-01-01", periods=n, freq=freq),
+        "open": open_,
+        "high": np.maximum(open_, close) + rng.random(n) * 0.0006,
+        "low": np.minimum(open_, close) - rng.random(n) * 0.0006,
+        "close": close,
+        "tick_volume": rng.integers(50, 500, n).astype(float)
+    })
+    df["bid"] = df["close"]
+    df["ask"] = df["close"] + 0.00012
+    return df
+
+
+def make_engine(bars):
+    from app import CustomEngine
+
+    engine = CustomEngine()
+    engine.set_custom_price_data(dict(PRICE, timeframes=["H1"], is_custom=True, custom_prices=[bars.copy()]))
+    return engine
+
+
+@pytest.fixture(scope="session")
+def bars():
+    return make_bars()
+
+
+@pytest.fixture(scope="session")
+def signal_frame(bars):
+    """H1 bars with the indicator and signal columns of INDICATORS/SIGNAL"""
+    engine = make_engine(bars)
+    engine.set_technical_indicators(INDICATORS)
+    engine.set_signal(SIGNAL)
+    return engine.get_price("H1")
+
+
+def backtest_spec(**overrides):
+    from specs import compile_account, compile_backtest, compile_symbol
+
+    return compile_backtest(dict(BACKTEST, **overrides), compile_account(ACCOUNT), compile_symbol(PRICE))
@@ -0,0 +1,29 @@
+import pytest
+
+from conftest import backtest_spec
+
+VARIANTS = [
+    dict(mode=mode, single_trade_per_direction=single, stop_loss=stop_loss)
+    for mode in ("candle", "tick")
+    for single in (False, True)
+    for stop_loss in ([{"type": "pips", "value": 15}], [{"type": "pips", "value": 20}, {"type": "atr", "multiplier": 1.5}])
+]
+
+
+@pytest.mark.parametrize("overrides", VARIANTS)
+def test_sharded_trades_match_sequential(signal_frame, overrides):
+    from backtest import run_backtest, run_backtest_sharded
+
+    spec = backtest_spec(**overrides)
+    reference = run_backtest(signal_frame, spec)
+    assert len(reference) > 0
+    assert run_backtest_sharded(signal_frame, spec, shards=7, workers=2).equals(reference)
+    assert run_backtest_sharded(signal_frame, spec, shards=1, workers=1).equals(reference)
+
+
+@pytest.mark.parametrize("overrides", VARIANTS)
+def test_event_trades_match_sequential(signal_frame, overrides):
+    from backtest import run_backtest, run_backtest_events
+
+    spec = backtest_spec(**overrides)
+    assert run_backtest_events(signal_frame, spec).equals(run_backtest(signal_frame, spec))
@@ -0,0 +1,62 @@
+import os
+
+import numpy as np
+import pytest
+
+from conftest import make_bars
+
+EXACT = ["ROC", "MOM", "PIVOTS", "CDLSCAN", "CDLENGULFING", "CDLMORNINGSTAR"]
+
+
+def compile_exact(key):
+    from indicator_registry import get_registry
+    from specs import compile_indicator
+
+    return compile_indicator({"name": key.lower(), "indicator": key, "timeframe": "M1"}, get_registry())
+
+
+def test_exact_list_covers_the_registry():
+    from chunked_indicators import chunking
+    from indicator_registry import get_registry
+
+    exact = {key for key, meta in get_registry()["indicators"].items() if chunking(meta) == "exact"}
+    assert exact <= set(EXACT)
+
+
+@pytest.mark.parametrize("key", EXACT)
+def test_exact_indicators_are_bit_identical_in_blocks(key):
+    from chunked_indicators import run_chunked
+    from indicator_registry import get_registry
+    from technical_indicators import IndicatorExecutor
+
+    bars = make_bars(5000, seed=7, freq="min")
+    spec = compile_exact(key)
+    reference = IndicatorExecutor(get_registry()).run_spec(bars, spec)
+    columns = {col: bars[col].to_numpy() for col in spec.meta["inputs"]["required"]}
+    outputs = run_chunked(spec, columns, block_rows=701)
+    if not isinstance(reference, tuple):
+        reference = (reference,)
+    for column, values in zip(spec.columns, reference):
+        assert np.array_equal(outputs[column], values, equal_nan=True), column
+
+
+def test_npy_run_matches_in_memory_and_keeps_inputs(tmp_path):
+    from chunked_indicators import run_chunked, run_chunked_npy
+    from technical_indicators import IndicatorValidationError
+
+    bars = make_bars(5000, seed=7, freq="min")
+    folder = tmp_path / "M1"
+    folder.mkdir()
+    for col in ("open", "high", "low", "close"):
+        np.save(folder / f"{col}.npy", bars[col].to_numpy())
+    spec = compile_exact("PIVOTS")
+
+    outputs = run_chunked_npy(spec, str(folder), str(tmp_path / "out"), block_rows=701)
+    expected = run_chunked(spec, {col: bars[col].to_numpy() for col in ("high", "low", "close")})
+    for column in spec.columns:
+        assert np.array_equal(np.load(os.path.join(tmp_path, "out", f"{column}.npy")), expected[column], equal_nan=True)
+        assert np.array_equal(outputs[column], expected[column], equal_nan=True)
+
+    with pytest.raises(IndicatorValidationError):
+        run_chunked_npy(spec, str(folder), str(folder))
+    assert np.array_equal(np.load(folder / "close.npy"), bars["close"].to_numpy())
@@ -0,0 +1,22 @@
+import asyncio
+
+import numpy as np
+import pandas as pd
+
+from conftest import ACCOUNT, BACKTEST, INDICATORS, PRICE, SIGNAL
+
+
+def test_live_trader_cold_start():
+    from live import LiveTrader, ReplayTickSource
+
+    rng = np.random.default_rng(0)
+    n = 20_000
+    bid = 1.10 + np.cumsum(rng.normal(0, 0.00005, n))
+    ticks = pd.DataFrame({"time": pd.date_range("2024-01-01", periods=n, freq="5s"), "bid": bid, "ask": bid + 0.0001})
+
+    trader = LiveTrader(SIGNAL, INDICATORS, BACKTEST, ACCOUNT, PRICE)
+    report = asyncio.run(trader.run(ReplayTickSource.from_frame(ticks)))
+
+    assert report["ticks"] == n and report["bars"] > 20
+    assert trader.frames["H1"]["close"].dtype == np.float64
+    assert trader.frames["H1"]["ema"].notna().any()
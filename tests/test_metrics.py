@@ -0,0 +1,28 @@
+import math
+
+import pytest
+
+from conftest import backtest_spec
+
+
+def assert_same_metrics(actual, expected, path="metrics"):
+    """Equal keys and values; floats up to summation order"""
+    if isinstance(expected, dict):
+        assert actual.keys() == expected.keys(), path
+        for key in expected:
+            assert_same_metrics(actual[key], expected[key], f"{path}.{key}")
+    elif isinstance(expected, float) and math.isnan(expected):
+        assert math.isnan(actual), path
+    else:
+        assert actual == pytest.approx(expected, rel=1e-9, abs=1e-9), path
+
+
+@pytest.mark.parametrize("mode", ["candle", "tick"])
+def test_accumulator_matches_batch_metrics(signal_frame, mode):
+    from backtest import run_backtest
+    from backtest_metrics import MetricsAccumulator, compute_backtest_metrics
+
+    accumulator = MetricsAccumulator()
+    trades = run_backtest(signal_frame, backtest_spec(mode=mode), accumulator=accumulator)
+    assert len(trades) > 0
+    assert_same_metrics(accumulator.metrics(), compute_backtest_metrics(trades))
@@ -0,0 +1,30 @@
+from conftest import ACCOUNT, BACKTEST, INDICATORS, SIGNAL, make_engine
+
+
+def eager_metrics(bars, indicators):
+    engine = make_engine(bars)
+    engine.set_technical_indicators(indicators)
+    engine.set_signal(SIGNAL)
+    return engine.run_backtest(BACKTEST, ACCOUNT)
+
+
+def test_pipeline_matches_eager_engine(bars):
+    pipe = make_engine(bars).pipeline
+    pipe.set_indicators(INDICATORS)
+    pipe.set_signal(SIGNAL)
+    pipe.set_backtest(BACKTEST, ACCOUNT)
+    assert pipe.metrics() == eager_metrics(bars, INDICATORS)
+
+
+def test_pipeline_remove_then_readd_indicator(bars):
+    pipe = make_engine(bars).pipeline
+    pipe.set_indicators(INDICATORS)
+    pipe.set_signal(SIGNAL)
+    pipe.set_backtest(BACKTEST, ACCOUNT)
+    pipe.metrics()
+
+    rsi = dict(INDICATORS[1], params={"timeperiod": 5})
+    pipe.remove_indicator("rsi")
+    pipe.set_indicator(rsi)
+    assert pipe.metrics() == eager_metrics(bars, [INDICATORS[0], rsi])
+    assert ("signal",) in pipe.recomputed
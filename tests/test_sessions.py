@@ -0,0 +1,48 @@
+import numpy as np
+import pandas as pd
+
+from conftest import make_bars
+
+SIGNAL = {
+    "entry_timeframe": "H1",
+    "buy_logic": {"type": "AND", "children": [
+        {"type": "in_session", "session": "london"},
+        {"type": "condition", "left": {"type": "column", "column": "close"}, "operator": ">",
+         "right": {"type": "session", "session": "asia", "value": "high"}}
+    ]},
+    "sell_logic": {"type": "AND", "children": [
+        {"type": "in_session", "session": "ny"},
+        {"type": "condition", "left": {"type": "column", "column": "close"}, "operator": "<",
+         "right": {"type": "session", "session": "asia", "value": "low"}}
+    ]}
+}
+
+
+def test_cached_session_codes_match_fresh(monkeypatch):
+    import trade_signal
+    from trade_signal import SessionLevelCache, generate_signal
+
+    bars = make_bars(2000)
+    columns = list(bars.columns)
+    fresh = generate_signal({"H1": bars.copy()}, SIGNAL)["H1"]["signal"]
+
+    calls = []
+    compute = trade_signal.session_codes
+    monkeypatch.setattr(trade_signal, "session_codes", lambda df: calls.append(1) or compute(df))
+    cache = SessionLevelCache()
+    price_data = {"H1": bars}
+    cached = generate_signal(price_data, SIGNAL, cache, data_version=1)["H1"]["signal"]
+    generate_signal(price_data, SIGNAL, cache, data_version=1)
+
+    assert cached.equals(fresh)
+    assert len(calls) == 1
+    assert list(bars.columns) == columns + ["signal"]
+
+
+def test_vector_and_single_bar_codes_agree_on_tz_aware_times():
+    from session_calendar import CALENDAR
+
+    times = pd.Series(pd.date_range("2024-03-01", periods=2000, freq="37min", tz="UTC").tz_convert("America/New_York"))
+    codes = CALENDAR.codes(times)
+    assert np.array_equal(codes, [CALENDAR.code(t) for t in times])
+    assert np.array_equal(codes, CALENDAR.codes(times.dt.tz_localize(None)))
@@ -0,0 +1,38 @@
+import numpy as np
+import pandas as pd
+
+
+def synthetic_ticks(n=50_000, seed=4, digits=5):
+    rng = np.random.default_rng(seed)
+    time_msc = 1_704_067_200_000 + np.cumsum(rng.integers(0, 900, n))
+    bid = np.round(1.10 + np.cumsum(rng.normal(0, 0.00003, n)), digits)
+    ask = np.round(bid + rng.integers(0, 30, n) / 10 ** digits, digits)
+    return pd.DataFrame({"time_msc": time_msc, "bid": bid, "ask": ask})
+
+
+def test_tick_store_round_trip(tmp_path):
+    from tick_store import TickStore, write_ticks
+
+    ticks = synthetic_ticks()
+    path = write_ticks(str(tmp_path / "ticks.qtk"), ticks, digits=5, chunk_rows=4096)
+    time_msc = ticks["time_msc"].to_numpy()
+
+    with TickStore(path) as store:
+        full = store.range_msc()
+        assert np.array_equal(full["time_msc"], time_msc)
+        assert np.array_equal(full["bid"], ticks["bid"].to_numpy())
+        assert np.array_equal(full["ask"], ticks["ask"].to_numpy())
+
+        rng = np.random.default_rng(1)
+        for _ in range(50):
+            lo, hi = np.sort(rng.integers(time_msc[0] - 10, time_msc[-1] + 10, 2))
+            part = store.range_msc(lo, hi)
+            inside = (time_msc >= lo) & (time_msc < hi)
+            assert np.array_equal(part["time_msc"], time_msc[inside])
+            assert np.array_equal(part["ask"], ticks["ask"].to_numpy()[inside])
+
+            count = int(rng.integers(0, 10_000))
+            start = np.searchsorted(time_msc, lo)
+            first = store.from_msc(lo, count)
+            assert np.array_equal(first["time_msc"], time_msc[start:start + count])
+            assert np.array_equal(first["bid"], ticks["bid"].to_numpy()[start:start + count])